@@ -1,30 +1,65 @@
 import logging
 import os
 import random
-import subprocess
+import re
+import threading
 import time
-from collections import deque
-from typing import Set
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Optional
 
-import requests
-from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
 from selenium.common.exceptions import *
 from seleniumbase import SB
 
-from config import TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID
+import common_path  # noqa: F401
+from common.browser_lifecycle import BrowserLifecycle
+from common.dedup import DedupIndex
+from common.notifier import TelegramNotifier
+from common.waits import ReadinessWaiter
+from config import (
+    BROWSER_MAX_AGE_SECONDS,
+    BROWSER_MAX_RSS_MB,
+    CONCURRENCY,
+    DEDUP_TTL_SECONDS,
+    FAST_PATH,
+    FAST_PATH_MAX_FAILURES,
+    FAST_PATH_TIMEOUT,
+    INCREMENTAL,
+    LAST_ITEMS_MAX_SIZE,
+    MAX_PAGES_PER_URL,
+    SESSION_MAX_PAGES,
+    SESSION_MODE,
+    TELEGRAM_ALBUM_THRESHOLD,
+    TELEGRAM_BOT_TOKEN,
+    TELEGRAM_CHAT_ID,
+    TELEGRAM_MIN_INTERVAL,
+    TELEGRAM_QUEUE_SIZE,
+)
+from fast_path import HttpFastPath
 from param import URLS
+from parsing import parse_cards
+from session import BrowserSession
 
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s - %(levelname)s - %(message)s",
     handlers=[logging.FileHandler("error_code.txt"), logging.StreamHandler()],
 )
-LAST_ITEMS_MAX_SIZE: int = 2000
-sent_products: Set[str] = set()
-urls_queue: deque = deque(maxlen=LAST_ITEMS_MAX_SIZE)
+sent_products = DedupIndex(LAST_ITEMS_MAX_SIZE, DEDUP_TTL_SECONDS)
+urls_lock = threading.Lock()
 ua = UserAgent()
 MAX_TXT_LOG_SIZE_MB: int = 5
+MAX_PRODUCTS: int = 4
+PAGE_RE = re.compile(r"([?&])page=(\d+)")
+RESULT_CARD_SELECTOR: str = "#searchResultListWrapper a.itemCard_inner"
+lifecycle = BrowserLifecycle(BROWSER_MAX_AGE_SECONDS, BROWSER_MAX_RSS_MB)
+notifier = TelegramNotifier(
+    TELEGRAM_BOT_TOKEN,
+    TELEGRAM_CHAT_ID,
+    TELEGRAM_QUEUE_SIZE,
+    TELEGRAM_ALBUM_THRESHOLD,
+    TELEGRAM_MIN_INTERVAL,
+)
 
 
 def rotate_txt_log() -> None:
@@ -49,149 +84,238 @@ def rotate_txt_log() -> None:
             )
 
 
-def kill_chromedriver() -> None:
+def send_product_to_telegram(product: dict) -> None:
     """
-    Отчищает систему от всех процессов chromedriver и chrome
+    Ставит информацию о товаре в очередь отправки в Telegram-чат:
+    sendPhoto (если есть изображение) или sendMessage (если изображения нет).
+
+    Формат сообщения:
+    - Цена: {цена}
+    - Ссылка: {ссылка на товар}
+
+    Примечания:
+    - Отправляет фоновый поток общего TelegramNotifier (common/notifier.py),
+    функция не ждет Telegram; паузы и повторы после 429 - там же
+    - Если в очереди больше TELEGRAM_ALBUM_THRESHOLD товаров с фото,
+    они уходят альбомами (sendMediaGroup) по 10 фото
+    - Если подпись (caption) превышает 1024 символа,
+    она обрезается до 1020 символов с добавлением "..."
+    - Ошибки отправки логируются, исключение не пробрасывается
+
+    Args:
+        product (dict): Словарь с информацией о товаре, должен содержать ключи:
+            - 'image' (str, optional): URL изображения товара. Если отсутствует
+            или пустой - используется текстовое сообщение
+            - 'price' (str): Цена товара
+            - 'link' (str): Ссылка на товар
 
     Returns:
         None: Функция ничего не возвращает
     """
-    try:
-        subprocess.run(["pkill", "-9", "-f", "chromedriver"], check=False)
-        subprocess.run(["pkill", "-9", "-f", "chrome"], check=False)
-    except Exception as e:
-        logging.error("Произошла ошибка при завершении процессов: %s", e)
+    text: str = f"Цена: {product['price']}\nСсылка: {product['link']}"
+    notifier.send(text, product["image"] or None)
 
 
-def quit_driver_and_reap_children() -> None:
+def add_url(url: str) -> bool:
     """
-    Отчищает систему от зависших зомби-процессов
+    URL добавляется в индекс sent_products (если его там нет)
+    или возвращает False.
 
     Примечания:
-    - Если процессов нет,
-    то завершает цикл и выходит из функции
+    - sent_products (DedupIndex) хранит не больше LAST_ITEMS_MAX_SIZE
+    хешей ссылок, вытесняются те, что дольше всех не встречались.
+    - Потокобезопасна: воркеры пишут в общий индекс под urls_lock.
 
     Args:
-        - 'pid' (int): pid процесса в системе
+        - 'url' (str): URL ссылка на товар
 
     Returns:
-        None: Функция ничего не возвращает
+        Bool: Функция возвращает Истина или Лож в зависимости от выполнения условия
     """
-    try:
-        while True:
-            pid, _ = os.waitpid(-1, os.WNOHANG)
-            if pid == 0:
-                break
-    except ChildProcessError:
-        pass
-    except Exception as e:
-        logging.error("Ошибка при очистке зомби-процессов: %s", e)
+    with urls_lock:
+        return sent_products.add(url)
 
 
-def send_product_to_telegram(product: dict) -> None:
+def is_seen(url: str) -> bool:
     """
-    Отправляет информацию о товаре в Telegram-чат, используя метод sendPhoto (если есть изображение)
-    или sendMessage (если изображения нет).
+    Проверяет, есть ли URL в индексе sent_products, не добавляя его.
+    Известная ссылка отмечается как только что встреченная и не
+    вытесняется, пока остается в выдаче.
 
-    Формат сообщения:
-    - Цена: {цена}
-    - Ссылка: {ссылка на товар}
+    Args:
+        - 'url' (str): URL ссылка на товар
+
+    Returns:
+        Bool: Истина, если объявление уже встречалось
+    """
+    with urls_lock:
+        return sent_products.touch(url)
+
+
+def page_url(url: str, page: int) -> str:
+    """
+    Возвращает url страницы поиска с номером страницы page
+
+    Args:
+        - 'url' (str): ссылка на страницу поиска
+        - 'page' (int): номер страницы
+
+    Returns:
+        str: ссылка с параметром page
+    """
+    if PAGE_RE.search(url):
+        return PAGE_RE.sub(lambda match: f"{match.group(1)}page={page}", url)
+    separator: str = "&" if "?" in url else "?"
+    return f"{url}{separator}page={page}"
+
+
+def collect_new_products(
+    url: str,
+    session: Optional[BrowserSession],
+    fast_path: Optional[HttpFastPath],
+    first_iter: bool,
+) -> list:
+    """
+    Инкрементальный обход выдачи: читает карточки, пока не встретит
+    первое уже известное объявление, при необходимости переходит на
+    следующие страницы (page=2...).
 
     Примечания:
-    - Если подпись (caption) превышает 1024 символа, она обрезается до 1020 символов с добавлением "..."
-    - В случае ошибки при отправке сообщения ошибка логируется, но исключение не пробрасывается
+    - Глубина ограничена MAX_PAGES_PER_URL страницами
+    - На первой итерации читается только первая страница
+    (заполнение множества известных объявлений)
+    - Объем работы пропорционален числу новых объявлений,
+    при всплеске новых объявлений ничего не теряется
 
     Args:
-        product (dict): Словарь с информацией о товаре, должен содержать ключи:
-            - 'image' (str, optional): URL изображения товара. Если отсутствует или пустой -
-                                      используется текстовое сообщение
-            - 'price' (str): Цена товара
-            - 'link' (str): Ссылка на товар
+        - 'url' (str): ссылка на страницу поиска
+        - 'session' (BrowserSession, optional): браузер воркера
+        - 'fast_path' (HttpFastPath, optional): http-клиент воркера
+        - 'first_iter' (bool): первая итерация
 
     Returns:
-        None: Функция ничего не возвращает
+        List: новые объявления, от новых к старым
+    """
+    match = PAGE_RE.search(url)
+    start_page: int = int(match.group(2)) if match else 1
+    new_products: list = []
+    for depth in range(MAX_PAGES_PER_URL):
+        current_url: str = url if depth == 0 else page_url(url, start_page + depth)
+        products: list = parse_page(current_url, session, fast_path, limit=None)
+        for position, product in enumerate(products):
+            if is_seen(product["link"]):
+                # более старые карточки страницы остаются в индексе свежими
+                for older in products[position + 1:]:
+                    is_seen(older["link"])
+                logging.info(
+                    "Incremental %s: %s new, stop at page %s",
+                    url, len(new_products), start_page + depth,
+                )
+                return new_products
+            new_products.append(product)
+        if not products or first_iter:
+            break
+        time.sleep(random.uniform(4.0, 6.0))
+
+    logging.info("Incremental %s: %s new", url, len(new_products))
+    return new_products
+
+
+def load_html(driver, url: str) -> Any:
+    """
+    Открывает url в переданном драйвере и возвращает html страницы.
 
-    Raises:
-        Не пробрасывает исключения, но логирует ошибки в следующих случаях:
-        - Ошибка сети или таймаут при обращении к API Telegram
-        - Неожиданная ошибка при формировании запроса
+    Примечания:
+    - Вместо фиксированных пауз ждет появления карточек в
+    #searchResultListWrapper (ReadinessWaiter), по таймауту идет дальше
+    - Если страницу не удалось открыть или получить html, возвращает None
+
+    Args:
+        - 'driver' (BaseCase): драйвер seleniumbase
+        - 'url' (str): ссылка на страницу поиска
+
+    Returns:
+        Any: html код страницы или None
     """
-    if product["image"]:
-        telegram_url: str = (
-            f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendPhoto"
-        )
-        caption: str = f"Цена: {product['price']}\nСсылка: {product['link']}"
-        if len(caption) > 1024:
-            caption: str = caption[:1020] + "..."
-        data: dict = {
-            "chat_id": TELEGRAM_CHAT_ID,
-            "caption": caption,
-            "photo": product["image"],
-        }
-        try:
-            logging.info("send message")
-            send_message = requests.post(telegram_url, data=data, timeout=10)
-            send_message.raise_for_status()
-        except Exception as e:
-            logging.error(f"Ошибка при отправке фото в Telegram: {e}")
-    else:
-        telegram_url: str = (
-            f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-        )
-        text: str = f"Цена: {product['price']}\nСсылка: {product['link']}"
-        data: dict = {"chat_id": TELEGRAM_CHAT_ID, "text": text}
-        try:
-            send_message = requests.post(telegram_url, data=data, timeout=10)
-            send_message.raise_for_status()
-        except Exception as e:
-            logging.error(f"Ошибка при отправке сообщения в Telegram: {e}")
+    waiter = ReadinessWaiter(driver, url)
+    try:
+        driver.open(url)
+    except Exception as e:
+        logging.error("Error driver open %s", e)
+        return None
+    waiter.wait(RESULT_CARD_SELECTOR, budget=5.0, timeout=6.0)
 
+    try:
+        driver.click('button[class*="spg-tour02-end"]', timeout=1)
+    except Exception:
+        pass
 
-def add_url(url: str) -> bool:
+    waiter.wait(
+        RESULT_CARD_SELECTOR, budget=10.0, timeout=12.0, min_items=MAX_PRODUCTS
+    )
+    waiter.log_saved()
+    try:
+        return driver.get_page_source()
+    except Exception as e:
+        logging.error("Error get page source %s", e)
+        return None
+
+
+def extract_products(html: Any, url: str, limit: Optional[int]) -> list:
     """
-    URL добавляется во множество sent_products и в очередь urls_queue (если URL нет в sent_products)
-    или возвращает False.
+    Парсит html страницы поиска через parse_cards. Ищет нужные параметры.
+    Сохраняет их словарем в список.
 
     Примечания:
-    - Если длина очереди превышает максимальное значение,
-    то последний элемент из очереди и из множества удаляется.
+    - Если в html или в container ничего нет, то возвращает пустой список.
 
     Args:
-        - 'url' (str): URL ссылка на товар
-        - 'sent_products' (set): множество найденных объявлений на товар
-        - 'urls_queue' (deque): список найденных объявлений
+        - 'html' (Any): html код страницы сайта
+        - 'url' (str): ссылка на страницу поиска
+        - 'limit' (int, optional): сколько карточек разобрать (None - все)
 
     Returns:
-        Bool: Функция возвращает Истина или Лож в зависимости от выполнения условия
+        List: Функция возвращает список найденных объявлений
     """
-    if url not in sent_products:
-        sent_products.add(url)
-        urls_queue.append(url)
-        if len(urls_queue) > urls_queue.maxlen:
-            old_url = urls_queue.popleft()
-            sent_products.remove(old_url)
-        return True
-    return False
+    if not html:
+        logging.error("HTML страницы не получен")
+        return []
+
+    products: Optional[list] = parse_cards(html, limit)
+    if products is None:
+        logging.info(f"Товары не найдены для {url}")
+        return []
+    return products
 
 
-def parse_page(url: str) -> list:
+def parse_page(
+    url: str,
+    session: Optional[BrowserSession] = None,
+    fast_path: Optional[HttpFastPath] = None,
+    limit: Optional[int] = MAX_PRODUCTS,
+) -> list:
     """
     Заходит, на указанный в url, сайт. Парсит страницу сайта. Ищет нужные параметры.
     Сохраняет их словарем в список.
 
     Примечания:
+    - Если передан fast_path с cookies браузера, страница сначала
+    запрашивается по http без браузера. Браузер используется, только если
+    ответ похож на блокировку или пустую страницу; после браузерной
+    загрузки cookies передаются в fast_path.
+    - Если передана session, страница открывается в долгоживущем браузере
+    сессии, иначе для url запускается отдельный браузер, после закрытия
+    которого добивается только его дерево процессов (lifecycle).
     - Если в html или в container ничего нет, то возвращает пустой список.
 
     Args:
+        - 'url' (str): ссылка на страницу поиска
+        - 'session' (BrowserSession, optional): долгоживущая сессия браузера
+        - 'fast_path' (HttpFastPath, optional): http-клиент с cookies браузера
+        - 'limit' (int, optional): сколько карточек разобрать (None - все)
         - 'html' (none): html код страницы сайта
         - 'user_agent' (str): рандомно сгенерированный user agent
         - 'driver' (BaseCase): драйвер seleniumbase
-        - 'soup' (BeautifulSoup): создает объект BeautifulSoup,
-        который парсит (разбирает) HTML-документ для дальнейшего извлечения данных
-        - 'container': найденные данные из HTML-документа
-        - 'link' (str): ссылка на товар
-        - 'image' (str): изображение товара
-        - 'price' (str): цена товара
 
     Returns:
         List: Функция возвращает список найденных объявлений
@@ -201,80 +325,81 @@ def parse_page(url: str) -> list:
         - Ошибка сети или таймаут при открытии сайта
         - Неожиданная ошибка при формировании запроса
     """
-    html = None
+    if fast_path is not None:
+        html = fast_path.fetch(url)
+        if html:
+            return extract_products(html, url, limit)
+
+    if session is not None:
+        started: float = time.monotonic()
+        try:
+            driver = session.acquire()
+        except Exception as e:
+            logging.error("Error initial driver %s", e)
+            session.release(started, failed=True)
+            return []
+        html = load_html(driver, url)
+        if html and fast_path is not None:
+            fast_path.prime(driver)
+        session.release(started, failed=html is None)
+        return extract_products(html, url, limit)
+
     user_agent: str = ua.random
+    context = SB(
+        browser="chrome",
+        headless=False,
+        incognito=True,
+        uc_cdp=True,
+        agent=user_agent,
+    )
     try:
-        with SB(
-            browser="chrome",
-            headless=False,
-            incognito=True,
-            uc_cdp=True,
-            agent=user_agent,
-        ) as driver:
-            try:
-                driver.open(url)
-                time.sleep(random.uniform(4.0, 6.0))
-            except Exception as e:
-                logging.error("Error driver open %s", e)
-                return []
-
-            try:
-                driver.click('button[class*="spg-tour02-end"]')
-            except Exception:
-                pass
-
-            time.sleep(random.uniform(8.0, 12.0))
-            try:
-                html = driver.get_page_source()
-            except Exception as e:
-                logging.error("Error get page source %s", e)
-
+        driver, handle = lifecycle.launch(context.__enter__)
     except Exception as e:
         logging.error("Error initial driver %s", e)
         return []
+    try:
+        html = load_html(driver, url)
+        if html and fast_path is not None:
+            fast_path.prime(driver)
+    finally:
+        lifecycle.close(handle, lambda: context.__exit__(None, None, None))
 
-    if not html:
-        logging.error("HTML страницы не получен")
-        return []
-
-    soup = BeautifulSoup(html, "html.parser")
-    container = soup.find("div", id="searchResultListWrapper")
+    return extract_products(html, url, limit)
 
-    if not container:
-        logging.info(f"Товары не найдены для {url}")
-        return []
 
-    products: list = []
-    try:
-        links = container.find_all("a", class_="itemCard_inner", href=True)
-        for a_tag in links[:4]:
-            link: str = a_tag["href"]
-            if not link.startswith("http"):
-                link: str = "https://www.2ndstreet.jp" + link
-            else:
-                link: str = url
-
-            img_tag = a_tag.find("img")
-            if img_tag and img_tag.get("src"):
-                image = img_tag["src"]
-                if image.startswith("//"):
-                    image = "https:" + image
-                elif image.startswith("/"):
-                    image = "https://www.2ndstreet.jp" + image
-            else:
-                image = None
+def crawl_urls(
+    urls: list,
+    session: Optional[BrowserSession],
+    fast_path: Optional[HttpFastPath],
+    first_iter: bool,
+) -> None:
+    """
+    Проходит по списку url: получает объявления через parse_page,
+    новые отправляет в send_product_to_telegram (если не первая итерация).
 
-            price_container = a_tag.find(class_="itemCard_price")
-            if price_container:
-                price: str = price_container.text
-            else:
-                price: None = None
+    Примечания:
+    - Каждый воркер держит собственные паузы между url
 
-            products.append({"link": link, "image": image, "price": price})
+    Args:
+        - 'urls' (list): url, назначенные воркеру
+        - 'session' (BrowserSession, optional): браузер воркера
+        - 'fast_path' (HttpFastPath, optional): http-клиент воркера
+        - 'first_iter' (bool): первая итерация (сообщения не отправляются)
 
-        return products
-    except Exception as e:
-        logging.error("Error add new ad %s", e)
+    Returns:
+        None: Функция ничего не возвращает
+    """
+    for url in urls:
+        if INCREMENTAL:
+            products: list = collect_new_products(url, session, fast_path, first_iter)
+        else:
+            products: list = parse_page(url, session, fast_path)
+        for product in products:
+            if not add_url(product["link"]):
+                continue
+            if not first_iter:
+                send_product_to_telegram(product)
+        time.sleep(random.uniform(50.0, 60.0))
 
 
 def main() -> None:
@@ -284,16 +409,30 @@ def main() -> None:
     заходит в send_product_to_telegram (если не первая итерация)
     чтобы отправить сообщение.
 
-    В kill_chromedriver, удаляет все лишние процессы
-    В quit_driver_and_reap_children завершает все зомби процессы
+    Процессы браузеров учитывает lifecycle: при закрытии браузера
+    убивается и забирается только его дерево процессов, чужие chrome
+    на машине не трогаются.
     В rotate_txt_log проверяет размер файла логов.
 
     Примечания:
+    - При SESSION_MODE все URL обслуживает один BrowserSession,
+    браузер перезапускается по лимиту страниц, времени жизни
+    (BROWSER_MAX_AGE_SECONDS) или памяти (BROWSER_MAX_RSS_MB), в конце
+    прохода логируется число запусков браузера и среднее время на URL
+    - При CONCURRENCY > 1 (только вместе с SESSION_MODE) URLS делятся
+    между воркерами, у каждого свой браузер и свои паузы,
+    результаты попадают в общую дедупликацию add_url
+    - При FAST_PATH страницы по возможности берутся по http с cookies
+    браузера (HttpFastPath), браузер остается запасным путем
+    - При INCREMENTAL по каждому url читаются все новые объявления до
+    первого известного (collect_new_products), а не только первые 4
     - Если add_url вернул False, то идет на следующую итерацию
     - После каждой итерации цикла products
     функция засыпает на какое-то время
     - После всех итераций цикла URLS
     функция засыпает на какое-то время
+    - При выходе (в том числе по Ctrl+C или исключению) браузеры
+    сессий закрываются
 
     Args:
         - 'first_iter' (bool): html код страницы сайта
@@ -303,23 +442,79 @@ def main() -> None:
         None: Функция ничего не возвращает
     """
     first_iter: bool = True
-    while True:
-        logging.info("start search ads by url")
-        for url in URLS:
-            products: list = parse_page(url)
-            for product in products:
-                if not add_url(product["link"]):
-                    continue
-                if not first_iter:
-                    send_product_to_telegram(product)
-
-            kill_chromedriver()
-            quit_driver_and_reap_children()
-            time.sleep(random.uniform(50.0, 60.0))
-
-        first_iter: bool = False
-        rotate_txt_log()
-        time.sleep(random.uniform(170.0, 190.0))
+    workers: int = max(1, min(CONCURRENCY, len(URLS))) if SESSION_MODE else 1
+    sessions: list = [
+        BrowserSession(ua.random, SESSION_MAX_PAGES, lifecycle)
+        if SESSION_MODE
+        else None
+        for _ in range(workers)
+    ]
+    fast_paths: list = [
+        HttpFastPath(FAST_PATH_TIMEOUT, FAST_PATH_MAX_FAILURES) if FAST_PATH else None
+        for _ in range(workers)
+    ]
+    executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    try:
+        while True:
+            logging.info("start search ads by url")
+            cycle_started: float = time.monotonic()
+            if executor is None:
+                crawl_urls(URLS, sessions[0], fast_paths[0], first_iter)
+            else:
+                futures: list = [
+                    executor.submit(
+                        crawl_urls,
+                        URLS[i::workers],
+                        sessions[i],
+                        fast_paths[i],
+                        first_iter,
+                    )
+                    for i in range(workers)
+                ]
+                for future in futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logging.error("Worker error %s", e)
+
+            if SESSION_MODE:
+                reports: list = [session.report() for session in sessions]
+                pages: int = sum(report["pages"] for report in reports)
+                busy: float = sum(
+                    report["avg_seconds_per_url"] * report["pages"]
+                    for report in reports
+                )
+                logging.info(
+                    "Cycle done: workers=%s, launches=%s, urls=%s, "
+                    "avg %.1f s/url, cycle %.0f s",
+                    workers,
+                    sum(report["launches"] for report in reports),
+                    pages,
+                    busy / pages if pages else 0.0,
+                    time.monotonic() - cycle_started,
+                )
+            if FAST_PATH:
+                fast_reports: list = [fast_path.report() for fast_path in fast_paths]
+                hits: int = sum(report["hits"] for report in fast_reports)
+                fast_busy: float = sum(
+                    report["avg_seconds_per_url"] * report["hits"]
+                    for report in fast_reports
+                )
+                logging.info(
+                    "Fast path: hits=%s, fallbacks=%s, avg %.2f s/url",
+                    hits,
+                    sum(report["fallbacks"] for report in fast_reports),
+                    fast_busy / hits if hits else 0.0,
+                )
+            first_iter: bool = False
+            rotate_txt_log()
+            time.sleep(random.uniform(170.0, 190.0))
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+        for session in sessions:
+            if session is not None:
+                session.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,15 @@
+"""
+Добавляет корень репозитория в sys.path, чтобы импортировались общие
+модули common.<модуль>.
+
+Примечания:
+- Импортируется первым среди локальных модулей, до импортов из common.
+"""
+
+import os
+import sys
+
+ROOT_DIR: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+if ROOT_DIR not in sys.path:
+    sys.path.append(ROOT_DIR)
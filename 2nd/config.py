@@ -1,7 +1,17 @@
+from typing import Optional
+
 from selenium.webdriver.chrome.options import Options
 
+from param import URLS
+
 TELEGRAM_BOT_TOKEN = ""
 TELEGRAM_CHAT_ID = ""
+# Очередь отправки в Telegram: сколько сообщений ждут фонового потока
+TELEGRAM_QUEUE_SIZE: int = 200
+# Сколько фото в очереди отправлять по одному, больше - альбомами
+TELEGRAM_ALBUM_THRESHOLD: int = 3
+# Минимальный интервал между запросами к Telegram, секунд
+TELEGRAM_MIN_INTERVAL: float = 1.0
 
 options = Options()
 options.add_argument("--headless")
@@ -10,3 +20,30 @@ options.add_argument("--disable-gpu")
 options.add_argument("--disable-dev-shm-usage")
 options.add_experimental_option("excludeSwitches", ["enable-automation"])
 options.add_experimental_option("useAutomationExtension", False)
+
+# Один долгоживущий браузер на весь проход по URLS
+SESSION_MODE: bool = True
+# Через сколько страниц браузер перезапускается
+SESSION_MAX_PAGES: int = 25
+# Число параллельных воркеров (у каждого свой браузер), работает с SESSION_MODE
+CONCURRENCY: int = 1
+# Запрашивать страницы по http с cookies браузера, браузер - запасной путь
+FAST_PATH: bool = True
+FAST_PATH_TIMEOUT: float = 10.0
+# Сколько неудач подряд до повторного получения cookies через браузер
+FAST_PATH_MAX_FAILURES: int = 3
+# Читать выдачу до первого известного объявления, а не только первые 4
+INCREMENTAL: bool = True
+# Сколько страниц выдачи (page=2...) можно пройти за один url
+MAX_PAGES_PER_URL: int = 3
+# Максимальное время жизни одного браузера, затем перезапуск
+BROWSER_MAX_AGE_SECONDS: float = 3600.0
+# Максимальная память дерева процессов браузера (chromedriver + chrome)
+BROWSER_MAX_RSS_MB: float = 2048.0
+# Сколько карточек на одной странице выдачи 2ndStreet
+ITEMS_PER_PAGE: int = 30
+# Размер индекса отправленных ссылок: все, что видно за проход
+# (URL × карточек на странице × MAX_PAGES_PER_URL) с двукратным запасом
+LAST_ITEMS_MAX_SIZE: int = len(URLS) * ITEMS_PER_PAGE * MAX_PAGES_PER_URL * 2
+# Время жизни записи в индексе отправленных ссылок (None - только по размеру)
+DEDUP_TTL_SECONDS: Optional[float] = None
@@ -0,0 +1,158 @@
+import logging
+import time
+from typing import Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+BLOCK_MARKERS: tuple = (
+    "cf-chl",
+    "challenge-platform",
+    "Just a moment",
+    "captcha",
+    "Access Denied",
+)
+RESULT_MARKER: str = "searchResultListWrapper"
+
+
+class HttpFastPath:
+    """
+    Быстрый путь получения страниц поиска 2ndstreet без браузера.
+
+    Браузер нужен только чтобы получить cookies и заголовки сессии
+    (prime). Дальше страницы поиска запрашиваются через пул соединений
+    requests.Session с этими cookies. Если ответ похож на блокировку или
+    пустую страницу, fetch возвращает None и url обрабатывается браузером.
+    После max_failures неудач подряд cookies сбрасываются до следующего prime.
+
+    Args:
+        - 'timeout' (float): таймаут запроса в секундах
+        - 'max_failures' (int): число неудач подряд до сброса cookies
+        - 'pool_size' (int): размер пула соединений
+    """
+
+    def __init__(self, timeout: float, max_failures: int, pool_size: int = 4):
+        self.timeout: float = timeout
+        self.max_failures: int = max_failures
+        self.failures: int = 0
+        self.primed: bool = False
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.hits: int = 0
+        self.fallbacks: int = 0
+        self.seconds: float = 0.0
+
+    def prime(self, driver: Any) -> None:
+        """
+        Переносит cookies и User-Agent из браузера в http-сессию
+
+        Args:
+            - 'driver' (BaseCase): драйвер seleniumbase с открытой страницей сайта
+        """
+        try:
+            cookies: list = driver.get_cookies()
+            user_agent: str = driver.execute_script("return navigator.userAgent;")
+        except Exception as e:
+            logging.warning("Fast path prime failed: %s", e)
+            return
+
+        self.session.cookies.clear()
+        for cookie in cookies:
+            self.session.cookies.set(
+                cookie["name"],
+                cookie["value"],
+                domain=cookie.get("domain"),
+                path=cookie.get("path", "/"),
+            )
+        self.session.headers.update(
+            {
+                "User-Agent": user_agent,
+                "Accept": "text/html,application/xhtml+xml,"
+                "application/xml;q=0.9,*/*;q=0.8",
+                "Accept-Language": "ja,en-US;q=0.9,en;q=0.8",
+                "Referer": "https://www.2ndstreet.jp/",
+            }
+        )
+        self.primed = True
+        self.failures = 0
+
+    @staticmethod
+    def looks_blocked(response: requests.Response) -> bool:
+        """
+        Проверяет, похож ли ответ на блокировку или пустую страницу
+
+        Args:
+            - 'response' (Response): ответ сервера
+
+        Returns:
+            bool: True если страницу нужно получить через браузер
+        """
+        if response.status_code != 200:
+            return True
+        text: str = response.text
+        if RESULT_MARKER not in text:
+            return True
+        return any(marker in text for marker in BLOCK_MARKERS)
+
+    def fetch(self, url: str) -> Optional[str]:
+        """
+        Запрашивает страницу поиска через http-сессию
+
+        Примечания:
+        - Если сессия не подготовлена (prime), сразу возвращает None
+
+        Args:
+            - 'url' (str): ссылка на страницу поиска
+
+        Returns:
+            str|None: html страницы или None, если нужен браузер
+        """
+        if not self.primed:
+            return None
+
+        started: float = time.monotonic()
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+            blocked: bool = self.looks_blocked(response)
+        except Exception as e:
+            logging.warning("Fast path error for %s: %s", url, e)
+            response = None
+            blocked = True
+        elapsed: float = time.monotonic() - started
+
+        if blocked:
+            self.fallbacks += 1
+            self.failures += 1
+            logging.info(
+                "Fast path blocked for %s (status %s), fallback to browser",
+                url,
+                getattr(response, "status_code", None),
+            )
+            if self.failures >= self.max_failures:
+                self.primed = False
+            return None
+
+        self.failures = 0
+        self.hits += 1
+        self.seconds += elapsed
+        logging.info("Fast path %s in %.2f s", url, elapsed)
+        return response.text
+
+    def report(self) -> dict:
+        """
+        Возвращает статистику быстрого пути и обнуляет счетчики
+
+        Returns:
+            dict: hits, fallbacks, avg_seconds_per_url
+        """
+        stats: dict = {
+            "hits": self.hits,
+            "fallbacks": self.fallbacks,
+            "avg_seconds_per_url": self.seconds / self.hits if self.hits else 0.0,
+        }
+        self.hits = 0
+        self.fallbacks = 0
+        self.seconds = 0.0
+        return stats
@@ -0,0 +1,112 @@
+import logging
+import re
+from typing import Any, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+
+    HTML_PARSER: str = "lxml"
+except ImportError:
+    HTML_PARSER: str = "html.parser"
+
+BASE_URL: str = "https://www.2ndstreet.jp"
+CONTAINER_RE = re.compile(r'<div\b[^>]*\bid=["\']searchResultListWrapper["\']')
+CARD_RE = re.compile(r'<a\b[^>]*\bclass=["\'][^"\']*\bitemCard_inner(?=[\s"\'])')
+CONTAINER_STRAINER = SoupStrainer("div", id="searchResultListWrapper")
+
+
+def slice_cards(html: str, limit: Optional[int]) -> Optional[str]:
+    """
+    Вырезает из html только контейнер результатов и первые limit карточек.
+
+    Примечания:
+    - Если контейнера нет, возвращает None
+    - Все после начала карточки номер limit + 1 отбрасывается,
+    незакрытые теги парсер закрывает сам
+    - limit=None оставляет все карточки
+
+    Args:
+        - 'html' (str): html код страницы
+        - 'limit' (int, optional): сколько карточек нужно
+
+    Returns:
+        str|None: фрагмент html или None
+    """
+    container = CONTAINER_RE.search(html)
+    if not container:
+        return None
+    end: int = len(html)
+    if limit is not None:
+        for index, card in enumerate(CARD_RE.finditer(html, container.start())):
+            if index == limit:
+                end = card.start()
+                break
+    return html[container.start():end]
+
+
+def parse_cards(html: Any, limit: Optional[int] = 4) -> Optional[list]:
+    """
+    Парсит карточки товаров со страницы поиска 2ndstreet.
+
+    Строит дерево только для #searchResultListWrapper (SoupStrainer)
+    и только для первых limit карточек, а не для всей страницы.
+
+    Примечания:
+    - Если контейнера нет, возвращает None
+    - Относительные ссылки и картинки приводятся к абсолютным адресам,
+    абсолютные ссылки карточек остаются как есть (прежний разбор в
+    2ndstreet.py заменял их ссылкой на страницу поиска, и все такие
+    карточки склеивались при дедупликации в одну)
+    - Сигнатура та же, что у parse_cards goofish; kindal дополнительно
+    принимает ссылку коллекции - она нужна для карточек без ссылки
+
+    Args:
+        - 'html' (Any): html код страницы сайта
+        - 'limit' (int, optional): сколько карточек вернуть (None - все)
+
+    Returns:
+        List|None: список словарей {"link", "image", "price"} или None
+    """
+    fragment: Optional[str] = slice_cards(html, limit)
+    if fragment is None:
+        return None
+
+    soup = BeautifulSoup(fragment, HTML_PARSER, parse_only=CONTAINER_STRAINER)
+    container = soup.find("div", id="searchResultListWrapper")
+    if not container:
+        return None
+
+    products: list = []
+    try:
+        links = container.find_all(
+            "a", class_="itemCard_inner", href=True, limit=limit
+        )
+        for a_tag in links:
+            link: str = a_tag["href"]
+            if not link.startswith("http"):
+                link: str = BASE_URL + link
+
+            img_tag = a_tag.find("img")
+            if img_tag and img_tag.get("src"):
+                image = img_tag["src"]
+                if image.startswith("//"):
+                    image = "https:" + image
+                elif image.startswith("/"):
+                    image = BASE_URL + image
+            else:
+                image = None
+
+            price_container = a_tag.find(class_="itemCard_price")
+            if price_container:
+                price: str = price_container.text
+            else:
+                price: None = None
+
+            products.append({"link": link, "image": image, "price": price})
+    except Exception as e:
+        logging.error("Error add new ad %s", e)
+        return []
+
+    return products
@@ -0,0 +1,161 @@
+import logging
+import time
+from typing import Any
+
+from seleniumbase import SB
+
+import common_path  # noqa: F401
+from common.browser_lifecycle import BrowserLifecycle
+
+
+class BrowserSession:
+    """
+    Долгоживущая сессия браузера SeleniumBase для прохода по всем URL.
+
+    Вместо запуска нового Chrome на каждый URL один браузер обслуживает
+    весь проход по URLS. Между URL контекст очищается (cookies, storage,
+    about:blank). Браузер пересоздается только если:
+    - не прошла проверка работоспособности (health check)
+    - исчерпан лимит страниц (max_pages)
+    - превышен лимит времени жизни или памяти (lifecycle)
+
+    При закрытии добиваются только процессы этого браузера.
+
+    Args:
+        - 'agent' (str): User-Agent, с которым запускается браузер
+        - 'max_pages' (int): сколько страниц обслуживает один браузер
+        - 'lifecycle' (BrowserLifecycle): учет процессов браузеров
+
+    Атрибуты статистики:
+        - 'launches' (int): число запусков браузера
+        - 'pages' (int): число открытых страниц
+        - 'busy_seconds' (float): суммарное время обработки страниц
+    """
+
+    def __init__(
+        self, agent: str, max_pages: int, lifecycle: BrowserLifecycle
+    ) -> None:
+        self.agent: str = agent
+        self.max_pages: int = max_pages
+        self.lifecycle: BrowserLifecycle = lifecycle
+        self.driver: Any = None
+        self._context: Any = None
+        self._handle: Any = None
+        self._pages_left: int = 0
+        self.launches: int = 0
+        self.pages: int = 0
+        self.busy_seconds: float = 0.0
+
+    def _launch(self) -> None:
+        """Запускает новый браузер"""
+        self._context = SB(
+            browser="chrome",
+            headless=False,
+            incognito=True,
+            uc_cdp=True,
+            agent=self.agent,
+        )
+        try:
+            self.driver, self._handle = self.lifecycle.launch(
+                self._context.__enter__
+            )
+        except Exception:
+            self._context = None
+            raise
+        self._pages_left = self.max_pages
+        self.launches += 1
+        logging.info("Browser launched (#%s)", self.launches)
+
+    def close(self) -> None:
+        """Закрывает браузер, ошибки при закрытии логируются"""
+        if self._context is None:
+            return
+        context = self._context
+        try:
+            self.lifecycle.close(
+                self._handle, lambda: context.__exit__(None, None, None)
+            )
+        finally:
+            self._context = None
+            self._handle = None
+            self.driver = None
+
+    def is_healthy(self) -> bool:
+        """Проверяет, что браузер жив и отвечает на команды"""
+        if self.driver is None:
+            return False
+        try:
+            return self.driver.execute_script("return 1;") == 1
+        except Exception as e:
+            logging.warning("Browser health check failed: %s", e)
+            return False
+
+    def reset_context(self) -> None:
+        """
+        Очищает контекст между URL: cookies, localStorage,
+        sessionStorage и текущую страницу
+        """
+        try:
+            self.driver.delete_all_cookies()
+            self.driver.execute_script(
+                "window.localStorage.clear(); window.sessionStorage.clear();"
+            )
+        except Exception as e:
+            logging.warning("Error reset browser context %s", e)
+        try:
+            self.driver.open("about:blank")
+        except Exception as e:
+            logging.warning("Error open about:blank %s", e)
+
+    def acquire(self) -> Any:
+        """
+        Возвращает рабочий драйвер для следующего URL.
+        Пересоздает браузер, если он не отвечает, исчерпан лимит страниц
+        или превышены лимиты времени жизни и памяти.
+
+        Returns:
+            Any: драйвер seleniumbase
+        """
+        reason = self.lifecycle.over_limits(self._handle)
+        if reason:
+            logging.info("Browser recycled: %s", reason)
+        if self._pages_left <= 0 or reason or not self.is_healthy():
+            self.close()
+            self._launch()
+        self._pages_left -= 1
+        self.pages += 1
+        return self.driver
+
+    def release(self, started: float, failed: bool = False) -> None:
+        """
+        Завершает обработку URL: учитывает время и очищает контекст.
+        При ошибке браузер закрывается и будет перезапущен.
+
+        Args:
+            - 'started' (float): time.monotonic() начала обработки URL
+            - 'failed' (bool): была ли ошибка при обработке
+        """
+        self.busy_seconds += time.monotonic() - started
+        if failed:
+            self.close()
+        elif self.driver is not None:
+            self.reset_context()
+
+    def report(self) -> dict:
+        """
+        Возвращает статистику сессии и обнуляет счетчики
+
+        Returns:
+            dict: launches, pages, avg_seconds_per_url
+        """
+        stats: dict = {
+            "launches": self.launches,
+            "pages": self.pages,
+            "avg_seconds_per_url": (
+                self.busy_seconds / self.pages if self.pages else 0.0
+            ),
+        }
+        self.launches = 0
+        self.pages = 0
+        self.busy_seconds = 0.0
+        return stats
@@ -0,0 +1,202 @@
+"""
+Микро-бенчмарк разбора выдачи: полный BeautifulSoup всей страницы
+против parsing.parse_cards (только контейнер и первые N карточек).
+
+Запуск на сохраненных страницах:
+    python benchmarks/bench_parsing.py 2nd page1.html page2.html
+    python benchmarks/bench_parsing.py kindal collection.html
+    python benchmarks/bench_parsing.py goofish search.html
+
+Для каждой страницы печатает CPU-время и пиковую память (tracemalloc)
+обоих вариантов и проверяет, что результаты совпадают.
+
+full_parse_* - копии разбора из исходных скриптов парсеров. Намеренные
+расхождения:
+- прежний 2ndstreet заменял абсолютную ссылку карточки ссылкой на страницу
+поиска, parse_cards оставляет ее как есть, поэтому на страницах
+с абсолютными ссылками 2nd печатает same=False
+- goofish и kindal parse_cards приводят ссылку к канонической (item_link:
+item?id=N и /products/<handle>), поэтому перед сравнением ссылки прежнего
+разбора приводятся к тому же виду
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from bs4 import BeautifulSoup
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SITES: dict = {
+    "2nd": "https://www.2ndstreet.jp/search?keyword=bench&sortBy=arrival",
+    "kindal": "https://shop.kind.co.jp/collections/bench",
+    "goofish": "https://www.goofish.com/search?q=bench",
+}
+
+
+def load_parsing(site: str) -> Any:
+    """Загружает parsing.py из каталога парсера под уникальным именем"""
+    # parsing.py goofish импортирует соседний planner.py
+    sys.path.insert(0, os.path.join(ROOT, site))
+    path: str = os.path.join(ROOT, site, "parsing.py")
+    spec = importlib.util.spec_from_file_location(f"parsing_{site}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def full_parse_2nd(html: str, url: str) -> list:
+    """Разбор 2ndstreet как раньше: дерево всей страницы"""
+    soup = BeautifulSoup(html, "html.parser")
+    container = soup.find("div", id="searchResultListWrapper")
+    if not container:
+        return []
+    products: list = []
+    for a_tag in container.find_all("a", class_="itemCard_inner", href=True)[:4]:
+        link: str = a_tag["href"]
+        if not link.startswith("http"):
+            link = "https://www.2ndstreet.jp" + link
+        else:
+            link = url
+        img_tag = a_tag.find("img")
+        image = None
+        if img_tag and img_tag.get("src"):
+            image = img_tag["src"]
+            if image.startswith("//"):
+                image = "https:" + image
+            elif image.startswith("/"):
+                image = "https://www.2ndstreet.jp" + image
+        price_container = a_tag.find(class_="itemCard_price")
+        price = price_container.text if price_container else None
+        products.append({"link": link, "image": image, "price": price})
+    return products
+
+
+def full_parse_kindal(html: str, url: str) -> list:
+    """Разбор kind.co.jp как раньше: дерево всей страницы"""
+    soup = BeautifulSoup(html, "html.parser")
+    products: list = []
+    for element in soup.select("div.boost-sd__product-item")[:4]:
+        a_tag = element.find("a", class_="boost-sd__product-link", href=True)
+        link: str = url
+        if a_tag:
+            link = a_tag["href"]
+            if not link.startswith("http"):
+                link = "https://shop.kind.co.jp" + link
+        img_tag = element.find("img", class_="boost-sd__product-image-img--main")
+        image = None
+        if img_tag:
+            image = img_tag.get("src")
+            if image and image.startswith("//"):
+                image = "https:" + image
+        price_container = element.find("div", class_="boost-sd__product-price")
+        price = (
+            price_container.get_text(strip=True)
+            if price_container
+            else "Цена не найдена"
+        )
+        products.append({"link": link, "image": image, "price": price})
+    return products
+
+
+def full_parse_goofish(html: str, url: str) -> list:
+    """Разбор goofish как раньше: дерево всей страницы"""
+    soup = BeautifulSoup(html, "html.parser")
+    container = soup.find("div", class_="feeds-list-container--UkIMBPNk")
+    if not container:
+        return []
+    products: list = []
+    links = container.find_all("a", class_="feeds-item-wrap--rGdH_KoF", href=True)
+    for a_tag in links[:4]:
+        link: str = a_tag["href"]
+        if not link.startswith("http"):
+            link = "https://www.goofish.com/" + link
+        img_tag = a_tag.find("img")
+        image = None
+        if img_tag and img_tag.get("src"):
+            image = img_tag["src"]
+            if image.startswith("//"):
+                image = "https:" + image
+            elif image.startswith("/"):
+                image = "https://www.goofish.com/" + image
+        price_container = a_tag.find(class_="price-wrap--YzmU5cUl")
+        price = None
+        if price_container:
+            price = (
+                price_container.find(class_="number--NKh1vXWM").text.strip()
+                + price_container.find(class_="sign--x6uVdG3X").text.strip()
+            )
+        products.append({"link": link, "image": image, "price": price})
+    return products
+
+
+def scoped_parser(site: str, module: Any) -> Callable:
+    """Возвращает parse_cards нужного парсера с сигнатурой (html, url)"""
+    if site == "kindal":
+        return lambda html, url: module.parse_cards(html, url, 4)
+    return lambda html, url: module.parse_cards(html, 4) or []
+
+
+def measure(func: Callable, html: str, url: str, repeat: int) -> tuple:
+    """
+    Измеряет CPU-время одного вызова (среднее) и пиковую память
+
+    Returns:
+        tuple: (результат, секунды CPU, пик памяти в байтах)
+    """
+    tracemalloc.start()
+    result = func(html, url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started: float = time.process_time()
+    for _ in range(repeat):
+        func(html, url)
+    cpu: float = (time.process_time() - started) / repeat
+    return result, cpu, peak
+
+
+def main() -> int:
+    """Точка входа бенчмарка"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("site", choices=sorted(SITES))
+    parser.add_argument("pages", nargs="+", help="сохраненные html страницы")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    full: Callable = globals()[f"full_parse_{args.site}"]
+    module: Any = load_parsing(args.site)
+    scoped: Callable = scoped_parser(args.site, module)
+    url: str = SITES[args.site]
+    mismatches: int = 0
+
+    for page in args.pages:
+        with open(page, "r", encoding="utf-8") as f:
+            html: str = f.read()
+        full_result, full_cpu, full_peak = measure(full, html, url, args.repeat)
+        scoped_result, scoped_cpu, scoped_peak = measure(
+            scoped, html, url, args.repeat
+        )
+        if hasattr(module, "item_link"):
+            full_result = [
+                {**product, "link": module.item_link(product["link"])}
+                for product in full_result
+            ]
+        same: bool = full_result == scoped_result
+        mismatches += not same
+        print(
+            f"{os.path.basename(page)}: "
+            f"cpu {full_cpu * 1000:.1f} -> {scoped_cpu * 1000:.1f} ms "
+            f"(saved {(full_cpu - scoped_cpu) * 1000:.1f} ms), "
+            f"peak {full_peak / 1024:.0f} -> {scoped_peak / 1024:.0f} KiB "
+            f"(saved {(full_peak - scoped_peak) / 1024:.0f} KiB), "
+            f"cards {len(scoped_result)}, same={same}"
+        )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,105 @@
+"""
+Soak-тест индекса отправленных ссылок: миллионы уникальных ссылок
+через common.dedup.DedupIndex и, для сравнения, через прежнюю пару set + deque.
+
+    python benchmarks/soak_dedup.py --urls 2000000 --max-size 2000
+
+Память (tracemalloc) снимается после каждой порции ссылок. После
+заполнения индекса и одной полной смены ссылок (2 × max-size, словарь
+индекса к этому времени достигает рабочего размера) она должна оставаться
+ровной: если в конце она больше, чем в этой точке, более чем на tolerance,
+код выхода 1.
+"""
+import argparse
+import importlib.util
+import os
+import sys
+import time
+import tracemalloc
+from collections import deque
+from typing import Any, Callable
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_dedup() -> Any:
+    """Загружает dedup.py из общего каталога common"""
+    path: str = os.path.join(ROOT, "common", "dedup.py")
+    spec = importlib.util.spec_from_file_location("dedup", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_add_url(max_size: int) -> Callable:
+    """Прежний add_url: множество строк и deque(maxlen)"""
+    sent_products: set = set()
+    urls_queue: deque = deque(maxlen=max_size)
+
+    def add_url(url: str) -> bool:
+        if url not in sent_products:
+            sent_products.add(url)
+            urls_queue.append(url)
+            if len(urls_queue) > urls_queue.maxlen:
+                old_url = urls_queue.popleft()
+                sent_products.remove(old_url)
+            return True
+        return False
+
+    return add_url
+
+
+def soak(add_url: Callable, urls: int, max_size: int, samples: int) -> list:
+    """
+    Добавляет urls уникальных ссылок и снимает память
+
+    Returns:
+        list: (число ссылок, текущая память в байтах) после каждой порции
+    """
+    chunk: int = max(1, urls // samples)
+    points: list = []
+    tracemalloc.start()
+    for i in range(urls):
+        add_url(f"https://www.goofish.com/item?id={i:012d}&categoryId=126862528")
+        if (i + 1) % chunk == 0 or i + 1 in (max_size, 2 * max_size):
+            points.append((i + 1, tracemalloc.get_traced_memory()[0]))
+    tracemalloc.stop()
+    return points
+
+
+def main() -> int:
+    """Точка входа soak-теста"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--urls", type=int, default=2_000_000)
+    parser.add_argument("--max-size", type=int, default=2000)
+    parser.add_argument("--ttl", type=float, default=None)
+    parser.add_argument("--samples", type=int, default=10)
+    parser.add_argument("--tolerance", type=float, default=0.05)
+    parser.add_argument("--legacy", action="store_true", help="прогнать set + deque")
+    args = parser.parse_args()
+
+    if args.legacy:
+        add_url: Callable = legacy_add_url(args.max_size)
+    else:
+        index = load_dedup().DedupIndex(args.max_size, args.ttl)
+        add_url = index.add
+
+    started: float = time.perf_counter()
+    points: list = soak(add_url, args.urls, args.max_size, args.samples)
+    elapsed: float = time.perf_counter() - started
+    for count, current in points:
+        print(f"{count:>10} urls: {current / 1024:8.0f} KiB")
+
+    filled: list = [
+        current for count, current in points if count >= 2 * args.max_size
+    ]
+    growth: float = filled[-1] / filled[0] - 1 if filled and filled[0] else 0.0
+    print(
+        f"{args.urls / elapsed:.0f} adds/s, "
+        f"growth after fill {growth * 100:+.1f}%"
+    )
+    return 1 if growth > args.tolerance else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
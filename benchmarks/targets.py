@@ -0,0 +1,397 @@
+"""
+Цели бенчмарка: как загрузить код парсера, как прогнать через него одну
+записанную страницу (без сети и браузера) и как записать страницу вживую.
+
+Каждая цель работает в отдельном процессе с каталогом парсера в sys.path,
+потому что у парсеров одинаковые имена модулей (config, parsing). Общие
+модули парсеров импортируются из common/ в корне репозитория.
+"""
+import asyncio
+import importlib.util
+import json
+import os
+import sys
+import time
+from contextlib import redirect_stdout
+from typing import Any, Callable
+from urllib.parse import urlencode
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+
+def load_module(directory: str, filename: str, name: str) -> Any:
+    """
+    Импортирует скрипт парсера как модуль
+
+    Args:
+        - 'directory' (str): каталог парсера
+        - 'filename' (str): имя файла скрипта
+        - 'name' (str): имя модуля
+
+    Returns:
+        Any: загруженный модуль
+    """
+    path: str = os.path.join(ROOT, directory)
+    sys.path.insert(0, path)
+    spec = importlib.util.spec_from_file_location(name, os.path.join(path, filename))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+class StubDriver:
+    """Драйвер без браузера: отдает записанный html"""
+
+    def __init__(self) -> None:
+        self.html: str = ""
+
+    def open(self, url: str) -> None:
+        pass
+
+    def get(self, url: str) -> None:
+        pass
+
+    def click(self, *args, **kwargs) -> None:
+        raise RuntimeError("no element in stub driver")
+
+    def execute_script(self, *args) -> int:
+        return 1000
+
+    def get_page_source(self) -> str:
+        return self.html
+
+    @property
+    def page_source(self) -> str:
+        return self.html
+
+
+class StubBot:
+    """Telegram-бот без сети"""
+
+    def __init__(self, *args, **kwargs) -> None:
+        pass
+
+    def send_message(self, *args, **kwargs) -> None:
+        pass
+
+    def send_photo(self, *args, **kwargs) -> None:
+        pass
+
+
+class StubSession:
+    """Сессия браузера 2ndstreet без браузера"""
+
+    def __init__(self) -> None:
+        self.driver = StubDriver()
+
+    def acquire(self) -> StubDriver:
+        return self.driver
+
+    def release(self, started: float, failed: bool = False) -> None:
+        pass
+
+
+def browser_html(url: str, selector: str, headless: bool = True) -> str:
+    """
+    Открывает страницу в undetected chromedriver и возвращает html,
+    когда появилась выдача (для записи фикстур)
+    """
+    import undetected_chromedriver as uc
+    from common.waits import ReadinessWaiter
+
+    options = uc.ChromeOptions()
+    options.headless = headless
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    driver = uc.Chrome(options=options)
+    try:
+        driver.get(url)
+        ReadinessWaiter(driver, url).wait(selector, budget=0.0, timeout=30.0)
+        return driver.page_source
+    finally:
+        driver.quit()
+
+
+class Target:
+    """
+    Цель бенчмарка.
+
+    Атрибуты:
+        - 'name' (str): имя цели и архива фикстур
+        - 'directory' (str): каталог парсера
+    """
+
+    name: str = ""
+    directory: str = ""
+
+    def load(self) -> None:
+        """Импортирует код парсера и заменяет сеть и браузер заглушками"""
+        raise NotImplementedError
+
+    def runner(self) -> Callable:
+        """Возвращает функцию (запись фикстуры) -> число товаров"""
+        raise NotImplementedError
+
+    def check(self, records: list) -> list:
+        """
+        Проверяет корректность разбора фикстур (не только скорость)
+
+        Returns:
+            list: описания ошибок (пустой список - ошибок нет)
+        """
+        return []
+
+    def sources(self) -> list:
+        """Источники для записи по умолчанию"""
+        raise NotImplementedError
+
+    def record(self, source: Any) -> dict:
+        """Записывает одну живую страницу в запись фикстуры"""
+        raise NotImplementedError
+
+
+class SecondStreetTarget(Target):
+    """2ndstreet: parse_page с сессией-заглушкой"""
+
+    name = "2nd"
+    directory = "2nd"
+
+    def load(self) -> None:
+        self.module = load_module(self.directory, "2ndstreet.py", "secondstreet")
+        self.module.ReadinessWaiter.jitter = lambda self: None
+
+    def runner(self) -> Callable:
+        session = StubSession()
+
+        def run(record: dict) -> int:
+            session.driver.html = record["body"]
+            return len(self.module.parse_page(record["source"], session, None))
+
+        return run
+
+    def sources(self) -> list:
+        return self.module.URLS[:5]
+
+    def record(self, source: str) -> dict:
+        session = self.module.BrowserSession(
+            self.module.ua.random, 1, self.module.lifecycle
+        )
+        try:
+            html: str = self.module.load_html(session.acquire(), source)
+        finally:
+            session.close()
+        return {"source": source, "body": html}
+
+
+class KindalTarget(Target):
+    """kind.co.jp: разбор выдачи из fetch_data_sync"""
+
+    name = "kindal"
+    directory = "kindal"
+
+    def load(self) -> None:
+        self.module = load_module(self.directory, "kindal.py", "kindal")
+
+    def runner(self) -> Callable:
+        def run(record: dict) -> int:
+            return len(
+                self.module.parse_cards(
+                    record["body"], record["source"], self.module.MAX_PRODUCTS
+                )
+            )
+
+        return run
+
+    def sources(self) -> list:
+        return self.module.URLS[:5]
+
+    def record(self, source: str) -> dict:
+        html: str = browser_html(source, self.module.PRODUCT_SELECTOR)
+        return {"source": source, "body": html}
+
+
+class GoofishTarget(Target):
+    """
+    goofish: handle_products(parse_cards) с отправкой в Telegram-заглушку,
+    для записей kind="api" - разбор перехваченного ответа поискового API
+    """
+
+    name = "goofish"
+    directory = "goofish"
+
+    def load(self) -> None:
+        import telebot
+
+        telebot.TeleBot = StubBot
+        self.module = load_module(self.directory, "goofish.py", "goofish")
+        from capture import parse_search_response, to_product
+
+        self.parse_search_response = parse_search_response
+        self.to_product = to_product
+        self.sent: list = []
+        self.module.send_product_to_telegram = self.sent.append
+
+    def reset(self) -> None:
+        self.sent.clear()
+        self.module.urls_set.clear()
+
+    def runner(self) -> Callable:
+        def run(record: dict) -> int:
+            self.reset()
+            if record.get("kind") == "api":
+                products: list = self.parse_search_response(record["body"]) or []
+            else:
+                products = self.module.parse_cards(
+                    record["body"], self.module.MAX_PRODUCTS
+                )
+            self.module.handle_products(products, False)
+            return len(self.sent)
+
+        return run
+
+    def check(self, records: list) -> list:
+        """
+        Товар из html выдачи и тот же товар из ответа API должны давать
+        одну ссылку и один ключ дедупликации (item_key), иначе при
+        переключении между ними товары уходят в Telegram повторно
+        """
+        problems: list = []
+        for record in records:
+            if record.get("kind") == "api":
+                continue
+            for product in self.module.parse_cards(record["body"], None):
+                key: str = self.module.item_key(product["link"])
+                main: dict = {"exContent": {"itemId": key}}
+                captured: dict = self.to_product({"data": {"item": {"main": main}}})
+                if (
+                    product["link"] != captured["link"]
+                    or key != self.module.item_key(captured["link"])
+                ):
+                    problems.append(
+                        f"html link {product['link']} != api link {captured['link']}"
+                    )
+        return problems
+
+    def sources(self) -> list:
+        return self.module.params_list[:5]
+
+    def record(self, source: str) -> dict:
+        html: str = browser_html(
+            source, self.module.FEEDS_ITEM_SELECTOR, headless=False
+        )
+        return {"source": source, "body": html}
+
+
+class FruitTarget(Target):
+    """FruitsFamily: view_products / view_brand_product на записанном GraphQL"""
+
+    name = "fruit"
+    directory = "fruitfsfamily"
+
+    def load(self) -> None:
+        self.module = load_module(self.directory, "fruit.py", "fruit")
+        # записанные ответы подставляются в поиск по одному фильтру
+        self.module.BATCH_QUERIES = False
+        self.module.WATERMARKS = False
+        self.logged: list = []
+        self.module.save_to_log = self.logged.append
+        self.devnull = open(os.devnull, "w", encoding="utf-8")
+
+    def runner(self) -> Callable:
+        def run(record: dict) -> int:
+            self.logged.clear()
+            self.module.seen_items = set()
+
+            def response(query: str, *page: int) -> Any:
+                return json.loads(record["body"])
+
+            with redirect_stdout(self.devnull):
+                if record["kind"] == "brand":
+                    self.module.SEARCH_BRAND = [record["source"]]
+                    self.module.search_brands = response
+                    self.module.view_brand_product()
+                else:
+                    self.module.SEARCH_TERMS = [record["source"]]
+                    self.module.search_products = response
+                    self.module.view_products()
+            return len(self.logged)
+
+        return run
+
+    def sources(self) -> list:
+        return [("search", term) for term in self.module.SEARCH_TERMS] + [
+            ("brand", brand) for brand in self.module.SEARCH_BRAND[:5]
+        ]
+
+    def record(self, source: Any) -> dict:
+        if isinstance(source, str):
+            kind, _, query = source.partition(":")
+        else:
+            kind, query = source
+        if kind == "brand":
+            search: Callable = self.module.search_brands
+        else:
+            search = self.module.search_products
+        return {"source": query, "kind": kind, "body": json.dumps(search(query))}
+
+
+class VintedTarget(Target):
+    """Vinted: цикл по товарам Parser.worker на записанном api/v2/catalog/items"""
+
+    name = "vinted"
+    directory = "vinted"
+
+    def load(self) -> None:
+        self.module = load_module(self.directory, "vinted.py", "vinted")
+        self.loop = asyncio.new_event_loop()
+
+    def runner(self) -> Callable:
+        parser = self.module.Parser()
+
+        async def broadcast(link: str) -> None:
+            pass
+
+        parser.broadcast_link = broadcast
+
+        def run(record: dict) -> int:
+            parser.urls_set.clear()
+            parser.urls_queue.clear()
+            data_json: dict = json.loads(record["body"])
+            return self.loop.run_until_complete(parser.process_items(data_json, False))
+
+        return run
+
+    def sources(self) -> list:
+        return self.module.Parser().params_list[:3]
+
+    def record(self, source: Any) -> dict:
+        if isinstance(source, str):
+            web_url: str = "https://www.vinted.it/catalog"
+            api_url: str = source
+        else:
+            web_params, api_params = source
+            ts: str = str(int(time.time()))
+            api_params["time"] = ts
+            web_params["time"] = ts
+            web_url = f"https://www.vinted.it/catalog?{urlencode(web_params)}"
+            api_url = (
+                f"https://www.vinted.it/api/v2/catalog/items?{urlencode(api_params)}"
+            )
+        body = self.loop.run_until_complete(
+            self.module.Parser().fetch_api_data(web_url, api_url)
+        )
+        return {"source": api_url, "body": body or ""}
+
+
+TARGETS: dict = {
+    target.name: target
+    for target in (
+        SecondStreetTarget(),
+        KindalTarget(),
+        GoofishTarget(),
+        FruitTarget(),
+        VintedTarget(),
+    )
+}
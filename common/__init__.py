@@ -0,0 +1,8 @@
+"""
+Общие модули парсеров: уведомления в Telegram, ожидание готовности
+страницы, учет процессов браузера, история ссылок и кеш запуска Chrome.
+
+Скрипты парсеров сначала импортируют свой common_path, который добавляет
+корень репозитория в sys.path, и затем импортируют модули как
+common.<модуль>.
+"""
@@ -0,0 +1,391 @@
+import logging
+import os
+import signal
+import threading
+import time
+from typing import Any, Callable, Optional
+
+PROC_DIR: str = "/proc"
+KILL_GRACE_SECONDS: float = 3.0
+# Сколько ждать завершения процессов после SIGKILL, секунд
+KILL_REAP_SECONDS: float = 1.0
+
+
+def read_ppid(pid: int) -> Optional[int]:
+    """
+    Возвращает родительский pid процесса из /proc/<pid>/stat
+
+    Returns:
+        int|None: ppid или None, если процесса нет
+    """
+    try:
+        with open(f"{PROC_DIR}/{pid}/stat", "r", encoding="utf-8") as f:
+            stat: str = f.read()
+    except OSError:
+        return None
+    # имя процесса в скобках может содержать пробелы
+    return int(stat.rsplit(")", 1)[1].split()[1])
+
+
+def pid_alive(pid: int) -> bool:
+    """
+    Работает ли процесс: по полю state из /proc/<pid>/stat
+
+    Примечания:
+    - Зомби (Z) и завершающийся процесс (X) уже не работают, хотя запись
+    в /proc еще есть
+
+    Returns:
+        bool: False, если процесса нет или он уже завершился
+    """
+    try:
+        with open(f"{PROC_DIR}/{pid}/stat", "r", encoding="utf-8") as f:
+            stat: str = f.read()
+    except OSError:
+        return False
+    return stat.rsplit(")", 1)[1].split()[0] not in ("Z", "X")
+
+
+def read_start_time(pid: int) -> Optional[int]:
+    """
+    Возвращает время старта процесса (поле starttime /proc/<pid>/stat):
+    по паре (pid, время старта) процесс не спутать с новым процессом,
+    получившим тот же pid
+
+    Returns:
+        int|None: время старта в тиках или None, если процесса нет
+    """
+    try:
+        with open(f"{PROC_DIR}/{pid}/stat", "r", encoding="utf-8") as f:
+            stat: str = f.read()
+    except OSError:
+        return None
+    return int(stat.rsplit(")", 1)[1].split()[19])
+
+
+def read_rss_kb(pid: int) -> int:
+    """
+    Возвращает резидентную память процесса в килобайтах
+
+    Returns:
+        int: VmRSS или 0, если процесса нет
+    """
+    try:
+        with open(f"{PROC_DIR}/{pid}/status", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def children_map() -> dict:
+    """
+    Строит отображение ppid -> список дочерних pid по /proc
+
+    Returns:
+        dict: дочерние процессы каждого процесса
+    """
+    children: dict = {}
+    for name in os.listdir(PROC_DIR):
+        if not name.isdigit():
+            continue
+        ppid: Optional[int] = read_ppid(int(name))
+        if ppid is not None:
+            children.setdefault(ppid, []).append(int(name))
+    return children
+
+
+def driver_root_pids(driver: Any) -> set:
+    """
+    Находит pid процессов, запущенных драйвером: chromedriver и
+    (для undetected chromedriver) сам браузер
+
+    Args:
+        - 'driver' (Any): selenium webdriver или BaseCase seleniumbase
+
+    Returns:
+        set: корневые pid дерева браузера
+    """
+    pids: set = set()
+    for candidate in (driver, getattr(driver, "driver", None)):
+        if candidate is None:
+            continue
+        try:
+            pids.add(candidate.service.process.pid)
+        except AttributeError:
+            pass
+        browser_pid = getattr(candidate, "browser_pid", None)
+        if isinstance(browser_pid, int):
+            pids.add(browser_pid)
+    return pids
+
+
+def group_alive(pgid: int) -> bool:
+    """Есть ли еще процессы в группе pgid"""
+    try:
+        os.killpg(pgid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class BrowserLifecycle:
+    """
+    Управление жизненным циклом запущенных браузеров.
+
+    Запоминает корневые процессы каждого браузера (chromedriver и chrome)
+    и при завершении убивает и забирает только их дерево процессов, а не все
+    процессы chrome на машине. Поэтому на одной машине могут работать
+    несколько парсеров и несколько воркеров.
+
+    Дерево снимается до driver.quit() (close): после выхода chromedriver
+    осиротевшие процессы chrome переходят к init и обходом дерева уже
+    не находятся. Снимок хранит pid с временем старта и группы процессов,
+    лидеры которых входят в дерево (undetected chromedriver запускает
+    браузер в отдельной сессии, его группа - весь браузер).
+
+    Args:
+        - 'max_age' (float): максимальное время жизни браузера в секундах
+        - 'max_rss_mb' (float): максимальная память дерева браузера в МБ
+    """
+
+    def __init__(self, max_age: float, max_rss_mb: float) -> None:
+        self.max_age: float = max_age
+        self.max_rss_mb: float = max_rss_mb
+        self._browsers: dict = {}
+        self._next_handle: int = 0
+        self._lock = threading.Lock()
+
+    def _own_children(self) -> set:
+        """Прямые дочерние процессы текущего процесса"""
+        return set(children_map().get(os.getpid(), []))
+
+    def launch(self, factory: Callable) -> tuple:
+        """
+        Запускает браузер через factory и регистрирует его процессы.
+
+        Примечания:
+        - Если запуск упал, убивает новые дочерние процессы,
+        появившиеся во время запуска, и пробрасывает исключение
+
+        Args:
+            - 'factory' (Callable): функция без аргументов, создающая драйвер
+
+        Returns:
+            tuple: (драйвер, идентификатор браузера)
+        """
+        before: set = self._own_children()
+        try:
+            driver = factory()
+        except Exception:
+            leftovers: set = self._own_children() - before
+            if leftovers:
+                logging.info("Killing leftovers of failed launch: %s", leftovers)
+                self._kill_pids(leftovers)
+            raise
+        roots: set = driver_root_pids(driver) or (self._own_children() - before)
+        return driver, self.register(roots)
+
+    def register(self, roots: set) -> int:
+        """
+        Регистрирует корневые процессы браузера
+
+        Args:
+            - 'roots' (set): pid chromedriver/chrome
+
+        Returns:
+            int: идентификатор браузера
+        """
+        with self._lock:
+            handle: int = self._next_handle
+            self._next_handle += 1
+            self._browsers[handle] = {
+                "roots": set(roots),
+                "started": time.monotonic(),
+            }
+        logging.info("Browser %s registered, pids %s", handle, sorted(roots))
+        return handle
+
+    def tree(self, handle: int) -> set:
+        """
+        Возвращает все процессы дерева браузера
+
+        Args:
+            - 'handle' (int): идентификатор браузера
+
+        Returns:
+            set: pid корней и всех их потомков
+        """
+        browser: Optional[dict] = self._browsers.get(handle)
+        if browser is None:
+            return set()
+        children: dict = children_map()
+        pids: set = set()
+        stack: list = [pid for pid in browser["roots"] if read_ppid(pid) is not None]
+        while stack:
+            pid: int = stack.pop()
+            if pid in pids:
+                continue
+            pids.add(pid)
+            stack.extend(children.get(pid, []))
+        return pids
+
+    def rss_mb(self, handle: int) -> float:
+        """Суммарная резидентная память дерева браузера в МБ"""
+        return sum(read_rss_kb(pid) for pid in self.tree(handle)) / 1024
+
+    def over_limits(self, handle: int) -> Optional[str]:
+        """
+        Проверяет лимиты времени жизни и памяти браузера
+
+        Returns:
+            str|None: причина превышения или None
+        """
+        browser: Optional[dict] = self._browsers.get(handle)
+        if browser is None:
+            return None
+        age: float = time.monotonic() - browser["started"]
+        if age > self.max_age:
+            return f"age {age:.0f} s > {self.max_age:.0f} s"
+        rss: float = self.rss_mb(handle)
+        if rss > self.max_rss_mb:
+            return f"rss {rss:.0f} MB > {self.max_rss_mb:.0f} MB"
+        return None
+
+    def snapshot(self, handle: int) -> dict:
+        """
+        Снимает дерево браузера до его закрытия
+
+        Args:
+            - 'handle' (int): идентификатор браузера
+
+        Returns:
+            dict: {"pids": {pid: время старта}, "groups": set pgid}
+        """
+        own_group: int = os.getpgrp()
+        pids: dict = {}
+        groups: set = set()
+        for pid in self.tree(handle):
+            started: Optional[int] = read_start_time(pid)
+            if started is None:
+                continue
+            pids[pid] = started
+            try:
+                if os.getpgid(pid) == pid and pid != own_group:
+                    groups.add(pid)
+            except OSError:
+                pass
+        return {"pids": pids, "groups": groups}
+
+    def close(self, handle: Optional[int], quit_driver: Callable) -> None:
+        """
+        Закрывает браузер: снимает дерево, вызывает quit_driver
+        (ошибки логируются) и добивает все процессы снимка
+
+        Args:
+            - 'handle' (int, optional): идентификатор браузера
+            - 'quit_driver' (Callable): закрытие драйвера (driver.quit и т.п.)
+        """
+        snapshot: Optional[dict] = (
+            self.snapshot(handle) if handle is not None else None
+        )
+        try:
+            quit_driver()
+        except Exception as e:
+            logging.error("Error close browser %s", e)
+        if handle is not None:
+            self.kill(handle, snapshot)
+
+    def kill(self, handle: int, snapshot: Optional[dict] = None) -> None:
+        """
+        Завершает дерево процессов браузера и забирает зомби.
+
+        Примечания:
+        - Без snapshot убивает то, что сейчас находится обходом дерева;
+        после driver.quit() нужен снимок, сделанный до него (close)
+
+        Args:
+            - 'handle' (int): идентификатор браузера
+            - 'snapshot' (dict, optional): снимок дерева из snapshot()
+        """
+        pids: set = self.tree(handle)
+        groups: set = set()
+        if snapshot:
+            pids |= {
+                pid
+                for pid, started in snapshot["pids"].items()
+                if read_start_time(pid) == started
+            }
+            groups = {pgid for pgid in snapshot["groups"] if group_alive(pgid)}
+        with self._lock:
+            self._browsers.pop(handle, None)
+        if pids or groups:
+            logging.info(
+                "Killing browser %s tree %s, groups %s",
+                handle,
+                sorted(pids),
+                sorted(groups),
+            )
+            self._kill_pids(pids, groups)
+
+    def kill_all(self) -> None:
+        """Завершает все зарегистрированные браузеры"""
+        for handle in list(self._browsers):
+            self.kill(handle)
+
+    @staticmethod
+    def _kill_pids(pids: set, groups: frozenset = frozenset()) -> None:
+        """
+        Отправляет SIGTERM дереву и группам процессов, через
+        KILL_GRACE_SECONDS - SIGKILL оставшимся, и забирает завершившиеся
+        дочерние процессы
+
+        Примечания:
+        - После каждого сигнала ждет, пока процессы не станут зомби или не
+        исчезнут (после SIGKILL - не дольше KILL_REAP_SECONDS), и забирает
+        их; зомби не считаются работающими
+        """
+        for sig in (signal.SIGTERM, signal.SIGKILL):
+            for pgid in groups:
+                try:
+                    os.killpg(pgid, sig)
+                except ProcessLookupError:
+                    pass
+                except Exception as e:
+                    logging.error("Не удалось завершить группу %s: %s", pgid, e)
+            alive: set = set()
+            for pid in pids:
+                try:
+                    os.kill(pid, sig)
+                    alive.add(pid)
+                except ProcessLookupError:
+                    pass
+                except Exception as e:
+                    logging.error("Не удалось завершить PID %s: %s", pid, e)
+            grace: float = (
+                KILL_GRACE_SECONDS if sig == signal.SIGTERM else KILL_REAP_SECONDS
+            )
+            deadline: float = time.monotonic() + grace
+            while alive and time.monotonic() < deadline:
+                BrowserLifecycle._reap(alive)
+                alive = {pid for pid in alive if pid_alive(pid)}
+                if alive:
+                    time.sleep(0.1)
+            BrowserLifecycle._reap(pids)
+            pids = alive
+            groups = {pgid for pgid in groups if group_alive(pgid)}
+            if not pids and not groups:
+                break
+
+    @staticmethod
+    def _reap(pids: set) -> None:
+        """Забирает завершившиеся процессы из pids, если это наши дочерние"""
+        for pid in pids:
+            try:
+                os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                pass
@@ -0,0 +1,185 @@
+import logging
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import threading
+from typing import Optional
+
+import undetected_chromedriver as uc
+from undetected_chromedriver.patcher import Patcher
+
+# Файлы блокировки профиля, которые нельзя переносить в шаблон
+PROFILE_LOCKS: tuple = ("SingletonLock", "SingletonSocket", "SingletonCookie")
+
+
+class ChromeStartupCache:
+    """
+    Кеш запуска Chrome для undetected chromedriver.
+
+    - Патченный chromedriver хранится в cache_dir отдельно для каждой
+    основной версии Chrome: драйвер скачивается и патчится один раз, следующие
+    запуски получают готовый driver_executable_path
+    - Если включен warm_profile, первый удачный профиль становится шаблоном
+    (cache_dir/profile-template), каждый запуск получает его копию
+    (cp --reflink=auto: на btrfs/xfs копия copy-on-write) с прогретым
+    http-кешем и cookies
+    - Время запуска копится отдельно для холодных и теплых запусков
+
+    Args:
+        - 'cache_dir' (str): каталог кеша
+        - 'warm_profile' (bool): использовать шаблон профиля
+    """
+
+    def __init__(self, cache_dir: str, warm_profile: bool) -> None:
+        self.cache_dir: str = os.path.abspath(cache_dir)
+        self.warm_profile: bool = warm_profile
+        self.template_dir: str = os.path.join(self.cache_dir, "profile-template")
+        self._lock = threading.Lock()
+        self._major: Optional[int] = None
+        self._major_checked: bool = False
+        self.stats: dict = {"cold": [], "warm": []}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def chrome_major(self) -> Optional[int]:
+        """
+        Определяет основную версию установленного Chrome
+
+        Returns:
+            int|None: версия или None, если Chrome не найден
+        """
+        if not self._major_checked:
+            self._major_checked = True
+            try:
+                output: str = subprocess.run(
+                    [uc.find_chrome_executable(), "--version"],
+                    capture_output=True,
+                    text=True,
+                    timeout=10,
+                    check=False,
+                ).stdout
+                self._major = int(re.search(r"(\d+)\.", output).group(1))
+            except Exception as e:
+                logging.warning("Chrome version not detected: %s", e)
+        return self._major
+
+    def driver_path(self) -> tuple:
+        """
+        Возвращает патченный chromedriver для текущей версии Chrome,
+        при промахе скачивает и патчит его через Patcher
+
+        Returns:
+            tuple: (путь к драйверу или None, был ли драйвер в кеше)
+        """
+        major: Optional[int] = self.chrome_major()
+        if major is None:
+            return None, False
+        path: str = os.path.join(self.cache_dir, f"chromedriver-{major}")
+        with self._lock:
+            if os.path.exists(path):
+                return path, True
+            try:
+                patcher = Patcher(version_main=major)
+                patcher.auto()
+                # копия под временным именем, чтобы параллельный запуск
+                # (поток или процесс-воркер) не взял недописанный файл
+                partial: str = f"{path}.{os.getpid()}.partial"
+                shutil.copy2(patcher.executable_path, partial)
+                os.chmod(partial, 0o755)
+                os.replace(partial, path)
+                logging.info("Patched chromedriver %s cached: %s", major, path)
+            except Exception as e:
+                logging.warning("Error cache chromedriver %s: %s", major, e)
+                return None, False
+        return path, False
+
+    def profile_dir(self) -> tuple:
+        """
+        Создает каталог профиля для запуска: копию шаблона или пустой
+
+        Returns:
+            tuple: (путь к профилю или None, скопирован ли шаблон)
+        """
+        if not self.warm_profile:
+            return None, False
+        path: str = tempfile.mkdtemp(prefix="profile-", dir=self.cache_dir)
+        if not os.path.isdir(self.template_dir):
+            return path, False
+        copied = subprocess.run(
+            ["cp", "--reflink=auto", "-a", f"{self.template_dir}/.", path],
+            check=False,
+        )
+        if copied.returncode != 0:
+            logging.warning("Error clone profile template, using empty profile")
+            shutil.rmtree(path, ignore_errors=True)
+            return tempfile.mkdtemp(prefix="profile-", dir=self.cache_dir), False
+        return path, True
+
+    def prepare(self) -> tuple:
+        """
+        Готовит аргументы uc.Chrome для запуска
+
+        Returns:
+            tuple: (dict с driver_executable_path и user_data_dir,
+            теплый ли запуск)
+        """
+        driver_path, driver_cached = self.driver_path()
+        profile, profile_cloned = self.profile_dir()
+        kwargs: dict = {"driver_executable_path": driver_path}
+        if profile:
+            kwargs["user_data_dir"] = profile
+        warm: bool = driver_cached and (profile_cloned or not self.warm_profile)
+        return kwargs, warm
+
+    def record_launch(self, seconds: float, warm: bool) -> None:
+        """Запоминает время запуска браузера"""
+        with self._lock:
+            self.stats["warm" if warm else "cold"].append(seconds)
+        logging.info(
+            "Browser launch %.1f s (%s start)", seconds, "warm" if warm else "cold"
+        )
+
+    def release(self, kwargs: dict, promote: bool) -> None:
+        """
+        Убирает профиль запуска после закрытия браузера. Если шаблона еще
+        нет и запуск был удачным, профиль становится шаблоном.
+
+        Args:
+            - 'kwargs' (dict): аргументы, полученные из prepare
+            - 'promote' (bool): можно ли сделать профиль шаблоном
+        """
+        profile: Optional[str] = kwargs.get("user_data_dir")
+        if not profile:
+            return
+        if promote and not os.path.isdir(self.template_dir):
+            for name in PROFILE_LOCKS:
+                try:
+                    os.remove(os.path.join(profile, name))
+                except OSError:
+                    pass
+            try:
+                os.rename(profile, self.template_dir)
+                logging.info("Profile template saved: %s", self.template_dir)
+                return
+            except OSError as e:
+                logging.warning("Error save profile template: %s", e)
+        shutil.rmtree(profile, ignore_errors=True)
+
+    def log_report(self) -> None:
+        """
+        Логирует число и среднее время холодных и теплых запусков
+        и обнуляет статистику
+        """
+        with self._lock:
+            stats: dict = self.stats
+            self.stats = {"cold": [], "warm": []}
+        cold: list = stats["cold"]
+        warm: list = stats["warm"]
+        logging.info(
+            "Browser launches: cold %s (avg %.1f s), warm %s (avg %.1f s)",
+            len(cold),
+            sum(cold) / len(cold) if cold else 0.0,
+            len(warm),
+            sum(warm) / len(warm) if warm else 0.0,
+        )
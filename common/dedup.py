@@ -0,0 +1,95 @@
+import time
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Optional
+
+
+class DedupIndex:
+    """
+    Ограниченный по памяти индекс уже встреченных ссылок.
+
+    Вместо строк хранит 64-битные хеши (blake2b) в OrderedDict в порядке
+    последней встречи: каждая повторная встреча переносит ссылку в конец.
+    При заполнении вытесняется ссылка, которую дольше всех не видели
+    (LRU), при заданном ttl дополнительно удаляются записи, не встречавшиеся
+    дольше ttl секунд. Поэтому память не растет, сколько бы ни работал
+    процесс, а объявления, которые все еще видны в выдаче, не вытесняются
+    и не отправляются повторно.
+
+    Примечания:
+    - Вероятность коллизии 64-битных хешей пренебрежимо мала для
+    тысяч ссылок
+    - max_size должен быть больше числа ссылок, видимых за один проход
+    (URL × объявлений на странице × страниц), см. LAST_ITEMS_MAX_SIZE
+
+    Args:
+        - 'max_size' (int): максимальное число хранимых ссылок
+        - 'ttl' (float, optional): время жизни записи в секундах
+    """
+
+    def __init__(self, max_size: int, ttl: Optional[float] = None) -> None:
+        self.max_size: int = max_size
+        self.ttl: Optional[float] = ttl
+        self._seen: OrderedDict = OrderedDict()
+
+    @staticmethod
+    def key(url: str) -> int:
+        """64-битный хеш ссылки"""
+        digest: bytes = blake2b(url.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "little", signed=True)
+
+    def _expire(self) -> None:
+        """Удаляет записи, не встречавшиеся дольше ttl"""
+        if self.ttl is None:
+            return
+        deadline: float = time.monotonic() - self.ttl
+        while self._seen and next(iter(self._seen.values())) < deadline:
+            self._seen.popitem(last=False)
+
+    def add(self, url: str) -> bool:
+        """
+        Добавляет ссылку, если ее еще нет; известную ссылку отмечает
+        как только что встреченную
+
+        Args:
+            - 'url' (str): ссылка на товар
+
+        Returns:
+            Bool: Истина, если ссылка новая
+        """
+        self._expire()
+        key: int = self.key(url)
+        known: bool = key in self._seen
+        if known:
+            self._seen.move_to_end(key)
+        elif len(self._seen) >= self.max_size:
+            self._seen.popitem(last=False)
+        self._seen[key] = time.monotonic()
+        return not known
+
+    def touch(self, url: str) -> bool:
+        """
+        Отмечает известную ссылку как только что встреченную,
+        новую ссылку не добавляет
+
+        Returns:
+            Bool: Истина, если ссылка уже есть в индексе
+        """
+        self._expire()
+        key: int = self.key(url)
+        if key not in self._seen:
+            return False
+        self._seen.move_to_end(key)
+        self._seen[key] = time.monotonic()
+        return True
+
+    def __contains__(self, url: str) -> bool:
+        self._expire()
+        return self.key(url) in self._seen
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def clear(self) -> None:
+        """Удаляет все записи"""
+        self._seen.clear()
@@ -0,0 +1,196 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from itertools import groupby
+from typing import Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+API_URL: str = "https://api.telegram.org/bot{token}/{method}"
+# Ограничения Telegram: подпись к фото и число фото в альбоме
+CAPTION_LIMIT: int = 1024
+ALBUM_LIMIT: int = 10
+# Сколько раз повторять запрос после 429 Too Many Requests
+MAX_RETRIES: int = 5
+
+
+def fit_caption(text: str) -> str:
+    """Обрезает подпись до CAPTION_LIMIT символов"""
+    if len(text) > CAPTION_LIMIT:
+        return text[:CAPTION_LIMIT - 4] + "..."
+    return text
+
+
+class TelegramNotifier:
+    """
+    Отправка сообщений в Telegram в фоновом потоке.
+
+    - send только кладет сообщение в ограниченную очередь и сразу
+    возвращается: парсер не ждет Telegram
+    - Поток-отправитель держит пул keep-alive соединений (requests.Session)
+    и отправляет сообщения по очереди, не чаще min_interval секунд
+    - На 429 ждет parameters.retry_after из ответа и повторяет запрос
+    - Сообщения уходят в порядке очереди; если подряд скопилось больше
+    album_threshold фото, они уходят альбомами sendMediaGroup по
+    ALBUM_LIMIT фото; при ошибке альбома - по одному
+    - Поток запускается при первом send; при выходе из программы
+    очередь дописывается (не дольше 10 секунд)
+
+    Args:
+        - 'token' (str): токен бота
+        - 'chat_id' (Any): чат для сообщений
+        - 'queue_size' (int): размер очереди сообщений
+        - 'album_threshold' (int): сколько фото подряд отправлять по одному
+        - 'min_interval' (float): минимальный интервал между запросами, секунд
+        - 'timeout' (float): таймаут запроса, секунд
+    """
+
+    def __init__(
+        self,
+        token: str,
+        chat_id: Any,
+        queue_size: int = 200,
+        album_threshold: int = 3,
+        min_interval: float = 1.0,
+        timeout: float = 10.0,
+    ) -> None:
+        self.token: str = token
+        self.chat_id: Any = chat_id
+        self.album_threshold: int = max(1, album_threshold)
+        self.min_interval: float = min_interval
+        self.timeout: float = timeout
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, queue_size))
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_maxsize=2))
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._next_call: float = 0.0
+        atexit.register(self.close)
+
+    def send(self, text: str, photo: Optional[str] = None) -> bool:
+        """
+        Ставит сообщение в очередь, не дожидаясь отправки
+
+        Args:
+            - 'text' (str): текст (подпись, если есть фото)
+            - 'photo' (str, optional): URL фото
+
+        Returns:
+            bool: False, если очередь переполнена и сообщение отброшено
+        """
+        self._start()
+        try:
+            self._queue.put_nowait((text, photo))
+        except queue.Full:
+            logging.error("Telegram queue is full, message dropped: %s", text)
+            return False
+        return True
+
+    def _start(self) -> None:
+        """Запускает поток-отправитель, если он еще не запущен"""
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Ждет отправки очереди, но не дольше timeout секунд"""
+        deadline: float = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.1)
+
+    def _run(self) -> None:
+        """Поток-отправитель: забирает из очереди все, что накопилось"""
+        while True:
+            batch: list = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._deliver(batch)
+            except Exception as e:
+                logging.error("Error send to Telegram: %s", e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _deliver(self, batch: list) -> None:
+        """
+        Отправляет пачку сообщений в порядке очереди
+
+        Примечания:
+        - Альбомами уходят только идущие подряд фото, если их больше
+        album_threshold; текст между фото разрывает серию
+        """
+        for has_photo, group in groupby(batch, key=lambda message: bool(message[1])):
+            run: list = list(group)
+            if not has_photo or len(run) <= self.album_threshold:
+                for text, photo in run:
+                    self._send_one(text, photo)
+                continue
+            for start in range(0, len(run), ALBUM_LIMIT):
+                album: list = run[start:start + ALBUM_LIMIT]
+                if len(album) == 1 or not self._send_album(album):
+                    for text, photo in album:
+                        self._send_one(text, photo)
+
+    def _send_album(self, album: list) -> bool:
+        """Отправляет до ALBUM_LIMIT фото одним sendMediaGroup"""
+        media: list = [
+            {"type": "photo", "media": photo, "caption": fit_caption(text)}
+            for text, photo in album
+        ]
+        return self._call("sendMediaGroup", {"chat_id": self.chat_id, "media": media})
+
+    def _send_one(self, text: str, photo: Optional[str]) -> bool:
+        """Отправляет одно сообщение: sendPhoto или sendMessage"""
+        if photo:
+            return self._call(
+                "sendPhoto",
+                {"chat_id": self.chat_id, "photo": photo, "caption": fit_caption(text)},
+            )
+        return self._call("sendMessage", {"chat_id": self.chat_id, "text": text})
+
+    def _call(self, method: str, payload: dict) -> bool:
+        """
+        Вызывает метод Bot API, соблюдая min_interval и retry_after
+
+        Returns:
+            bool: True, если Telegram принял запрос
+        """
+        url: str = API_URL.format(token=self.token, method=method)
+        for _ in range(MAX_RETRIES):
+            delay: float = self._next_call - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self._next_call = time.monotonic() + self.min_interval
+            try:
+                response = self._session.post(url, json=payload, timeout=self.timeout)
+            except requests.RequestException as e:
+                logging.error("Telegram %s failed: %s", method, e)
+                return False
+            if response.status_code != 429:
+                if not response.ok:
+                    logging.error(
+                        "Telegram %s error %s: %s",
+                        method,
+                        response.status_code,
+                        response.text[:200],
+                    )
+                return response.ok
+            try:
+                retry_after: float = float(
+                    response.json()["parameters"]["retry_after"]
+                )
+            except (ValueError, KeyError, TypeError):
+                retry_after = 5.0
+            logging.warning("Telegram 429 on %s, retry after %s s", method, retry_after)
+            self._next_call = time.monotonic() + retry_after
+        logging.error("Telegram %s: too many 429 responses, message dropped", method)
+        return False
@@ -0,0 +1,153 @@
+import logging
+import random
+import time
+from typing import Any
+
+# Небольшая случайная пауза после готовности страницы (антибот)
+DEFAULT_JITTER: tuple = (0.3, 1.2)
+POLL_INTERVAL: float = 0.25
+STALE_ATTRIBUTE: str = "data-wait-stale"
+
+_COUNT_SCRIPT: str = """
+var nodes = document.querySelectorAll(arguments[0]);
+var count = 0;
+for (var i = 0; i < nodes.length; i++) {
+    if (!arguments[1] || !nodes[i].hasAttribute(arguments[2])) {
+        count++;
+    }
+}
+return count;
+"""
+_MARK_SCRIPT: str = """
+var nodes = document.querySelectorAll(arguments[0]);
+for (var i = 0; i < nodes.length; i++) {
+    nodes[i].setAttribute(arguments[1], "1");
+}
+"""
+
+
+class ReadinessWaiter:
+    """
+    Ожидание готовности страницы вместо фиксированных time.sleep.
+
+    Ждет, пока на странице появится контейнер результатов с нужным числом
+    элементов, и возвращается сразу как только они есть. Если элементы не
+    появились за timeout, ожидание заканчивается по таймауту. После
+    готовности выдерживается небольшая случайная пауза (jitter).
+
+    Для каждого ожидания указывается budget - сколько в среднем занимала
+    фиксированная пауза, которую заменяет ожидание. Разница между budget
+    и фактическим временем копится и логируется в log_saved().
+
+    Args:
+        - 'driver' (Any): драйвер selenium/seleniumbase с execute_script
+        - 'label' (str): метка для логов (обычно url)
+        - 'jitter' (tuple): границы случайной паузы после готовности
+    """
+
+    def __init__(self, driver: Any, label: str, jitter: tuple = DEFAULT_JITTER):
+        self.driver: Any = driver
+        self.label: str = label
+        self.jitter_range: tuple = jitter
+        self.budget: float = 0.0
+        self.elapsed: float = 0.0
+
+    def count(self, selector: str, fresh: bool = False) -> int:
+        """
+        Считает элементы по css-селектору
+
+        Args:
+            - 'selector' (str): css-селектор
+            - 'fresh' (bool): не считать элементы, помеченные mark_stale()
+
+        Returns:
+            int: число элементов (0 при ошибке)
+        """
+        try:
+            return int(
+                self.driver.execute_script(
+                    _COUNT_SCRIPT, selector, fresh, STALE_ATTRIBUTE
+                )
+                or 0
+            )
+        except Exception as e:
+            logging.debug("Wait count error %s", e)
+            return 0
+
+    def mark_stale(self, selector: str) -> None:
+        """
+        Помечает текущие элементы как устаревшие, чтобы после клика
+        wait(..., fresh=True) дождался перерисованного списка
+
+        Args:
+            - 'selector' (str): css-селектор элементов
+        """
+        try:
+            self.driver.execute_script(_MARK_SCRIPT, selector, STALE_ATTRIBUTE)
+        except Exception as e:
+            logging.debug("Wait mark error %s", e)
+
+    def wait(
+        self,
+        selector: str,
+        budget: float,
+        timeout: float,
+        min_items: int = 1,
+        fresh: bool = False,
+    ) -> bool:
+        """
+        Ждет, пока по селектору найдется не меньше min_items элементов
+
+        Args:
+            - 'selector' (str): css-селектор элементов результата
+            - 'budget' (float): средняя длительность заменяемой паузы
+            - 'timeout' (float): максимальное время ожидания
+            - 'min_items' (int): сколько элементов считается готовностью
+            - 'fresh' (bool): учитывать только не помеченные элементы
+
+        Returns:
+            bool: True если дождались, False если вышли по таймауту
+        """
+        started: float = time.monotonic()
+        deadline: float = started + timeout
+        ready: bool = False
+        while True:
+            if self.count(selector, fresh) >= min_items:
+                ready = True
+                break
+            if time.monotonic() >= deadline:
+                break
+            time.sleep(POLL_INTERVAL)
+
+        if ready:
+            self.jitter()
+        else:
+            logging.info(
+                "Wait timeout %.0f s for %s on %s", timeout, selector, self.label
+            )
+        self.budget += budget
+        self.elapsed += time.monotonic() - started
+        return ready
+
+    def jitter(self) -> None:
+        """Выдерживает небольшую случайную паузу"""
+        low, high = self.jitter_range
+        if high > 0:
+            time.sleep(random.uniform(low, high))
+
+    def log_saved(self) -> float:
+        """
+        Логирует, сколько секунд сэкономлено относительно фиксированных пауз
+
+        Returns:
+            float: сэкономленное время в секундах
+        """
+        saved: float = self.budget - self.elapsed
+        logging.info(
+            "Waits for %s: %.1f s instead of %.1f s (saved %.1f s)",
+            self.label,
+            self.elapsed,
+            self.budget,
+            saved,
+        )
+        return saved
@@ -0,0 +1,129 @@
+import logging
+from typing import Any, Optional
+
+from graphql_client import GraphQLClient, GraphQLError
+from queries import SEARCH_FIELDS
+
+# Поля товара те же, что у одиночного поиска (queries.SEARCH_FIELDS)
+BATCH_FRAGMENT: str = (
+    f"fragment BatchProductFragment on ProductNotMine {{{SEARCH_FIELDS}}}\n"
+)
+
+
+def build_batch_payload(filter_key: str, values: list, limit: int) -> dict:
+    """
+    Собирает один запрос searchProducts на несколько фильтров через алиасы
+
+    Каждому значению соответствует алиас q<номер> и переменная f<номер>:
+    q0: searchProducts(filter: $f0, ...) { ... }
+
+    Args:
+        - 'filter_key' (str): поле фильтра ("query" или "brand")
+        - 'values' (list): значения фильтра
+        - 'limit' (int): сколько товаров запрашивать на фильтр
+
+    Returns:
+        dict: тело запроса (operationName, variables, query)
+    """
+    variables: dict = {"sort": "NEW", "offset": 0, "limit": limit}
+    definitions: list = ["$offset: Int", "$limit: Int", "$sort: String"]
+    fields: list = []
+    for index, value in enumerate(values):
+        variables[f"f{index}"] = {filter_key: value, "colorIds": [], "size_filter": []}
+        definitions.append(f"$f{index}: ProductFilter!")
+        fields.append(
+            f"  q{index}: searchProducts(filter: $f{index}, offset: $offset, "
+            f"limit: $limit, sort: $sort) {{ ...BatchProductFragment }}"
+        )
+    query: str = (
+        f"query batchSearchProducts({', '.join(definitions)}) {{\n"
+        + "\n".join(fields)
+        + "\n}\n"
+        + BATCH_FRAGMENT
+    )
+    return {
+        "operationName": "batchSearchProducts",
+        "variables": variables,
+        "query": query,
+    }
+
+
+class BatchedSearch:
+    """
+    Поиск по многим фильтрам (SEARCH_TERMS, SEARCH_BRAND) запросами
+    по chunk_size фильтров вместо запроса на каждый фильтр.
+
+    - Ответ раскладывается по фильтрам в том же виде, что у search_products:
+    {"data": {"searchProducts": [...]}}
+    - Фильтры, для которых в ответе нет списка (ошибка поля, сбой запроса),
+    в результат не попадают: вызывающий код запрашивает их по одному
+    - Если сервер отклоняет сам пакетный запрос (статус 4xx или ошибки
+    без данных), пакетный режим выключается до перезапуска
+
+    Args:
+        - 'client' (GraphQLClient): общий клиент GraphQL
+        - 'chunk_size' (int): сколько фильтров в одном запросе
+        - 'limit' (int): сколько товаров запрашивать на фильтр
+    """
+
+    def __init__(self, client: GraphQLClient, chunk_size: int, limit: int) -> None:
+        self.client: GraphQLClient = client
+        self.chunk_size: int = max(1, chunk_size)
+        self.limit: int = limit
+        self.enabled: bool = True
+
+    def fetch(
+        self, filter_key: str, values: list, limit: Optional[int] = None
+    ) -> dict:
+        """
+        Запрашивает выдачу для всех значений фильтра
+
+        Args:
+            - 'filter_key' (str): поле фильтра ("query" или "brand")
+            - 'values' (list): значения фильтра
+            - 'limit' (int, optional): сколько товаров запрашивать
+            на фильтр (по умолчанию self.limit)
+
+        Returns:
+            dict: значение фильтра -> ответ в формате search_products
+        """
+        results: dict = {}
+        for start in range(0, len(values), self.chunk_size):
+            if not self.enabled:
+                break
+            chunk: list = values[start:start + self.chunk_size]
+            response: Optional[dict] = self._execute(
+                filter_key, chunk, limit or self.limit
+            )
+            data: dict = (response or {}).get("data") or {}
+            for index, value in enumerate(chunk):
+                products: Any = data.get(f"q{index}")
+                if isinstance(products, list):
+                    results[value] = {"data": {"searchProducts": products}}
+        return results
+
+    def _execute(self, filter_key: str, chunk: list, limit: int) -> Optional[dict]:
+        """Отправляет пакетный запрос и решает, не выключить ли пакетный режим"""
+        payload: dict = build_batch_payload(filter_key, chunk, limit)
+        try:
+            response: Any = self.client.execute(payload)
+        except GraphQLError as e:
+            if e.status is not None:
+                self.disable(e)
+            else:
+                logging.error("Batch search failed, per-query this cycle: %s", e)
+            return None
+        if not isinstance(response, dict):
+            self.disable("unexpected response")
+            return None
+        if response.get("errors"):
+            if not response.get("data"):
+                self.disable(response["errors"][0].get("message"))
+                return None
+            logging.warning("Batch search partial errors: %s", response["errors"])
+        return response
+
+    def disable(self, reason: Any) -> None:
+        """Выключает пакетный режим: дальше только запросы по одному"""
+        self.enabled = False
+        logging.warning("Batch search rejected (%s), using per-query requests", reason)
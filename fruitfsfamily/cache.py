@@ -0,0 +1,57 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class TTLCache:
+    """
+    Кеш с ограничением по размеру и времени жизни записей.
+
+    - Запись старше ttl секунд считается отсутствующей и удаляется
+    при обращении
+    - При переполнении вытесняется запись, к которой дольше всего
+    не обращались (OrderedDict в порядке использования)
+    - Считает попадания и промахи для лога
+
+    Args:
+        - 'max_size' (int): максимальное число записей
+        - 'ttl' (float): время жизни записи в секундах
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self.max_size: int = max(1, max_size)
+        self.ttl: float = ttl
+        self._items: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Возвращает значение по ключу
+
+        Returns:
+            Any|None: значение или None, если записи нет или она устарела
+        """
+        with self._lock:
+            entry: Optional[tuple] = self._items.get(key)
+            if entry is None or time.monotonic() - entry[0] > self.ttl:
+                if entry is not None:
+                    del self._items[key]
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Сохраняет значение, вытесняя самые давние записи при переполнении"""
+        with self._lock:
+            self._items[key] = (time.monotonic(), value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._items)
@@ -1,20 +1,58 @@
+import asyncio
 import logging
 import os
-import random
 import time
 import urllib.parse
+from collections import Counter
 from datetime import datetime
-from typing import Any
+from functools import partial
+from typing import Any, Optional
 
-import requests
 import telebot
 
+import common_path  # noqa: F401
+from batch import BatchedSearch
+from cache import TTLCache
+from common.notifier import TelegramNotifier
+from graphql_client import GraphQLClient
+from pipeline import ItemPipeline
+from queries import build_payload, search_variables
+from seen_store import SeenStore
+from watermarks import Watermarks
 from settings import (
-    MAX_SEEN_FILE_SIZE_MB,
+    ASYNC_MODE,
+    BATCH_QUERIES,
+    BATCH_SIZE,
+    CHECK_INTERVAL_SECONDS,
+    DETAILS_CACHE_SIZE,
+    DETAILS_CACHE_TTL_SECONDS,
+    ENRICH_WORKERS,
+    FIRST_PAGE_SIZE,
+    GRAPHQL_BACKOFF_SECONDS,
+    GRAPHQL_CONNECT_TIMEOUT,
+    GRAPHQL_HTTP2,
+    GRAPHQL_READ_TIMEOUT,
+    GRAPHQL_RETRIES,
     MAX_TXT_LOG_SIZE_MB,
+    PAGE_LIMIT,
+    PERSISTED_QUERIES,
+    REQUESTS_BURST,
+    REQUESTS_PER_SECOND,
     SEARCH_BRAND,
+    SEARCH_CONCURRENCY,
     SEARCH_TERMS,
+    SEEN_COMPACT_EVERY,
     SEEN_FILE,
+    SEEN_KEEP_ITEMS,
+    SEEN_STORE_PATH,
+    STAGE_QUEUE_SIZE,
+    TELEGRAM_ALBUM_THRESHOLD,
+    TELEGRAM_BOT_TOKEN,
+    TELEGRAM_CHAT_ID,
+    TELEGRAM_MIN_INTERVAL,
+    TELEGRAM_QUEUE_SIZE,
+    WATERMARKS,
+    WATERMARKS_FILE,
 )
 
 logging.basicConfig(
@@ -23,6 +61,34 @@ logging.basicConfig(
     handlers=[logging.FileHandler("error_code.txt"), logging.StreamHandler()],
 )
 
+GRAPHQL_URL: str = "https://pikil-server.production.fruitsfamily.com/graphql"
+GRAPHQL_HEADERS: dict = {
+    "Accept": "*/*",
+    "User-Agent": "FruitsFamily/9.4.1 (1) "
+    "com.fruitsFamily.fruitsFamily/20250206024932 iOS/18.1.1",
+    "Accept-Language": "ru",
+    "Content-Type": "application/json",
+}
+client = GraphQLClient(
+    GRAPHQL_URL,
+    GRAPHQL_HEADERS,
+    GRAPHQL_CONNECT_TIMEOUT,
+    GRAPHQL_READ_TIMEOUT,
+    GRAPHQL_RETRIES,
+    GRAPHQL_BACKOFF_SECONDS,
+    http2=GRAPHQL_HTTP2,
+    persisted=PERSISTED_QUERIES,
+)
+notifier = TelegramNotifier(
+    TELEGRAM_BOT_TOKEN,
+    TELEGRAM_CHAT_ID,
+    TELEGRAM_QUEUE_SIZE,
+    TELEGRAM_ALBUM_THRESHOLD,
+    TELEGRAM_MIN_INTERVAL,
+)
+batched_search = BatchedSearch(client, BATCH_SIZE, limit=PAGE_LIMIT)
+watermarks = Watermarks(WATERMARKS_FILE)
+
 
 def rotate_txt_log() -> None:
     """
@@ -47,78 +113,25 @@ def rotate_txt_log() -> None:
             )
 
 
-def load_seen_items() -> set:
-    """
-    Берет данные из файла и записывает их во множество
-
-    Примечания:
-    - Если файла нет, то возвращает пустое множество
-
-    Returns:
-        None: Функция возвращает множество
-    """
-    try:
-        with open(SEEN_FILE, "r", encoding="utf-8") as f:
-            return set(line.strip() for line in f)
-    except FileNotFoundError:
-        return set()
-
-
-def save_seen_items(items: set) -> None:
-    """
-    Записывает товары в файл
-
-    Returns:
-        None: Функция ничего не возвращает
-    """
-    with open(SEEN_FILE, "w", encoding="utf-8") as f:
-        for item in items:
-            f.write(f"{item}\n")
-
-
-def clean_seen_file() -> None:
-    """
-    Удаляет половину данных из файла
-
-    Примечания:
-    - Если файла нет, то ничего не делает
-    - Если объем файла ниже заданного, то ничего не делает
-
-    Args:
-        - 'size_mb' (float): размер файла
-
-    Returns:
-        None: Функция ничего не возвращает
-    """
-    if not os.path.exists(SEEN_FILE):
-        return
-
-    size_mb: float = os.path.getsize(SEEN_FILE) / (1024 * 1024)
-    if size_mb <= MAX_SEEN_FILE_SIZE_MB:
-        return
-
-    with open(SEEN_FILE, "r", encoding="utf-8") as f:
-        lines: list[str] = f.readlines()
-
-    half: int = len(lines) // 2
-    new_lines: list[str] = lines[half:]
-
-    with open(SEEN_FILE, "w", encoding="utf-8") as f:
-        f.writelines(new_lines)
-
-
-seen_items: set = load_seen_items()
+seen_items = SeenStore(
+    SEEN_STORE_PATH, SEEN_KEEP_ITEMS, SEEN_COMPACT_EVERY, legacy_file=SEEN_FILE
+)
+details_cache = TTLCache(DETAILS_CACHE_SIZE, DETAILS_CACHE_TTL_SECONDS)
+# Поля товара, нужные для сообщения; из выдачи поиска они обычно уже есть
+DETAIL_FIELDS: tuple = ("title", "size", "condition", "price", "resizedSmallImages")
+request_stats: Counter = Counter()
 
 
-def search_products(query: str) -> Any:
+def search_products(query: str, offset: int = 0, limit: int = PAGE_LIMIT) -> Any:
     """
     Отправляет пост запрос с заданными параметрами.
 
     Args:
-        - 'url' (str): URL GraphQL API сервера Pikil (production среда)
-        - 'headers' (dict): заголовки запроса
-        - 'payload' (dict): тело запроса
-        - 'response' : результат запроса
+        - 'query' (str): поисковый запрос
+        - 'offset' (int): сколько новейших товаров пропустить
+        - 'limit' (int): сколько товаров запросить
+        - 'payload' (dict): тело запроса из реестра queries, отправляется
+        через общий client
 
     Returns:
         None: Функция возвращает json данные
@@ -129,79 +142,27 @@ def search_products(query: str) -> Any:
         - Ошибка сети или таймаут при открытии сайта
         - Неожиданная ошибка при формировании запроса
     """
-    url: str = "https://pikil-server.production.fruitsfamily.com/graphql"
-
-    headers: dict = {
-        "Host": "pikil-server.production.fruitsfamily.com",
-        "Connection": "keep-alive",
-        "Accept": "*/*",
-        "User-Agent": "FruitsFamily/9.4.1 (1)"
-        " com.fruitsFamily.fruitsFamily/20250206024932 iOS/18.1.1",
-        "Accept-Language": "ru",
-        "Content-Type": "application/json",
-    }
-
-    payload: dict = {
-        "operationName": "searchProducts",
-        "variables": {
-            "filter": {"query": query, "colorIds": [], "size_filter": []},
-            "sort": "NEW",
-            "offset": 0,
-            "limit": 40,
-        },
-        "query": """
-        query searchProducts($filter: ProductFilter!, $offset: Int, $limit: Int, $sort: String) {
-          searchProducts(filter: $filter, offset: $offset, limit: $limit, sort: $sort) {
-            ...ProductFragment
-            seller {
-              id
-              user {
-                id
-                nickname
-                __typename
-              }
-              __typename
-            }
-            __typename
-          }
-        }
-
-        fragment ProductFragment on ProductNotMine {
-          id
-          resizedSmallImages
-          title
-          price
-          brand
-          size
-          condition
-          status
-          like_count
-          inquire_count
-          discount_rate
-          external_url
-          __typename
-        }
-        """,
-    }
+    payload: dict = build_payload(
+        "searchProducts", search_variables("query", query, offset, limit)
+    )
 
     try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        return response.json()
+        return client.execute(payload)
     except Exception as e:
         logging.error("Error searching for %s: %s", query, e)
         return None
 
 
-def search_brands(query: str) -> Any:
+def search_brands(query: str, offset: int = 0, limit: int = PAGE_LIMIT) -> Any:
     """
     Отправляет пост запрос с заданными параметрами.
 
     Args:
-        - 'url' (str): URL GraphQL API сервера Pikil (production среда)
-        - 'headers' (dict): заголовки запроса
-        - 'payload' (dict): тело запроса
-        - 'response' : результат запроса
+        - 'query' (str): бренд
+        - 'offset' (int): сколько новейших товаров пропустить
+        - 'limit' (int): сколько товаров запросить
+        - 'payload' (dict): тело запроса из реестра queries, отправляется
+        через общий client
 
     Returns:
         None: Функция возвращает json данные
@@ -212,71 +173,12 @@ def search_brands(query: str) -> Any:
         - Ошибка сети или таймаут при открытии сайта
         - Неожиданная ошибка при формировании запроса
     """
-    url: str = "https://pikil-server.production.fruitsfamily.com/graphql"
-
-    headers: dict = {
-        "Host": "pikil-server.production.fruitsfamily.com",
-        "Connection": "keep-alive",
-        "Accept": "*/*",
-        "User-Agent": "FruitsFamily/9.4.1 (1) "
-        "com.fruitsFamily.fruitsFamily/20250206024932 iOS/18.1.1",
-        "Accept-Language": "ru",
-        "Content-Type": "application/json",
-    }
-
-    payload: dict = {
-        "operationName": "SeeProducts",
-        "variables": {
-            "filter": {"brand": query, "colorIds": [], "size_filter": []},
-            "sort": "NEW",
-            "offset": 0,
-            "limit": 40,
-        },
-        "query": """
-                query SeeProducts($filter: ProductFilter!, $offset: Int, $limit: Int, $sort: String) {
-                  searchProducts(filter: $filter, offset: $offset, limit: $limit, sort: $sort) {
-                      ...ProductFragment
-                          ...ProductDetailsPreloadFragment
-                              price
-                              __typename
-                  }
-                }
-
-                fragment ProductFragment on ProductNotMine {
-                  id
-                  title
-                  brand
-                  status
-                  external_url
-                  resizedSmallImages
-                  __typename
-                }
-
-                fragment ProductDetailsPreloadFragment on ProductNotMine {
-                  id
-                  createdAt
-                  category
-                  title
-                  description
-                  brand
-                  price
-                  status
-                  external_url
-                  resizedSmallImages
-                  is_visible
-                  size
-                  condition
-                  discount_rate
-                  like_count
-                  __typename
-                }
-                """,
-    }
+    payload: dict = build_payload(
+        "SeeProducts", search_variables("brand", query, offset, limit)
+    )
 
     try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        return response.json()
+        return client.execute(payload)
     except Exception as e:
         logging.error("Error searching for %s: %s", query, e)
         return None
@@ -286,11 +188,13 @@ def get_product_details(product_id: int) -> Any:
     """
     Отправляет пост запрос с заданными параметрами.
 
+    Примечания:
+    - Удачные ответы хранятся в details_cache, повторный запрос
+    того же товара в пределах DETAILS_CACHE_TTL_SECONDS не уходит в сеть
+
     Args:
-        - 'url' (str): URL GraphQL API сервера Pikil (production среда)
-        - 'headers' (dict): заголовки запроса
-        - 'payload' (dict): тело запроса
-        - 'response' : результат запроса
+        - 'payload' (dict): тело запроса из реестра queries, отправляется
+        через общий client
 
     Returns:
         None: Функция возвращает json данные
@@ -301,52 +205,18 @@ def get_product_details(product_id: int) -> Any:
         - Ошибка сети или таймаут при открытии сайта
         - Неожиданная ошибка при формировании запроса
     """
-    url: str = "https://pikil-server.production.fruitsfamily.com/graphql"
-
-    headers: dict = {
-        "Host": "pikil-server.production.fruitsfamily.com",
-        "Connection": "keep-alive",
-        "Accept": "*/*",
-        "User-Agent": "FruitsFamily/9.4.1 (1) "
-        "com.fruitsFamily.fruitsFamily/20250206024932 iOS/18.1.1",
-        "Accept-Language": "ru",
-        "Content-Type": "application/json",
-    }
-
-    payload: dict = {
-        "operationName": "seeProduct",
-        "variables": {"productID": product_id},
-        "query": """
-        query seeProduct($productID: Int!) {
-          seeProduct(id: $productID) {
-            id
-            title
-            description
-            brand
-            size
-            condition
-            price
-            status
-            shipping_fee
-            shipping_fee_island
-            external_url
-            resizedSmallImages
-            createdAt
-            seller {
-              user {
-                nickname
-                dangdo_rate
-              }
-            }
-          }
-        }
-        """,
-    }
+    cached: Any = details_cache.get(product_id)
+    if cached is not None:
+        return cached
+
+    payload: dict = build_payload("seeProduct", {"productID": product_id})
 
     try:
-        response = requests.post(url, json=payload, headers=headers)
-        response.raise_for_status()
-        return response.json()
+        request_stats["details_requests"] += 1
+        product_details: Any = client.execute(payload)
+        if (product_details.get("data") or {}).get("seeProduct"):
+            details_cache.set(product_id, product_details)
+        return product_details
     except Exception as e:
         logging.error(
             "Error getting product details for ID %s: %s",
@@ -355,67 +225,70 @@ def get_product_details(product_id: int) -> Any:
         return None
 
 
-def get_product_link(product_id: str) -> Any:
+def get_product_link(title: Any) -> Optional[str]:
     """
-    Берет название продукта и формирует URL для запроса
+    Формирует URL поиска по названию продукта
 
     Примечания:
-    - Если получение продукта ничего не вернуло,
-    то ничего не делает и возвращает None
     - Если у продукта нет заголовка,
     то ничего не делает и возвращает None
 
     Args:
-        - 'product_details' (Any): детальное описание продукта словарем
-        - 'product' (Any): сам продукт
         - 'title' (Any): заголовок продукта (имя)
-        - 'encoded_title' (str): декапированное имя продукта
-        - 'url' (str): ссылка на продукт
 
     Returns:
-        None: Функция возвращает ссылку на продукт
+        str|None: ссылка на продукт
+    """
+    if not title:
+        return None
+    encoded_title: str = urllib.parse.quote(str(title))
+    return f"@https://fruitsfamily.com/search/{encoded_title}"
 
-    Raises:
-        При исключении возвращает None.
-        Логирует ошибки в следующих случаях:
-        - Неожиданная ошибка при формировании запроса
+
+def enrich_product(product: dict) -> dict:
     """
+    Дополняет товар из выдачи поиска полями DETAIL_FIELDS
+
+    Примечания:
+    - Карточка seeProduct запрашивается, только если какого-то поля
+    действительно нет в выдаче, и не больше одного раза на товар
+    (get_product_details кеширует ответ)
+
+    Args:
+        - 'product' (dict): товар из searchProducts
+
+    Returns:
+        dict: товар с заполненными полями (или исходный, если запрос
+        не удался)
+    """
+    missing: list = [field for field in DETAIL_FIELDS if product.get(field) is None]
+    if not missing:
+        return product
+
+    product_details: Any = get_product_details(int(product["id"]))
     try:
-        product_details: Any = get_product_details(int(product_id))
-        if (
-            not product_details
-            or "data" not in product_details
-            or "seeProduct" not in product_details["data"]
-        ):
-            return None
-
-        product: Any = product_details["data"]["seeProduct"]
-        title: Any = product.get("title", "")
-        if not title:
-            return None
-
-        encoded_title: str = urllib.parse.quote(title)
-        return f"@https://fruitsfamily.com/search/{encoded_title}"
-    except Exception as e:
-        logging.error("Error: %s", e)
-        return None
+        details: dict = product_details["data"]["seeProduct"] or {}
+    except (TypeError, KeyError):
+        return product
+    return {**product, **{field: details.get(field) for field in missing}}
 
 
 def send_to_telegram(product: dict, photo_url: str, product_url: str) -> None:
     """
-    Отправляет информацию о товаре в Telegram-чат
+    Ставит информацию о товаре в очередь отправки в Telegram-чат
 
     Примечания:
     - Если фото нет, то отправляет сообщение без него
     - Если фото есть, то отправляет с ним
+    - Отправляет фоновый поток общего TelegramNotifier (common/notifier.py),
+    функция не ждет Telegram; паузы и повторы после 429 - там же
+    - Если в очереди больше TELEGRAM_ALBUM_THRESHOLD товаров с фото,
+    они уходят альбомами (sendMediaGroup)
 
     Args:
-        - 'bot_token' (str): секретный ключ телеграм бота
-        - 'chat_id' (int): идентификатор чата
-        - 'bot' (bot): Телеграм бот
-        - 'price' (str): цена товара
-        - 'clean_url' (str): ссылка на товар
-        - 'message' (str): отправляемое сообщение в телеграм чат
+        - 'product' (dict): товар (title, size, condition, price)
+        - 'photo_url' (str): ссылка на фото
+        - 'product_url' (str): ссылка на товар
 
     Returns:
         None: Функция ничего не возвращает
@@ -423,13 +296,9 @@ def send_to_telegram(product: dict, photo_url: str, product_url: str) -> None:
     Raises:
         При исключении ничего не возвращает
         Логирует ошибки в следующих случаях:
-        - Неожиданная ошибка при формировании запроса
+        - Неожиданная ошибка при формировании сообщения
     """
     try:
-        bot_token: str = ""
-        chat_id: str = ""
-        bot = telebot.TeleBot(bot_token)
-
         price: str = format(int(product["price"]), ",") + "원"
         clean_url: str = product_url.replace("@", "") if product_url else "None"
 
@@ -440,12 +309,7 @@ def send_to_telegram(product: dict, photo_url: str, product_url: str) -> None:
             f"Price: {price}\n"
             f"URL: {clean_url}"
         )
-
-        time.sleep(random.randint(0, 1))
-        if photo_url:
-            bot.send_photo(chat_id=chat_id, photo=photo_url, caption=message)
-        else:
-            bot.send_message(chat_id=chat_id, text=message)
+        notifier.send(message, photo_url or None)
 
     except Exception as e:
         logging.error("Error sending to Telegram: %s", e)
@@ -456,13 +320,12 @@ def save_to_log(product: dict) -> None:
     Отправляет полученные данные в функцию для отправки в телеграм чат
 
     Примечания:
-    - Если получение продукта ничего не вернуло,
-    то ничего не делает и возвращает None
+    - Название, фото и остальные поля берутся из выдачи поиска,
+    карточка товара запрашивается только при нехватке полей
+    (enrich_product): не больше одного запроса на новый товар
 
     Args:
-        - 'product_details' (Any): детальное описание продукта
-        - 'product_link' (Any): ссылка на продукт
-        - 'photo_link' (str): фото продукта
+        - 'product' (dict): товар из выдачи поиска
 
     Returns:
         None: Функция ничего не возвращает
@@ -472,34 +335,161 @@ def save_to_log(product: dict) -> None:
         Логирует ошибки в следующих случаях:
         - Неожиданная ошибка при формировании запроса
     """
-    product_details: Any = get_product_details(int(product["id"]))
-    product_link: Any = get_product_link(str(product["id"]))
-    photo_link: str = ""
     try:
-        if (
-            product_details
-            and "data" in product_details
-            and "seeProduct" in product_details["data"]
-        ):
-            details = product_details["data"]["seeProduct"]
-            if (
-                details.get("resizedSmallImages")
-                and len(details["resizedSmallImages"]) > 0
-            ):
-                photo_link = details["resizedSmallImages"][0]
-
-            send_to_telegram(product, photo_link, product_link)
+        notify_product(enrich_product(product))
     except Exception as e:
         logging.error("Error: %s", e)
         return
 
 
+def notify_product(product: dict) -> None:
+    """
+    Отправляет в Telegram товар, уже дополненный enrich_product
+
+    Args:
+        - 'product' (dict): товар с полями DETAIL_FIELDS
+    """
+    images: Any = product.get("resizedSmallImages")
+    photo_link: str = images[0] if images else ""
+    product_link: Optional[str] = get_product_link(product.get("title"))
+    send_to_telegram(product, photo_link, product_link)
+
+
+def products_of(result: Any) -> Optional[list]:
+    """Список товаров из ответа поиска или None, если ответа нет"""
+    try:
+        products: Any = result["data"]["searchProducts"]
+    except (TypeError, KeyError):
+        return None
+    return products if isinstance(products, list) else None
+
+
+def fetch_newer(filter_key: str, value: str, search: Any, result: Any) -> Any:
+    """
+    Догружает страницы выдачи, пока в них есть товары новее водяного знака
+
+    Примечания:
+    - Первая страница - FIRST_PAGE_SIZE товаров; если в ней есть хотя бы
+    один товар новее знака фильтра, запрашивается следующая страница
+    вдвое больше, всего не больше PAGE_LIMIT товаров
+    - Останавливается только на странице, целиком не новее знака: сортировка
+    NEW не строго по id (поднятый или перевыставленный старый товар
+    может оказаться в начале выдачи и не должен скрывать новые за ним)
+    - Без знака (первый запуск по фильтру) запрашивается только первая
+    страница: ее товары запоминаются, старая выдача не догружается
+    - После разбора знак фильтра поднимается до наибольшего id выдачи
+
+    Args:
+        - 'filter_key' (str): поле фильтра ("query" или "brand")
+        - 'value' (str): значение фильтра
+        - 'search' (Callable): запрос страницы (значение, offset, limit)
+        - 'result' (Any): ответ на первую страницу
+
+    Returns:
+        Any: ответ со всеми полученными товарами
+    """
+    products: Optional[list] = products_of(result)
+    if products is None:
+        return result
+    key: str = f"{filter_key}:{value}"
+    page: list = products
+    limit: int = FIRST_PAGE_SIZE
+    if watermarks.get(key) is None:
+        watermarks.update(key, products)
+        return result
+    while (
+        len(page) >= limit
+        and len(products) < PAGE_LIMIT
+        and any(watermarks.is_newer(key, product) for product in page)
+    ):
+        limit = min(limit * 2, PAGE_LIMIT - len(products))
+        page = products_of(search(value, len(products), limit)) or []
+        products = products + page
+    watermarks.update(key, products)
+    return {"data": {"searchProducts": products}}
+
+
+def search_filters(filter_key: str, values: list, search: Any) -> list:
+    """
+    Получает выдачу для каждого значения фильтра
+
+    Примечания:
+    - При BATCH_QUERIES значения запрашиваются пакетами (batched_search),
+    значения без ответа в пакете - по одному через search
+    - При WATERMARKS сначала запрашивается FIRST_PAGE_SIZE товаров,
+    следующие страницы - только пока в выдаче есть товары новее
+    прошлого цикла (fetch_newer, без знака - только первая страница);
+    иначе сразу PAGE_LIMIT товаров
+
+    Args:
+        - 'filter_key' (str): поле фильтра ("query" или "brand")
+        - 'values' (list): значения фильтра
+        - 'search' (Callable): запрос одного значения
+        (search_products или search_brands)
+
+    Returns:
+        list: пары (значение, ответ поиска)
+    """
+    limit: int = FIRST_PAGE_SIZE if WATERMARKS else PAGE_LIMIT
+    batched: dict = (
+        batched_search.fetch(filter_key, values, limit) if BATCH_QUERIES else {}
+    )
+    results: list = []
+    for value in values:
+        result: Any = batched.get(value) or search(value, 0, limit)
+        if WATERMARKS:
+            result = fetch_newer(filter_key, value, search, result)
+        results.append((value, result))
+    return results
+
+
+def take_new_products(search_term: str, result: Any) -> list:
+    """
+    Отбирает из ответа поиска новые товары (не присутствующие
+    в seen_items), запоминает их и выводит в консоль
+
+    Args:
+        - 'search_term' (str): термин или бренд поиска
+        - 'result' (Any): ответ поиска
+
+    Returns:
+        list: новые товары
+    """
+    if (not result or "data" not in result
+            or "searchProducts" not in result["data"]):
+        print(f"No results for {search_term}")
+        return []
+
+    new_products: list = []
+    for product in result["data"]["searchProducts"]:
+        item_id: Any = product["id"]
+        if item_id in seen_items:
+            continue
+        seen_items.add(item_id)
+        request_stats["new_items"] += 1
+        price: str = format(int(product["price"]), ",") + "원"
+
+        print("\nNEW ITEM FOUND!")
+        print(f"Brand: {product['brand']}")
+        print(f"Title: {product['title']}")
+        print(f"Price: {price}")
+        print(f"Size: {product['size']}")
+        print(f"Condition: {product['condition']}")
+        print(f"Status: {product['status']}")
+        print(f"URL: {product['external_url']}")
+        print("-" * 50)
+        new_products.append(product)
+    return new_products
+
+
 def view_products() -> bool:
     """
     Поиск и отображение новых товаров по списку поисковых запросов.
 
     Основные функции:
     1. Поочередно выполняет поиск товаров для каждого термина из SEARCH_TERMS
+    (при BATCH_QUERIES - пакетными запросами по BATCH_SIZE терминов,
+    термины без ответа в пакете запрашиваются по одному)
     2. Фильтрует новые товары (не присутствующие в seen_items)
     3. Форматирует и выводит информацию о новых товарах в консоль
     4. Сохраняет новые товары в лог-файл через save_to_log()
@@ -510,35 +500,13 @@ def view_products() -> bool:
             - False: Новых товаров не обнаружено
     """
     new_items_found: bool = False
+    results: list = search_filters("query", SEARCH_TERMS, search_products)
 
-    for search_term in SEARCH_TERMS:
+    for search_term, result in results:
         print(f"\nSearching for: {search_term}")
-
-        result = search_products(search_term)
-        if (not result or "data" not in result
-                or "searchProducts" not in result["data"]):
-            print(f"No results for {search_term}")
-            continue
-
-        products: dict = result["data"]["searchProducts"]
-        for product in products:
-            item_id: Any = product["id"]
-            if item_id not in seen_items:
-                new_items_found: bool = True
-                seen_items.add(item_id)
-                price: str = format(int(product["price"]), ",") + "원"
-
-                print("\nNEW ITEM FOUND!")
-                print(f"Brand: {product['brand']}")
-                print(f"Title: {product['title']}")
-                print(f"Price: {price}")
-                print(f"Size: {product['size']}")
-                print(f"Condition: {product['condition']}")
-                print(f"Status: {product['status']}")
-                print(f"URL: {product['external_url']}")
-                print("-" * 50)
-
-                save_to_log(product)
+        for product in take_new_products(search_term, result):
+            new_items_found = True
+            save_to_log(product)
 
     return new_items_found
 
@@ -549,6 +517,8 @@ def view_brand_product() -> bool:
 
     Основные функции:
     1. Поочередно выполняет поиск товаров для каждого термина из SEARCH_TERMS
+    (при BATCH_QUERIES - пакетными запросами по BATCH_SIZE брендов,
+    бренды без ответа в пакете запрашиваются по одному)
     2. Фильтрует новые товары (не присутствующие в seen_items)
     3. Форматирует и выводит информацию о новых товарах в консоль
     4. Сохраняет новые товары в лог-файл через save_to_log()
@@ -559,38 +529,66 @@ def view_brand_product() -> bool:
             - False: Новых товаров не обнаружено
     """
     new_items_found: bool = False
+    results: list = search_filters("brand", SEARCH_BRAND, search_brands)
 
-    for search_term in SEARCH_BRAND:
+    for search_term, result in results:
         print(f"\nSearching for: {search_term}")
+        for product in take_new_products(search_term, result):
+            new_items_found = True
+            save_to_log(product)
 
-        result = search_brands(search_term)
-        if (not result or "data" not in result
-                or "searchProducts" not in result["data"]):
-            print(f"No results for {search_term}")
-            continue
+    return new_items_found
 
-        products: dict = result["data"]["searchProducts"]
 
-        for product in products:
-            item_id: Any = product["id"]
-            if item_id not in seen_items:
-                new_items_found: bool = True
-                seen_items.add(item_id)
-                price: str = format(int(product["price"]), ",") + "원"
+def search_jobs() -> list:
+    """
+    Задачи поиска для асинхронного цикла: пакет из BATCH_SIZE терминов
+    или брендов (при BATCH_QUERIES) или по одному значению на задачу
 
-                print("\nNEW ITEM FOUND!")
-                print(f"Brand: {product['brand']}")
-                print(f"Title: {product['title']}")
-                print(f"Price: {price}")
-                print(f"Size: {product['size']}")
-                print(f"Condition: {product['condition']}")
-                print(f"Status: {product['status']}")
-                print(f"URL: {product['external_url']}")
-                print("-" * 50)
+    Returns:
+        list: функции без аргументов, возвращающие список
+        (значение, ответ поиска)
+    """
+    size: int = BATCH_SIZE if BATCH_QUERIES and batched_search.enabled else 1
+    jobs: list = []
+    for filter_key, values, search in (
+        ("query", SEARCH_TERMS, search_products),
+        ("brand", SEARCH_BRAND, search_brands),
+    ):
+        for start in range(0, len(values), size):
+            chunk: list = values[start:start + size]
+            jobs.append(partial(search_filters, filter_key, chunk, search))
+    return jobs
+
+
+item_pipeline = ItemPipeline(
+    REQUESTS_PER_SECOND,
+    REQUESTS_BURST,
+    SEARCH_CONCURRENCY,
+    ENRICH_WORKERS,
+    STAGE_QUEUE_SIZE,
+    take_new_products,
+    enrich_product,
+    notify_product,
+)
 
-                save_to_log(product)
 
-    return new_items_found
+def check_items() -> bool:
+    """
+    Один цикл проверки терминов и брендов
+
+    Примечания:
+    - При ASYNC_MODE поиски выполняются параллельно конвейером
+    item_pipeline, иначе по очереди (view_products, view_brand_product)
+
+    Returns:
+        bool: найдены ли новые товары
+    """
+    if ASYNC_MODE:
+        return asyncio.run(item_pipeline.run(search_jobs())) > 0
+    new_items_found: bool = view_products()
+    new_items_brand_found: bool = view_brand_product()
+    return new_items_found or new_items_brand_found
 
 
 def main() -> None:
@@ -599,11 +597,13 @@ def main() -> None:
 
     Основные функции:
     1. выполняет поиск товаров
-    2. выполняет поиск брендов
-    3. Проверяет объем памяти в файле seen file
-    4. Сохраняет новые товары в файл через save_seen_items()
-    5. Каждые 6 часов сообщает в указанный телеграм чат,
+    2. выполняет поиск брендов (check_items)
+    3. Дописывает новые товары в журнал seen_items (SeenStore.flush),
+    старые записи вытесняются фоновым сжатием
+    4. Каждые 6 часов сообщает в указанный телеграм чат,
     что сервер работает
+    5. Следующая проверка начинается через CHECK_INTERVAL_SECONDS
+    от начала предыдущей, а не от ее конца
 
     Returns:
         None: Функция ничего не возвращает
@@ -615,20 +615,27 @@ def main() -> None:
     """
     last_print_time: datetime = datetime.now()
     while True:
+        cycle_started: float = time.monotonic()
         try:
             print(
                 "\n=== Checking items at " f"%s ===",
                 datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             )
 
-            new_items_found: bool = view_products()
-            new_items_brand_found: bool = view_brand_product()
+            check_items()
+            seen_items.flush()
+            watermarks.save()
 
-            if new_items_found or new_items_brand_found:
-                clean_seen_file()
-                save_seen_items(seen_items)
+            logging.info(
+                "New items %s, details requests %s (cache hits %s, size %s)",
+                request_stats["new_items"],
+                request_stats["details_requests"],
+                details_cache.hits,
+                len(details_cache),
+            )
+            request_stats.clear()
+            client.log_report()
 
-            print("\nWaiting 40 seconds before next check...")
             current_time: datetime = datetime.now()
             if (current_time - last_print_time).total_seconds() >= 6 * 60 * 60:
                 SECRET_KEY = ""
@@ -637,11 +644,14 @@ def main() -> None:
                 last_print_time: datetime = current_time
 
             rotate_txt_log()
-            time.sleep(40)
 
         except Exception as e:
             logging.error("Error: %s", e)
-            continue
+
+        delay: float = CHECK_INTERVAL_SECONDS - (time.monotonic() - cycle_started)
+        print(f"\nWaiting {max(delay, 0.0):.0f} seconds before next check...")
+        if delay > 0:
+            time.sleep(delay)
 
 
 if __name__ == "__main__":
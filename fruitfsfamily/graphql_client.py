@@ -0,0 +1,323 @@
+import json
+import logging
+import random
+import threading
+import time
+from typing import Any, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from queries import query_hash
+
+try:
+    import h2  # noqa: F401
+    import httpx
+
+    HTTP2_AVAILABLE: bool = True
+except ImportError:
+    httpx = None
+    HTTP2_AVAILABLE: bool = False
+
+# Статусы, при которых запрос повторяется
+RETRY_STATUSES: frozenset = frozenset({429, 500, 502, 503, 504})
+# Ответ сервера с APQ на незнакомый хеш persisted query
+PERSISTED_NOT_FOUND: str = "PersistedQueryNotFound"
+# Ответ сервера без APQ на запрос с хешем вместо текста
+PERSISTED_NOT_SUPPORTED: str = "PersistedQueryNotSupported"
+
+
+class GraphQLError(Exception):
+    """
+    Запрос к GraphQL API не удался: статус 4xx или исчерпаны повторы
+
+    Args:
+        - 'message' (str): описание ошибки
+        - 'status' (int, optional): HTTP-статус, если сервер отклонил запрос
+    """
+
+    def __init__(self, message: str, status: Optional[int] = None) -> None:
+        super().__init__(message)
+        self.status: Optional[int] = status
+
+
+class GraphQLClient:
+    """
+    Общий клиент GraphQL API FruitsFamily.
+
+    - Один пул keep-alive соединений на все запросы: TLS-рукопожатие
+    не повторяется на каждый запрос
+    - HTTP/2 через httpx, если установлен httpx[http2], иначе
+    requests.Session с HTTP/1.1
+    - Таймаут подключения и чтения на каждый запрос
+    - Повтор при сетевой ошибке и статусах RETRY_STATUSES с экспоненциальной
+    задержкой backoff * 2**попытка (плюс случайная добавка)
+    - При persisted вместо текста запроса отправляется его sha256
+    (automatic persisted queries): если сервер хеша не знает, запрос
+    повторяется с текстом и хешем (сервер его запоминает); APQ
+    выключается и дальше отправляется текст только на
+    PersistedQueryNotSupported или явный статус 4xx; при другой ошибке
+    (например, временной ошибке резолвера) запрос один раз повторяется
+    с текстом, APQ остается включенным
+    - Время ответа, байты запросов и ответов и время разбора JSON копятся
+    по operationName и логируются log_report
+
+    Args:
+        - 'url' (str): адрес GraphQL API
+        - 'headers' (dict): заголовки всех запросов
+        - 'connect_timeout' (float): таймаут подключения в секундах
+        - 'read_timeout' (float): таймаут чтения ответа в секундах
+        - 'retries' (int): сколько раз повторять неудачный запрос
+        - 'backoff' (float): базовая задержка перед повтором в секундах
+        - 'pool_size' (int): размер пула соединений
+        - 'http2' (bool): использовать HTTP/2, если он доступен
+        - 'persisted' (bool): отправлять хеши persisted query
+    """
+
+    def __init__(
+        self,
+        url: str,
+        headers: dict,
+        connect_timeout: float,
+        read_timeout: float,
+        retries: int,
+        backoff: float,
+        pool_size: int = 4,
+        http2: bool = True,
+        persisted: bool = False,
+    ) -> None:
+        self.url: str = url
+        self.persisted: bool = persisted
+        self.retries: int = max(0, retries)
+        self.backoff: float = backoff
+        self._lock = threading.Lock()
+        self.stats: dict = {}
+        if http2 and HTTP2_AVAILABLE:
+            self.backend: str = "http2"
+            self._client = httpx.Client(
+                http2=True,
+                headers=headers,
+                timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+                limits=httpx.Limits(
+                    max_connections=pool_size,
+                    max_keepalive_connections=pool_size,
+                ),
+            )
+        else:
+            self.backend = "http1.1"
+            self._client = requests.Session()
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            self._client.mount("https://", adapter)
+            self._client.mount("http://", adapter)
+            self._client.headers.update(headers)
+            self._timeout: tuple = (connect_timeout, read_timeout)
+        logging.info("GraphQL client: %s", self.backend)
+
+    def _post(self, body: bytes) -> tuple:
+        """
+        Отправляет один POST с готовым телом JSON
+
+        Returns:
+            tuple: (статус, разобранный JSON или None, если статус
+            из RETRY_STATUSES, размер ответа в байтах, время разбора JSON)
+
+        Raises:
+            GraphQLError: остальные статусы 4xx/5xx, повтор не поможет
+        """
+        if self.backend == "http2":
+            response = self._client.post(self.url, content=body)
+        else:
+            response = self._client.post(self.url, data=body, timeout=self._timeout)
+        if response.status_code in RETRY_STATUSES:
+            return response.status_code, None, 0, 0.0
+        if response.status_code >= 400:
+            raise GraphQLError(f"HTTP {response.status_code}", response.status_code)
+        body: bytes = response.content
+        started: float = time.perf_counter()
+        data: Any = json.loads(body)
+        return response.status_code, data, len(body), time.perf_counter() - started
+
+    def execute(self, payload: dict) -> Any:
+        """
+        Выполняет GraphQL-запрос, при persisted - по хешу текста запроса
+
+        Args:
+            - 'payload' (dict): тело запроса (operationName, variables, query)
+
+        Returns:
+            Any: JSON ответа
+
+        Raises:
+            GraphQLError: запрос не удался после всех повторов
+        """
+        if not self.persisted or "query" not in payload:
+            return self._execute(payload)
+
+        extensions: dict = {
+            "persistedQuery": {"version": 1, "sha256Hash": query_hash(payload["query"])}
+        }
+        hashed: dict = {
+            "operationName": payload.get("operationName"),
+            "variables": payload.get("variables", {}),
+            "extensions": extensions,
+        }
+        try:
+            response: Any = self._execute(hashed)
+        except GraphQLError as e:
+            if e.status is None or not 400 <= e.status < 500:
+                raise
+            # сервер отклонил запрос без текста: APQ не поддерживается
+            self.persisted = False
+            logging.warning("Persisted queries rejected (%s), sending text", e)
+            return self._execute(payload)
+        error: Optional[str] = request_error(response)
+        if error is None:
+            return response
+        if PERSISTED_NOT_FOUND in error:
+            return self._execute({**payload, "extensions": extensions})
+        if PERSISTED_NOT_SUPPORTED in error:
+            self.persisted = False
+            logging.warning("Persisted queries not supported (%s), sending text", error)
+        else:
+            # ошибка может быть временной: APQ не выключается
+            logging.warning("Persisted query failed (%s), retrying with text", error)
+        return self._execute(payload)
+
+    def _execute(self, payload: dict) -> Any:
+        """
+        Выполняет GraphQL-запрос с повторами
+
+        Args:
+            - 'payload' (dict): тело запроса (operationName, variables, query)
+
+        Returns:
+            Any: JSON ответа
+
+        Raises:
+            GraphQLError: запрос не удался после всех повторов
+        """
+        operation: str = payload.get("operationName", "")
+        body: bytes = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        started: float = time.perf_counter()
+        sent: int = 0
+        reason: Any = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                delay: float = self.backoff * 2 ** (attempt - 1)
+                time.sleep(delay + random.uniform(0, 0.5))
+            sent += len(body)
+            try:
+                status, data, size, decode = self._post(body)
+            except GraphQLError:
+                self._record(operation, started, attempt, failed=True, sent=sent)
+                raise
+            except (requests.RequestException, ValueError) as e:
+                reason = e
+            except Exception as e:
+                if httpx is None or not isinstance(e, httpx.HTTPError):
+                    raise
+                reason = e
+            else:
+                if data is not None:
+                    self._record(
+                        operation,
+                        started,
+                        attempt,
+                        failed=False,
+                        sent=sent,
+                        size=size,
+                        decode=decode,
+                    )
+                    return data
+                reason = f"HTTP {status}"
+            logging.warning(
+                "GraphQL %s attempt %s failed: %s", operation, attempt + 1, reason
+            )
+        self._record(operation, started, self.retries, failed=True, sent=sent)
+        raise GraphQLError(f"{operation}: {reason}")
+
+    def _record(
+        self,
+        operation: str,
+        started: float,
+        retries: int,
+        failed: bool,
+        sent: int = 0,
+        size: int = 0,
+        decode: float = 0.0,
+    ) -> None:
+        """Запоминает время запроса операции вместе с повторами"""
+        with self._lock:
+            entry: dict = self.stats.setdefault(
+                operation,
+                {
+                    "latencies": [],
+                    "retries": 0,
+                    "errors": 0,
+                    "sent": 0,
+                    "bytes": 0,
+                    "decode": 0.0,
+                },
+            )
+            entry["latencies"].append(time.perf_counter() - started)
+            entry["retries"] += retries
+            entry["errors"] += int(failed)
+            entry["sent"] += sent
+            entry["bytes"] += size
+            entry["decode"] += decode
+
+    def log_report(self) -> None:
+        """
+        Логирует по каждой операции число запросов, среднее, p95
+        и максимальное время, повторы, ошибки, байты запросов и ответов
+        и время разбора JSON, затем итог за цикл и обнуляет статистику
+        """
+        with self._lock:
+            stats: dict = self.stats
+            self.stats = {}
+        for operation, entry in sorted(stats.items()):
+            latencies: list = sorted(entry["latencies"])
+            logging.info(
+                "GraphQL %s: %s requests, avg %.0f ms, p95 %.0f ms, max %.0f ms, "
+                "retries %s, errors %s, sent %s bytes, received %s bytes, "
+                "decode %.1f ms",
+                operation,
+                len(latencies),
+                sum(latencies) / len(latencies) * 1000,
+                latencies[int(0.95 * len(latencies))] * 1000,
+                latencies[-1] * 1000,
+                entry["retries"],
+                entry["errors"],
+                entry["sent"],
+                entry["bytes"],
+                entry["decode"] * 1000,
+            )
+        if stats:
+            logging.info(
+                "GraphQL cycle: %s requests, sent %s bytes, received %s bytes, "
+                "decode %.1f ms",
+                sum(len(entry["latencies"]) for entry in stats.values()),
+                sum(entry["sent"] for entry in stats.values()),
+                sum(entry["bytes"] for entry in stats.values()),
+                sum(entry["decode"] for entry in stats.values()) * 1000,
+            )
+
+
+def request_error(response: Any) -> Optional[str]:
+    """
+    Текст ошибки ответа без данных (отклоненный запрос)
+
+    Returns:
+        str|None: сообщение и код первой ошибки или None, если в ответе
+        есть данные
+    """
+    if response is None:
+        return "request rejected"
+    if not isinstance(response, dict) or response.get("data"):
+        return None
+    errors: Any = response.get("errors")
+    if not errors:
+        return None
+    first: dict = errors[0] if isinstance(errors[0], dict) else {}
+    code: Any = (first.get("extensions") or {}).get("code", "")
+    return f"{first.get('message', '')} {code}".strip()
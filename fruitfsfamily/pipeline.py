@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import time
+from typing import Callable
+
+
+class TokenBucket:
+    """
+    Ограничитель частоты запросов «ведро токенов».
+
+    Токены пополняются со скоростью rate в секунду, в ведре не больше
+    burst токенов: короткий всплеск до burst запросов проходит сразу,
+    дальше запросы идут не чаще rate в секунду.
+
+    Args:
+        - 'rate' (float): токенов в секунду
+        - 'burst' (int): емкость ведра
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate: float = rate
+        self.burst: float = float(max(1, burst))
+        self.tokens: float = self.burst
+        self.updated: float = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Ждет токен и забирает его"""
+        async with self._lock:
+            now: float = time.monotonic()
+            self.tokens = min(
+                self.burst, self.tokens + (now - self.updated) * self.rate
+            )
+            self.updated = now
+            wait: float = (1.0 - self.tokens) / self.rate if self.tokens < 1 else 0.0
+            # токен списывается сразу, ожидание под блокировкой выстраивает
+            # следующие запросы в очередь за этим
+            self.tokens -= 1.0
+            if wait > 0:
+                await asyncio.sleep(wait)
+
+
+class ItemPipeline:
+    """
+    Асинхронный конвейер проверки FruitsFamily из трех стадий.
+
+    - Поиск: search_concurrency задач выполняют задачи поиска параллельно,
+    каждая берет токен общего TokenBucket
+    - Дополнение карточкой: enrich_workers задач (enrich)
+    - Отправка: одна задача (notify) ставит товары в очередь
+    TelegramNotifier, сообщения уходят из его фонового потока
+
+    Стадии связаны очередями на queue_size товаров: если дополнение
+    тормозит, поиск ждет места в очереди, а не копит товары в памяти.
+    Синхронные функции (запросы через общий GraphQLClient, отправка)
+    выполняются в потоках через asyncio.to_thread. Новые товары
+    отбирает take_new в цикле событий, поэтому seen_items не требует
+    блокировок.
+
+    Args:
+        - 'rate' (float): максимум запросов поиска в секунду
+        - 'burst' (int): сколько запросов поиска можно отправить сразу
+        - 'search_concurrency' (int): сколько поисков выполняется одновременно
+        - 'enrich_workers' (int): сколько товаров дополняется одновременно
+        - 'queue_size' (int): размер очередей между стадиями
+        - 'take_new' (Callable): (ответ поиска) -> список новых товаров
+        - 'enrich' (Callable): товар -> товар с нужными полями
+        - 'notify' (Callable): отправка товара
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int,
+        search_concurrency: int,
+        enrich_workers: int,
+        queue_size: int,
+        take_new: Callable,
+        enrich: Callable,
+        notify: Callable,
+    ) -> None:
+        self.rate: float = rate
+        self.burst: int = burst
+        self.search_concurrency: int = max(1, search_concurrency)
+        self.enrich_workers: int = max(1, enrich_workers)
+        self.queue_size: int = max(1, queue_size)
+        self.take_new: Callable = take_new
+        self.enrich: Callable = enrich
+        self.notify: Callable = notify
+
+    async def run(self, jobs: list) -> int:
+        """
+        Выполняет один цикл проверки
+
+        Args:
+            - 'jobs' (list): задачи поиска, каждая - функция без аргументов,
+            возвращающая список (фильтр, ответ поиска)
+
+        Returns:
+            int: сколько новых товаров найдено
+        """
+        bucket = TokenBucket(self.rate, self.burst)
+        pending: asyncio.Queue = asyncio.Queue()
+        for job in jobs:
+            pending.put_nowait(job)
+        to_enrich: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        to_notify: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        started: float = time.monotonic()
+        found: int = 0
+
+        async def searcher() -> None:
+            nonlocal found
+            while not pending.empty():
+                job: Callable = pending.get_nowait()
+                await bucket.acquire()
+                try:
+                    results: list = await asyncio.to_thread(job)
+                except Exception as e:
+                    logging.error("Error search job: %s", e)
+                    continue
+                for label, result in results:
+                    try:
+                        products: list = self.take_new(label, result)
+                    except Exception as e:
+                        logging.error("Error read results for %s: %s", label, e)
+                        continue
+                    found += len(products)
+                    for product in products:
+                        await to_enrich.put(product)
+
+        async def enricher() -> None:
+            while True:
+                product: dict = await to_enrich.get()
+                try:
+                    product = await asyncio.to_thread(self.enrich, product)
+                    await to_notify.put(product)
+                except Exception as e:
+                    logging.error("Error enrich product: %s", e)
+                finally:
+                    to_enrich.task_done()
+
+        async def notifier() -> None:
+            while True:
+                product: dict = await to_notify.get()
+                try:
+                    await asyncio.to_thread(self.notify, product)
+                except Exception as e:
+                    logging.error("Error notify product: %s", e)
+                finally:
+                    to_notify.task_done()
+
+        consumers: list = [
+            asyncio.create_task(enricher()) for _ in range(self.enrich_workers)
+        ]
+        consumers.append(asyncio.create_task(notifier()))
+        await asyncio.gather(
+            *(
+                asyncio.create_task(searcher())
+                for _ in range(min(self.search_concurrency, len(jobs)))
+            )
+        )
+        await to_enrich.join()
+        await to_notify.join()
+        for task in consumers:
+            task.cancel()
+
+        logging.info(
+            "Async check: %s search jobs, %s new items in %.1f s",
+            len(jobs),
+            found,
+            time.monotonic() - started,
+        )
+        return found
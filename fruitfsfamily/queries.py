@@ -0,0 +1,79 @@
+import hashlib
+
+# Поля товара в выдаче поиска: вывод в консоль, сообщение в Telegram
+# (title, size, condition, price, resizedSmallImages) и водяной знак (id)
+SEARCH_FIELDS: str = """
+    id
+    title
+    price
+    brand
+    size
+    condition
+    status
+    external_url
+    resizedSmallImages
+"""
+
+# Поля карточки товара: только то, чего может не хватить в выдаче
+DETAIL_FIELDS: str = """
+    id
+    title
+    price
+    size
+    condition
+    resizedSmallImages
+"""
+
+SEARCH_ARGS: str = "$filter: ProductFilter!, $offset: Int, $limit: Int, $sort: String"
+SEARCH_CALL: str = (
+    "searchProducts(filter: $filter, offset: $offset, limit: $limit, sort: $sort)"
+)
+
+# Минимальные запросы по операциям
+OPERATIONS: dict = {
+    "searchProducts": (
+        f"query searchProducts({SEARCH_ARGS}) {{\n"
+        f"  {SEARCH_CALL} {{{SEARCH_FIELDS}  }}\n}}\n"
+    ),
+    "SeeProducts": (
+        f"query SeeProducts({SEARCH_ARGS}) {{\n"
+        f"  {SEARCH_CALL} {{{SEARCH_FIELDS}  }}\n}}\n"
+    ),
+    "seeProduct": (
+        "query seeProduct($productID: Int!) {\n"
+        f"  seeProduct(id: $productID) {{{DETAIL_FIELDS}  }}\n}}\n"
+    ),
+}
+
+
+def build_payload(operation: str, variables: dict) -> dict:
+    """
+    Собирает тело запроса операции из реестра OPERATIONS
+
+    Args:
+        - 'operation' (str): имя операции
+        - 'variables' (dict): переменные запроса
+
+    Returns:
+        dict: тело запроса (operationName, variables, query)
+    """
+    return {
+        "operationName": operation,
+        "variables": variables,
+        "query": OPERATIONS[operation],
+    }
+
+
+def search_variables(filter_key: str, value: str, offset: int, limit: int) -> dict:
+    """Переменные searchProducts/SeeProducts для одного фильтра"""
+    return {
+        "filter": {filter_key: value, "colorIds": [], "size_filter": []},
+        "sort": "NEW",
+        "offset": offset,
+        "limit": limit,
+    }
+
+
+def query_hash(query: str) -> str:
+    """sha256 текста запроса для persisted query (APQ)"""
+    return hashlib.sha256(query.encode("utf-8")).hexdigest()
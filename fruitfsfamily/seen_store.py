@@ -0,0 +1,214 @@
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Optional
+
+
+class SeenStore:
+    """
+    Хранилище просмотренных товаров: журнал только на дозапись и снимок.
+
+    - add дописывает строку "<время>\\t<id>" в буфер, flush записывает
+    буфер в <path>.log одним write и одним fsync (раз в цикл), поэтому
+    ввод-вывод за цикл пропорционален числу новых товаров
+    - id приводятся к строке: 123 из JSON и "123" из файла - один товар
+    - Когда в журнале набирается compact_every записей, журнал
+    переименовывается в <path>.log.old, а фоновый поток пишет снимок
+    <path>.snapshot из keep самых новых товаров (по времени добавления)
+    и удаляет .old
+    - При запуске читается снимок (один json.load) и дописанный после
+    него журнал; оборванная при сбое последняя строка отрезается
+    - Если хранилища еще нет, товары переносятся из legacy_file
+    (прежний seen_items.txt)
+
+    Args:
+        - 'path' (str): путь без расширения для .log и .snapshot
+        - 'keep' (int): сколько самых новых товаров хранить
+        - 'compact_every' (int): после скольких записей журнала сжимать
+        - 'legacy_file' (str, optional): прежний текстовый файл id
+    """
+
+    def __init__(
+        self,
+        path: str,
+        keep: int,
+        compact_every: int,
+        legacy_file: Optional[str] = None,
+    ) -> None:
+        self.log_path: str = f"{path}.log"
+        self.old_log_path: str = f"{path}.log.old"
+        self.snapshot_path: str = f"{path}.snapshot"
+        self.keep: int = max(1, keep)
+        self.compact_every: int = max(1, compact_every)
+        self._items: dict = {}
+        self._pending: list = []
+        self._log_records: int = 0
+        self._lock = threading.Lock()
+        self._compactor: Optional[threading.Thread] = None
+        started: float = time.perf_counter()
+        self._load()
+        if not self._items and legacy_file:
+            self._migrate(legacy_file)
+        logging.info(
+            "Seen store loaded: %s items in %.3f s",
+            len(self._items),
+            time.perf_counter() - started,
+        )
+
+    def _load(self) -> None:
+        """Читает снимок и журналы, дописанные после него"""
+        try:
+            with open(self.snapshot_path, "r", encoding="utf-8") as f:
+                snapshot: dict = json.load(f)
+            self._items = dict(zip(snapshot["ids"], snapshot["times"]))
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError) as e:
+            logging.error("Seen snapshot not read: %s", e)
+        for log_path in (self.old_log_path, self.log_path):
+            self._log_records += self._replay(log_path)
+
+    def _replay(self, log_path: str) -> int:
+        """
+        Добавляет в память записи журнала. Оборванная при сбое последняя
+        строка отрезается, чтобы следующая запись не склеилась с ней.
+
+        Returns:
+            int: сколько записей прочитано
+        """
+        try:
+            with open(log_path, "rb") as f:
+                data: bytes = f.read()
+        except FileNotFoundError:
+            return 0
+        lines: list = data.split(b"\n")
+        if lines[-1]:
+            logging.warning("Seen log %s: torn last record dropped", log_path)
+            with open(log_path, "r+b") as f:
+                f.truncate(len(data) - len(lines[-1]))
+        records: int = 0
+        for line in lines[:-1]:
+            added, _, item_id = line.decode("utf-8", "replace").partition("\t")
+            try:
+                self._items[item_id] = float(added)
+            except ValueError:
+                continue
+            records += 1
+        return records
+
+    def _migrate(self, legacy_file: str) -> None:
+        """Переносит id из прежнего текстового файла"""
+        try:
+            with open(legacy_file, "r", encoding="utf-8") as f:
+                legacy_ids: list = [line.strip() for line in f if line.strip()]
+        except FileNotFoundError:
+            return
+        for item_id in legacy_ids:
+            self.add(item_id)
+        self.flush()
+        logging.info("Migrated %s seen items from %s", len(legacy_ids), legacy_file)
+
+    def __contains__(self, item_id: Any) -> bool:
+        return str(item_id) in self._items
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def add(self, item_id: Any) -> bool:
+        """
+        Запоминает товар
+
+        Returns:
+            bool: True, если товар новый
+        """
+        key: str = str(item_id)
+        with self._lock:
+            if key in self._items:
+                return False
+            added: float = time.time()
+            self._items[key] = added
+            self._pending.append(f"{added:.3f}\t{key}\n")
+        return True
+
+    def flush(self) -> None:
+        """
+        Дописывает накопленные записи в журнал с одним fsync
+        и при необходимости запускает фоновое сжатие
+        """
+        with self._lock:
+            if not self._pending:
+                return
+            lines: list = self._pending
+            self._pending = []
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.writelines(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self._log_records += len(lines)
+            if self._log_records < self.compact_every or self._compacting():
+                return
+            items: list = self._rotate()
+        self._compactor = threading.Thread(
+            target=self._write_snapshot, args=(items,), daemon=True
+        )
+        self._compactor.start()
+
+    def _compacting(self) -> bool:
+        return self._compactor is not None and self._compactor.is_alive()
+
+    def _rotate(self) -> list:
+        """
+        Откладывает журнал в .old и оставляет в памяти keep новейших
+        товаров (вызывается под блокировкой)
+
+        Returns:
+            list: пары (id, время) для снимка
+        """
+        if os.path.exists(self.old_log_path):
+            # прошлое сжатие не завершилось: .old еще не в снимке
+            with open(self.log_path, "r", encoding="utf-8") as src, open(
+                self.old_log_path, "a", encoding="utf-8"
+            ) as dst:
+                dst.write(src.read())
+            os.remove(self.log_path)
+        else:
+            os.replace(self.log_path, self.old_log_path)
+        self._log_records = 0
+        items: list = list(self._items.items())[-self.keep:]
+        self._items = dict(items)
+        return items
+
+    def _write_snapshot(self, items: list) -> None:
+        """Пишет снимок во временный файл, подменяет старый и удаляет .old"""
+        started: float = time.perf_counter()
+        partial: str = f"{self.snapshot_path}.partial"
+        try:
+            with open(partial, "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "ids": [item_id for item_id, _ in items],
+                        "times": [added for _, added in items],
+                    },
+                    f,
+                    separators=(",", ":"),
+                )
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(partial, self.snapshot_path)
+            os.remove(self.old_log_path)
+        except OSError as e:
+            logging.error("Error compact seen store: %s", e)
+            return
+        logging.info(
+            "Seen store compacted: %s items in %.3f s",
+            len(items),
+            time.perf_counter() - started,
+        )
+
+    def close(self) -> None:
+        """Записывает буфер и дожидается фонового сжатия"""
+        self.flush()
+        if self._compactor is not None:
+            self._compactor.join()
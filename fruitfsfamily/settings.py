@@ -13,5 +13,57 @@ SEARCH_BRAND = [
 SEEN_FILE = 'seen_items.txt'
 MAX_CSV_ROWS = 50000
 KEEP_CSV_ROWS = 20000
-MAX_SEEN_FILE_SIZE_MB = 10
 MAX_TXT_LOG_SIZE_MB = 5
+TELEGRAM_BOT_TOKEN = ''
+TELEGRAM_CHAT_ID = ''
+# Очередь отправки в Telegram: сколько сообщений ждут фонового потока
+TELEGRAM_QUEUE_SIZE = 200
+# Сколько фото в очереди отправлять по одному, больше - альбомами
+TELEGRAM_ALBUM_THRESHOLD = 3
+# Минимальный интервал между запросами к Telegram, секунд
+TELEGRAM_MIN_INTERVAL = 1.0
+# Сколько карточек товаров (seeProduct) держать в кеше
+DETAILS_CACHE_SIZE = 2000
+# Время жизни карточки товара в кеше, секунд
+DETAILS_CACHE_TTL_SECONDS = 3600
+# Таймауты подключения и чтения запроса к GraphQL API, секунд
+GRAPHQL_CONNECT_TIMEOUT = 5.0
+GRAPHQL_READ_TIMEOUT = 15.0
+# Сколько раз повторять неудачный запрос и базовая задержка повтора, секунд
+GRAPHQL_RETRIES = 3
+GRAPHQL_BACKOFF_SECONDS = 1.0
+# HTTP/2, если установлен httpx[http2] (иначе keep-alive HTTP/1.1)
+GRAPHQL_HTTP2 = True
+# Запрашивать выдачу по нескольким терминам/брендам одним запросом (алиасы)
+BATCH_QUERIES = True
+# Сколько терминов или брендов в одном пакетном запросе
+BATCH_SIZE = 12
+# Интервал между началами проверок, секунд
+CHECK_INTERVAL_SECONDS = 40
+# Асинхронный конвейер: параллельный поиск, дополнение и отправка стадиями
+ASYNC_MODE = True
+# Сколько поисковых запросов выполняется одновременно
+SEARCH_CONCURRENCY = 4
+# Общий лимит поисковых запросов в секунду и допустимый всплеск
+REQUESTS_PER_SECOND = 2.0
+REQUESTS_BURST = 4
+# Сколько товаров одновременно дополняется карточкой seeProduct
+ENRICH_WORKERS = 2
+# Размер очередей между стадиями конвейера
+STAGE_QUEUE_SIZE = 20
+# Журнал и снимок просмотренных товаров (<путь>.log, <путь>.snapshot);
+# SEEN_FILE читается один раз для переноса старой истории
+SEEN_STORE_PATH = 'seen_items'
+# Сколько самых новых просмотренных товаров хранить
+SEEN_KEEP_ITEMS = 50000
+# После скольких записей журнала сжимать его в снимок
+SEEN_COMPACT_EVERY = 2000
+# Сколько товаров запрашивать по фильтру за проверку (не больше)
+PAGE_LIMIT = 40
+# Водяные знаки: сначала маленькая страница, дальше - только пока есть новые
+WATERMARKS = True
+WATERMARKS_FILE = 'watermarks.json'
+# Размер первой страницы выдачи при WATERMARKS
+FIRST_PAGE_SIZE = 5
+# Отправлять sha256 запроса вместо текста (persisted queries), если сервер умеет
+PERSISTED_QUERIES = True
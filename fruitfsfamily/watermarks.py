@@ -0,0 +1,69 @@
+import json
+import logging
+import os
+import threading
+from typing import Optional
+
+
+class Watermarks:
+    """
+    Водяные знаки фильтров поиска: наибольший id товара, уже
+    полученного по фильтру (id товаров FruitsFamily растут со временем).
+
+    По знаку видно, есть ли в странице выдачи товары новее прошлого цикла:
+    пока в странице есть товары новее знака, имеет смысл запросить
+    следующую (сортировка не строго по id, поэтому одного старого товара
+    для остановки мало).
+    Знаки хранятся в json-файле и переживают перезапуск.
+
+    Args:
+        - 'path' (str): json-файл со знаками
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path: str = path
+        self._lock = threading.Lock()
+        self._changed: bool = False
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                self._marks: dict = json.load(f)
+        except FileNotFoundError:
+            self._marks = {}
+        except ValueError as e:
+            logging.error("Watermarks not read: %s", e)
+            self._marks = {}
+
+    def get(self, key: str) -> Optional[int]:
+        """Возвращает знак фильтра или None, если фильтр еще не запрашивался"""
+        with self._lock:
+            return self._marks.get(key)
+
+    def is_newer(self, key: str, product: dict) -> bool:
+        """Новее ли товар знака фильтра (без знака - любой товар новый)"""
+        mark: Optional[int] = self.get(key)
+        return mark is None or int(product["id"]) > mark
+
+    def update(self, key: str, products: list) -> None:
+        """Поднимает знак фильтра до наибольшего id из products"""
+        if not products:
+            return
+        newest: int = max(int(product["id"]) for product in products)
+        with self._lock:
+            if newest > self._marks.get(key, -1):
+                self._marks[key] = newest
+                self._changed = True
+
+    def save(self) -> None:
+        """Записывает знаки в файл, если они изменились"""
+        with self._lock:
+            if not self._changed:
+                return
+            marks: dict = dict(self._marks)
+            self._changed = False
+        partial: str = f"{self.path}.partial"
+        try:
+            with open(partial, "w", encoding="utf-8") as f:
+                json.dump(marks, f, ensure_ascii=False, indent=1)
+            os.replace(partial, self.path)
+        except OSError as e:
+            logging.error("Error save watermarks: %s", e)
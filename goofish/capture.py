@@ -0,0 +1,181 @@
+import base64
+import json
+import logging
+import re
+import threading
+import time
+from typing import Any, Optional
+
+from parsing import ITEM_URL
+
+SEARCH_API: str = "mtop.taobao.idlemtopsearch.pc.search"
+# Ответ mtop может прийти в обертке JSONP: mtopjsonp3({...})
+JSONP_RE = re.compile(r"^\s*[\w$.]+\((.*)\)\s*;?\s*$", re.S)
+
+
+def unwrap_jsonp(body: str) -> Any:
+    """
+    Разбирает тело ответа mtop: JSON или JSONP
+
+    Returns:
+        Any: разобранный JSON
+    """
+    match = JSONP_RE.match(body)
+    return json.loads(match.group(1) if match else body)
+
+
+def to_product(entry: dict) -> Optional[dict]:
+    """
+    Приводит элемент resultList поискового API к словарю товара
+
+    Args:
+        - 'entry' (dict): элемент data.resultList
+
+    Returns:
+        dict|None: id, title, price, image, publish_time, link
+        или None, если это не карточка товара
+    """
+    main: dict = entry.get("data", {}).get("item", {}).get("main", {})
+    content: dict = main.get("exContent") or {}
+    args: dict = (main.get("clickParam") or {}).get("args") or {}
+    item_id = content.get("itemId") or args.get("item_id") or args.get("id")
+    if not item_id:
+        return None
+
+    price_parts = content.get("price")
+    if isinstance(price_parts, list):
+        price: Optional[str] = "".join(
+            str(part.get("text", "")) for part in price_parts
+        ) or None
+    else:
+        price = args.get("price")
+
+    image: Optional[str] = content.get("picUrl")
+    if image and image.startswith("//"):
+        image = "https:" + image
+
+    publish_time = args.get("publishTime")
+    return {
+        "id": str(item_id),
+        "title": content.get("title"),
+        "price": price,
+        "image": image,
+        "publish_time": int(publish_time) if publish_time else None,
+        "link": ITEM_URL.format(item_id),
+    }
+
+
+def parse_search_response(body: str) -> Optional[list]:
+    """
+    Достает товары из ответа поискового API
+
+    Args:
+        - 'body' (str): тело ответа mtop.taobao.idlemtopsearch.pc.search
+
+    Returns:
+        List|None: все товары ответа в порядке выдачи или None,
+        если ответ не удалось разобрать
+    """
+    try:
+        result_list: list = unwrap_jsonp(body)["data"]["resultList"]
+    except (ValueError, KeyError, TypeError) as e:
+        logging.warning("Search response not parsed: %s", e)
+        return None
+
+    products: list = []
+    for entry in result_list:
+        try:
+            product: Optional[dict] = to_product(entry)
+        except Exception as e:
+            logging.error("Error parse search item %s", e)
+            continue
+        if product:
+            products.append(product)
+    return products
+
+
+class SearchCapture:
+    """
+    Перехват ответов поискового API goofish через CDP-события браузера.
+
+    Браузер должен быть запущен с uc.Chrome(enable_cdp_events=True).
+    Слушатель Network.responseReceived запоминает requestId ответов
+    SEARCH_API, тело читается через Network.getResponseBody. Так товары
+    берутся прямо из JSON, без page_source и BeautifulSoup, и все
+    товары страницы, а не первые 4 карточки.
+
+    Args:
+        - 'driver' (uc.Chrome): браузер с включенными CDP-событиями
+    """
+
+    def __init__(self, driver) -> None:
+        self.driver = driver
+        self._request_ids: list = []
+        self._lock = threading.Lock()
+        self.attached: bool = bool(
+            driver.add_cdp_listener("Network.responseReceived", self._on_response)
+        )
+
+    def _on_response(self, message: dict) -> None:
+        """Слушатель Network.responseReceived (поток reactor uc)"""
+        params: dict = message.get("params", {})
+        if SEARCH_API in params.get("response", {}).get("url", ""):
+            with self._lock:
+                self._request_ids.append(params["requestId"])
+
+    def reset(self) -> None:
+        """Забывает перехваченные ответы (перед действием, меняющим выдачу)"""
+        with self._lock:
+            self._request_ids.clear()
+
+    def _body(self, request_id: str, deadline: float) -> Optional[str]:
+        """Читает тело ответа, пока оно не загрузится или не выйдет время"""
+        while True:
+            try:
+                response: dict = self.driver.execute_cdp_cmd(
+                    "Network.getResponseBody", {"requestId": request_id}
+                )
+                body: str = response["body"]
+                if response.get("base64Encoded"):
+                    body = base64.b64decode(body).decode("utf-8")
+                return body
+            except Exception as e:
+                if time.monotonic() >= deadline:
+                    logging.warning("Search response body not read: %s", e)
+                    return None
+                time.sleep(0.25)
+
+    def products(self, timeout: float) -> Optional[list]:
+        """
+        Ждет ответа поискового API после reset и возвращает его товары
+
+        Примечания:
+        - Если ответов несколько, берется последний
+        (выдача после сортировки)
+
+        Args:
+            - 'timeout' (float): сколько ждать ответа в секундах
+
+        Returns:
+            List|None: товары или None, если ответ не перехвачен -
+            тогда нужен разбор page_source
+        """
+        if not self.attached:
+            return None
+        deadline: float = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                request_ids: list = list(self._request_ids)
+            if request_ids or time.monotonic() >= deadline:
+                break
+            time.sleep(0.25)
+
+        for request_id in reversed(request_ids):
+            body: Optional[str] = self._body(request_id, deadline)
+            if body is None:
+                continue
+            products: Optional[list] = parse_search_response(body)
+            if products is not None:
+                return products
+        logging.info("Search response not captured in %.0f s", timeout)
+        return None
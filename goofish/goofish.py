@@ -1,14 +1,15 @@
 import logging
+import multiprocessing
 import os
+import queue
 import random
-import subprocess
 import time
-from collections import deque
-from typing import Any
+from collections import Counter
+from functools import partial
+from typing import Any, Callable, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
-import requests
 import undetected_chromedriver as uc
-from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
 from selenium.webdriver.common.action_chains import ActionChains
 from selenium.webdriver.common.by import By
@@ -16,13 +17,39 @@ from selenium_stealth import stealth
 from telebot import TeleBot
 from urllib3.exceptions import MaxRetryError, NewConnectionError
 
+import common_path  # noqa: F401
+from capture import SearchCapture
+from common.browser_lifecycle import BrowserLifecycle
+from common.chrome_cache import ChromeStartupCache
+from common.dedup import DedupIndex
+from common.notifier import TelegramNotifier
+from common.waits import ReadinessWaiter
 from parameters import (
+    ALIAS_GROUPS,
+    BROWSER_MAX_AGE_SECONDS,
+    BROWSER_MAX_RSS_MB,
+    CAPTURE_TIMEOUT,
+    CDP_CAPTURE,
+    CHROME_CACHE_DIR,
+    DEDUP_TTL_SECONDS,
+    DEMOTED_EVERY,
     LAST_ITEMS_MAX_SIZE,
     MAX_TXT_LOG_SIZE_MB,
+    PLANNER_WINDOW,
+    TELEGRAM_ALBUM_THRESHOLD,
     TELEGRAM_BOT_TOKEN,
+    TAB_POOL_SIZE,
     TELEGRAM_CHAT_ID,
+    TELEGRAM_MIN_INTERVAL,
+    TELEGRAM_QUEUE_SIZE,
+    WARM_PROFILE,
+    WORKER_COUNT,
+    WORKER_URLS_PER_HOUR,
     params_list,
 )
+from parsing import parse_cards
+from planner import QueryPlanner, item_key, split_shards
+from tab_pool import TabPool
 
 logging.basicConfig(
     level=logging.INFO,
@@ -32,172 +59,106 @@ logging.basicConfig(
 
 ua = UserAgent()
 bot = TeleBot(token=TELEGRAM_BOT_TOKEN)
-urls_set: set = set()
-urls_queue = deque(maxlen=LAST_ITEMS_MAX_SIZE)
+notifier = TelegramNotifier(
+    TELEGRAM_BOT_TOKEN,
+    TELEGRAM_CHAT_ID,
+    TELEGRAM_QUEUE_SIZE,
+    TELEGRAM_ALBUM_THRESHOLD,
+    TELEGRAM_MIN_INTERVAL,
+)
+urls_set = DedupIndex(LAST_ITEMS_MAX_SIZE, DEDUP_TTL_SECONDS)
+MAX_PRODUCTS: int = 4
+# Как часто шардированный режим проверяет, живы ли воркеры, секунд
+WORKER_CHECK_SECONDS: float = 5.0
+FEEDS_ITEM_SELECTOR: str = (
+    '[class*="feeds-list-container"] a[class*="feeds-item-wrap"]'
+)
+SORT_TITLE_SELECTOR: str = '[class*="search-select-title"]'
+SORT_OPTION_SELECTOR: str = '[class*="search-select-item"]'
+SORT_TAB_SELECTOR: str = '[class="item--m9jSTUup"]'
+SORT_NEWEST_XPATH: str = (
+    "//*[contains(@class, 'search-select-item') and normalize-space()='最新']"
+)
+# Параметры, с которыми выдача сразу открывается от новых к старым
+SORT_NEWEST_PARAMS: dict = {"sortField": "create", "sortValue": "desc"}
+selector_misses: Counter = Counter()
+lifecycle = BrowserLifecycle(BROWSER_MAX_AGE_SECONDS, BROWSER_MAX_RSS_MB)
+chrome_cache = ChromeStartupCache(CHROME_CACHE_DIR, WARM_PROFILE)
 
 
 def send_product_to_telegram(product: dict) -> None:
     """
-    Отправляет информацию о товаре в Telegram-чат, используя метод sendPhoto (если есть изображение)
-    или sendMessage (если изображения нет).
+    Ставит информацию о товаре в очередь отправки в Telegram-чат:
+    sendPhoto (если есть изображение) или sendMessage (если изображения нет).
 
     Формат сообщения:
     - Цена: {цена}
     - Ссылка: {ссылка на товар}
 
     Примечания:
+    - Отправляет фоновый поток общего TelegramNotifier (common/notifier.py),
+    функция не ждет Telegram; паузы и повторы после 429 - там же
+    - Если в очереди больше TELEGRAM_ALBUM_THRESHOLD товаров с фото,
+    они уходят альбомами (sendMediaGroup) по 10 фото
     - Если подпись (caption) превышает 1024 символа,
     она обрезается до 1020 символов с добавлением "..."
-    - В случае ошибки при отправке сообщения ошибка логируется,
-    но исключение не пробрасывается
+    - Ошибки отправки логируются, исключение не пробрасывается
 
     Args:
         product (dict): Словарь с информацией о товаре, должен содержать ключи:
-            - 'image' (str, optional): URL изображения товара. Если отсутствует или пустой -
-                                      используется текстовое сообщение
+            - 'image' (str, optional): URL изображения товара. Если отсутствует
+            или пустой - используется текстовое сообщение
             - 'price' (str): Цена товара
             - 'link' (str): Ссылка на товар
 
     Returns:
         None: Функция ничего не возвращает
-
-    Raises:
-        Не пробрасывает исключения, но логирует ошибки в следующих случаях:
-        - Ошибка сети или таймаут при обращении к API Telegram
-        - Неожиданная ошибка при формировании запроса
     """
-    if product["image"]:
-        telegram_url: str = (
-            f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendPhoto"
-        )
-        caption: str = f"Цена: {product['price']}\nСсылка: {product['link']}"
-        if len(caption) > 1024:
-            caption: str = caption[:1020] + "..."
-        data: dict = {
-            "chat_id": TELEGRAM_CHAT_ID,
-            "caption": caption,
-            "photo": product["image"],
-        }
-        try:
-            logging.info("send message")
-            send_message = requests.post(telegram_url, data=data, timeout=10)
-            send_message.raise_for_status()
-        except Exception as e:
-            logging.error("Ошибка при отправке фото в Telegram: %s", e)
-    else:
-        telegram_url: str = (
-            f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-        )
-        text: str = f"Цена: {product['price']}\nСсылка: {product['link']}"
-        data: dict = {"chat_id": TELEGRAM_CHAT_ID, "text": text}
-        try:
-            send_message = requests.post(telegram_url, data=data, timeout=10)
-            send_message.raise_for_status()
-        except Exception as e:
-            logging.error("Ошибка при отправке сообщения в Telegram: %s", e)
+    text: str = f"Цена: {product['price']}\nСсылка: {product['link']}"
+    notifier.send(text, product["image"] or None)
 
 
 def add_url(url: str) -> bool:
     """
-    URL добавляется во множество sent_products
-    и в очередь urls_queue (если URL нет в sent_products)
+    URL добавляется в индекс urls_set (если его там нет)
     или возвращает False.
 
     Примечания:
-    - Если длина очереди превышает максимальное значение,
-    то последний элемент из очереди и из множества удаляется.
+    - Ключ индекса - id товара (item_key), а не ссылка целиком: товар
+    из перехваченного ответа API и тот же товар из html выдачи
+    считаются одним товаром
+    - urls_set (DedupIndex) хранит не больше LAST_ITEMS_MAX_SIZE
+    хешей ключей, вытесняются те, что дольше всех не встречались.
 
     Args:
         - 'url' (str): URL ссылка на товар
-        - 'sent_products' (set): множество найденных объявлений на товар
-        - 'urls_queue' (deque): список найденных объявлений
 
     Returns:
-        Bool: Функция возвращает Истина или Лож в зависимости от выполнения условия
+        Bool: Функция возвращает Истина или Лож
+        в зависимости от выполнения условия
     """
-    if url not in urls_set:
-        urls_set.add(url)
-        urls_queue.append(url)
-        if len(urls_queue) > urls_queue.maxlen:
-            old_url = urls_queue.popleft()
-            urls_set.remove(old_url)
-        return True
-    return False
+    return urls_set.add(item_key(url))
 
 
-def get_ads_by_url(html: Any, first_iter: bool) -> Any:
+def handle_products(products: list, first_iter: bool) -> None:
     """
-    Парсит страницу сайта. Ищет нужные параметры.
-    При найденном новом объявлении заходит в send_product_to_telegram()
-
-    Основные функции:
-    1. выполняет поиск url ссылки
-    2. выполняет поиск фото товара
-    3. Проверяет поиск цены товары
+    Отправляет новые объявления в send_product_to_telegram()
 
     Примечания:
-    - Если в html или в container ничего нет, то возвращает пустой список.
+    - Карточки со страницы разбирает parse_cards: дерево строится только
+    для контейнера выдачи и первых MAX_PRODUCTS карточек
 
     Args:
-        - 'html' (none): html код страницы сайта
-        - 'soup' (BeautifulSoup): создает объект BeautifulSoup,
-        который парсит (разбирает) HTML-документ для дальнейшего извлечения данных
-        - 'container': найденные данные из HTML-документа
-        - 'link' (str): ссылка на товар
-        - 'image' (str): изображение товара
-        - 'price' (str): цена товара
+        - 'products' (list): товары со страницы, от новых к старым
+        - 'first_iter' (bool): первая итерация (сообщения не отправляются)
 
     Returns:
-        List|None: Функция возвращает пустой список или ничего
-
-    Raises:
-        При исключении возвращает None.
-        Логирует ошибки в следующих случаях:
-        - Неожиданная ошибка при формировании запроса
+        None: Функция ничего не возвращает
     """
-    soup = BeautifulSoup(html, "html.parser")
-    container = soup.find("div", class_="feeds-list-container--UkIMBPNk")
-
-    if not container:
-        return []
-
-    try:
-        links = container.find_all("a", class_="feeds-item-wrap--rGdH_KoF", href=True)
-        for a_tag in links[:4]:
-            link: str = a_tag["href"]
-            if not link.startswith("http"):
-                link: str = "https://www.goofish.com/" + link
-
-            img_tag = a_tag.find("img")
-            if img_tag and img_tag.get("src"):
-                image: str = img_tag["src"]
-                if image.startswith("//"):
-                    image: str = "https:" + image
-                elif image.startswith("/"):
-                    image: str = "https://www.goofish.com/" + image
-            else:
-                image: None = None
-
-            price_container = a_tag.find(class_="price-wrap--YzmU5cUl")
-            if price_container:
-                currency: str = price_container.find(
-                    class_="sign--x6uVdG3X"
-                ).text.strip()
-                number: str = price_container.find(
-                    class_="number--NKh1vXWM"
-                ).text.strip()
-                price: str = number + currency
-            else:
-                price: None = None
-
-            if add_url(link):
-                if not first_iter:
-                    send_product_to_telegram(
-                        {"link": link, "image": image, "price": price}
-                    )
-
-    except Exception as e:
-        logging.error("Error add new ad %s", e)
+    for product in products:
+        if add_url(product["link"]):
+            if not first_iter:
+                send_product_to_telegram(product)
 
 
 def random_scroll(driver) -> None:
@@ -223,37 +184,127 @@ def random_scroll(driver) -> None:
         time.sleep(random.uniform(8.0, 13.0))
 
 
-def process_url(first_iter: bool) -> None:
+def sorted_url(url: str) -> str:
     """
-    Обрабатывает список URL через headless-браузер с эмуляцией человеческого поведения.
+    Добавляет к ссылке поиска параметры сортировки от новых к старым
 
-    Основной функционал:
-    - Открывает Chrome в режиме без графического интерфейса (headless=True)
-    - Настраивает параметры stealth-режима для обхода антибот-систем
-    - Последовательно обрабатывает каждый URL из params_list
-    - Выполняет сортировку результатов по дате ("最新" - новейшие)
-    - Эмулирует человеческое поведение (случайные скроллы, задержки)
-    - Извлекает HTML-контент страницы и передает в get_ads_by_url()
-    - Управляет вкладками браузера для улучшения маскировки
+    Args:
+        - 'url' (str): ссылка на страницу поиска
 
-    Обрабатываемые исключения:
-        - MaxRetryError: Проблемы с подключением
-        - NewConnectionError: Ошибки сети
-        - Общие исключения (Exception)
+    Returns:
+        str: ссылка с SORT_NEWEST_PARAMS
     """
-    html_page = None
-    browser = None
+    parts = urlsplit(url)
+    query: dict = dict(parse_qsl(parts.query, keep_blank_values=True))
+    query.update(SORT_NEWEST_PARAMS)
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def find_element(browser, by: str, selector: str, name: str) -> Any:
+    """
+    Ищет элемент, промах учитывается в selector_misses под именем name
+
+    Returns:
+        Any: элемент или None
+    """
+    try:
+        return browser.find_element(by, selector)
+    except Exception as e:
+        selector_misses[name] += 1
+        logging.warning("Selector %s missed: %s", name, type(e).__name__)
+        return None
+
+
+def is_sorted_newest(browser, products: Optional[list]) -> bool:
+    """
+    Проверяет, что выдача отсортирована от новых к старым: по времени
+    публикации перехваченных товаров, а без них - по заголовку меню
+    сортировки
+
+    Примечания:
+    - Допускается одна перестановка на десять товаров
+    (закрепленные объявления в начале выдачи)
+
+    Args:
+        - 'browser' (uc.Chrome): браузер
+        - 'products' (list, optional): перехваченные товары
+
+    Returns:
+        Bool: Истина, если выдача от новых к старым
+    """
+    times: list = [
+        product["publish_time"]
+        for product in products or []
+        if product.get("publish_time")
+    ]
+    if len(times) >= 2:
+        inversions: int = sum(1 for a, b in zip(times, times[1:]) if a < b)
+        return inversions <= len(times) // 10
+    title = find_element(browser, By.CSS_SELECTOR, SORT_TITLE_SELECTOR, "sort_title")
+    return title is not None and "最新" in title.text
+
+
+def sort_by_menu(browser, waiter: ReadinessWaiter) -> bool:
+    """
+    Запасной путь: сортировка выдачи кликами по меню ("最新" - новейшие)
+
+    Returns:
+        Bool: Истина, если все клики выполнены
+    """
+    sort_tab = find_element(browser, By.CSS_SELECTOR, SORT_TAB_SELECTOR, "sort_tab")
+    if sort_tab is not None:
+        sort_tab.click()
+        waiter.wait(SORT_TITLE_SELECTOR, budget=10.5, timeout=13.0)
+    sort_title = find_element(
+        browser, By.CSS_SELECTOR, SORT_TITLE_SELECTOR, "sort_title"
+    )
+    if sort_title is None:
+        return False
+    sort_title.click()
+    waiter.wait(SORT_OPTION_SELECTOR, budget=3.0, timeout=4.0)
+    sort_newest = find_element(browser, By.XPATH, SORT_NEWEST_XPATH, "sort_newest")
+    if sort_newest is None:
+        return False
+    waiter.mark_stale(FEEDS_ITEM_SELECTOR)
+    sort_newest.click()
+    waiter.wait(FEEDS_ITEM_SELECTOR, budget=3.0, timeout=4.0, fresh=True)
+    return True
+
+
+def launch_browser() -> tuple:
+    """
+    Запускает Chrome со stealth-настройками и регистрирует его процессы
+    в lifecycle. Драйвер и профиль берутся из chrome_cache.
+
+    Returns:
+        tuple: (браузер, идентификатор браузера в lifecycle,
+        аргументы запуска для chrome_cache.release)
+
+    Raises:
+        Пробрасывает ошибку запуска, процессы браузера при этом завершаются
+    """
+    options = uc.ChromeOptions()
+    options.headless = False
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_argument("--window-size=1920,1080")
+    options.add_argument("--start-maximized")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-popup-blocking")
+    started: float = time.monotonic()
+    launch_kwargs, warm = chrome_cache.prepare()
+    try:
+        browser, handle = lifecycle.launch(
+            lambda: uc.Chrome(
+                options=options, enable_cdp_events=CDP_CAPTURE, **launch_kwargs
+            )
+        )
+    except Exception:
+        chrome_cache.release(launch_kwargs, promote=False)
+        raise
+    chrome_cache.record_launch(time.monotonic() - started, warm)
     try:
-        options = uc.ChromeOptions()
-        options.headless = False
-        options.add_argument("--disable-blink-features=AutomationControlled")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--start-maximized")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-popup-blocking")
-        browser = uc.Chrome(options=options)
         stealth(
             browser,
             user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -266,68 +317,186 @@ def process_url(first_iter: bool) -> None:
             fix_hairline=False,
             run_on_insecure_origins=False,
         )
-        for url in params_list:
-            browser.get(url)
-            time.sleep(random.uniform(8.0, 13.0))
-            sort_by = browser.find_element(By.CSS_SELECTOR, '[class="item--m9jSTUup"]')
-            sort_by.click()
-            time.sleep(random.uniform(8.0, 13.0))
-            try:
-                sort_by = browser.find_element(
-                    By.CSS_SELECTOR, "[span.search-select-title--zzthyzLG]"
-                )
-                sort_by.click()
-                time.sleep(random.uniform(2.0, 4.0))
-            except Exception as e:
-                logging.error("Error click sort_by %s", e)
-                continue
-
-            sort_by_date = browser.find_element(
-                By.XPATH,
-                "//div[@class='search-select-item--H_AJBURX' and text()='最新']",
-            )
-            sort_by_date.click()
-            time.sleep(random.uniform(2.0, 4.0))
+    except Exception:
+        close_browser(browser, handle, launch_kwargs, promote=False)
+        raise
+    return browser, handle, launch_kwargs
+
+
+def close_browser(browser, handle, launch_kwargs: dict, promote: bool) -> None:
+    """
+    Закрывает браузер, добивает только его дерево процессов и убирает
+    профиль (удачный профиль может стать шаблоном chrome_cache)
+
+    Args:
+        - 'launch_kwargs' (dict): аргументы запуска из launch_browser
+        - 'promote' (bool): работал ли браузер без ошибок
+
+    Returns:
+        None: Функция ничего не возвращает
+    """
+    def quit_browser() -> None:
+        if browser:
+            browser.close()
+            browser.quit()
+
+    lifecycle.close(handle, quit_browser)
+    chrome_cache.release(launch_kwargs, promote)
+
+
+def process_url(
+    first_iter: bool,
+    urls: Optional[list] = None,
+    sink: Optional[Callable] = None,
+    min_interval: float = 0.0,
+    planner: Optional[QueryPlanner] = None,
+) -> None:
+    """
+    Обрабатывает список URL через headless-браузер с эмуляцией человеческого поведения.
+
+    Основной функционал:
+    - Открывает Chrome в режиме без графического интерфейса (headless=True)
+    - Настраивает параметры stealth-режима для обхода антибот-систем
+    - Последовательно обрабатывает каждый URL из params_list
+    - Открывает выдачу сразу отсортированной от новых к старым
+    (sorted_url), проверяет сортировку (is_sorted_newest) и только при
+    неудаче сортирует кликами по меню (sort_by_menu)
+    - Промахи селекторов считаются в selector_misses и логируются в конце
+    прохода; при промахе URL не пропускается
+    - После загрузки и кликов ждет готовности списка (ReadinessWaiter)
+    вместо фиксированных пауз
+    - Эмулирует человеческое поведение (случайные скроллы, задержки)
+    - При CDP_CAPTURE берет все товары выдачи из перехваченного ответа
+    поискового API (SearchCapture), без page_source и BeautifulSoup
+    - Иначе (или если ответ не перехвачен) извлекает HTML-контент страницы
+    и разбирает его parse_cards
+    - Найденные товары передает в sink (по умолчанию handle_products)
+    - С planner обходит только ссылки его плана (пониженные алиасы
+    загружаются реже) и сообщает ему товары каждой ссылки
+    - Управляет вкладками браузера для улучшения маскировки: каждый URL
+    в новой вкладке, но открыто не больше TAB_POOL_SIZE вкладок (TabPool)
+    - После каждого URL замеряет память дерева процессов браузера
+    (вместе с renderer-процессами вкладок) и перезапускает браузер перед
+    очередным URL, если превышены лимиты времени жизни
+    (BROWSER_MAX_AGE_SECONDS) или памяти (BROWSER_MAX_RSS_MB);
+    при закрытии добивается только дерево процессов этого браузера
+    - В конце прохода логирует пиковую память браузера
+
+    Args:
+        - 'first_iter' (bool): первая итерация (сообщения не отправляются)
+        - 'urls' (list, optional): ссылки для обхода (по умолчанию params_list)
+        - 'sink' (Callable, optional): получатель списка товаров каждого URL
+        - 'min_interval' (float): минимальный интервал между началом
+        обработки соседних URL, секунд
+        - 'planner' (QueryPlanner, optional): планировщик алиасов,
+        задает ссылки прохода вместо urls
+
+    Обрабатываемые исключения:
+        - MaxRetryError: Проблемы с подключением
+        - NewConnectionError: Ошибки сети
+        - Общие исключения (Exception)
+    """
+    html_page = None
+    browser = None
+    handle = None
+    launch_kwargs: dict = {}
+    peak_rss: float = 0.0
+    restarts: int = 0
+    next_start: float = 0.0
+    if planner is not None:
+        urls = planner.plan()
+    elif urls is None:
+        urls = params_list
+    if sink is None:
+        sink = partial(handle_products, first_iter=first_iter)
+
+    try:
+        browser, handle, launch_kwargs = launch_browser()
+        capture = SearchCapture(browser) if CDP_CAPTURE else None
+        tabs = TabPool(browser, TAB_POOL_SIZE)
+        for url in urls:
+            delay: float = next_start - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            next_start = time.monotonic() + min_interval
+
+            reason = lifecycle.over_limits(handle)
+            if reason:
+                logging.info("Browser restarted: %s", reason)
+                close_browser(browser, handle, launch_kwargs, promote=True)
+                browser, handle, launch_kwargs = None, None, {}
+                browser, handle, launch_kwargs = launch_browser()
+                capture = SearchCapture(browser) if CDP_CAPTURE else None
+                tabs = TabPool(browser, TAB_POOL_SIZE)
+                restarts += 1
+
+            waiter = ReadinessWaiter(browser, url)
+            if capture:
+                capture.reset()
+            browser.get(sorted_url(url))
+            waiter.wait(FEEDS_ITEM_SELECTOR, budget=10.5, timeout=13.0)
+            products = capture.products(CAPTURE_TIMEOUT) if capture else None
+
+            if not is_sorted_newest(browser, products):
+                selector_misses["url_sort"] += 1
+                logging.info("URL sort not applied for %s, using sort menu", url)
+                if capture:
+                    capture.reset()
+                if sort_by_menu(browser, waiter):
+                    products = (
+                        capture.products(CAPTURE_TIMEOUT) if capture else None
+                    )
+                else:
+                    logging.error("Sort menu failed for %s, parsing as is", url)
+            waiter.log_saved()
 
             actions = ActionChains(browser)
             actions.move_by_offset(100, 0).perform()
             time.sleep(random.uniform(8.0, 13.0))
 
-            random_scroll(browser)
+            if products is None:
+                random_scroll(browser)
 
-            try:
-                html_page = browser.page_source
-            except Exception as e:
-                logging.error("Error get page source %s", e)
+                try:
+                    html_page = browser.page_source
+                except Exception as e:
+                    logging.error("Error get page source %s", e)
 
-            if not html_page:
-                logging.error("HTML страницы не получен")
-                continue
+                if not html_page:
+                    logging.error("HTML страницы не получен")
+                    continue
 
-            get_ads_by_url(html_page, first_iter)
+                products = parse_cards(html_page, MAX_PRODUCTS)
+            else:
+                logging.info("Captured %s items for %s", len(products), url)
+            if planner is not None:
+                planner.record(url, products)
+            sink(products)
             time.sleep(random.uniform(13.0, 20.0))
             random_scroll(browser)
             time.sleep(random.uniform(13.0, 20.0))
 
-            browser.execute_script("window.open();")
-            browser.switch_to.window(browser.window_handles[-1])
+            peak_rss = max(peak_rss, lifecycle.rss_mb(handle))
+            tabs.advance()
             time.sleep(random.uniform(1.5, 3.0))
 
-        if browser:
-            try:
-                browser.close()
-                browser.quit()
-            except Exception as e:
-                logging.error("Error close browser %s", e)
+        close_browser(browser, handle, launch_kwargs, promote=True)
+        logging.info(
+            "Cycle done: peak browser RSS %.0f MB, restarts %s, tabs closed %s",
+            peak_rss,
+            restarts,
+            tabs.closed,
+        )
+        if selector_misses:
+            logging.warning("Selector misses: %s", dict(selector_misses))
+            selector_misses.clear()
 
     except (MaxRetryError, NewConnectionError, Exception) as e:
         logging.error("General Error on: %s", e)
-        if browser:
-            try:
-                browser.close()
-                browser.quit()
-            except Exception as e:
-                logging.error("Error close browser %s", e)
+        close_browser(browser, handle, launch_kwargs, promote=False)
+
+    if planner is not None:
+        planner.finish()
 
 
 def rotate_txt_log() -> None:
@@ -353,43 +522,94 @@ def rotate_txt_log() -> None:
             )
 
 
-def kill_chromedriver() -> None:
+def worker_main(worker_id: int, urls: list, results: Any) -> None:
     """
-    Отчищает систему от всех процессов chromedriver и chrome
+    Процесс-воркер шардированного режима: свой браузер, свой профиль
+    и свой темп (не больше WORKER_URLS_PER_HOUR URL в час). Товары
+    не отправляет сам, а кладет в общую очередь results.
 
-    Returns:
-        None: Функция ничего не возвращает
+    Сообщения в очереди:
+        - (worker_id, "products", список товаров) - товары одного URL
+        - (worker_id, "cycle", None) - воркер прошел свои URL
+
+    Args:
+        - 'worker_id' (int): номер воркера
+        - 'urls' (list): ссылки шарда
+        - 'results' (multiprocessing.Queue): общая очередь родителя
     """
-    try:
-        subprocess.run(["pkill", "-9", "-f", "chromedriver"], check=False)
-        subprocess.run(["pkill", "-9", "-f", "chrome"], check=False)
-    except Exception as e:
-        logging.error("Произошла ошибка при завершении процессов: %s", e)
+    min_interval: float = 3600.0 / WORKER_URLS_PER_HOUR
+    planner = QueryPlanner(urls, ALIAS_GROUPS, PLANNER_WINDOW, DEMOTED_EVERY)
+
+    def sink(products: list) -> None:
+        results.put((worker_id, "products", products))
+
+    while True:
+        logging.info("Goofish worker %s started, %s urls", worker_id, len(urls))
+        process_url(False, sink=sink, min_interval=min_interval, planner=planner)
+        chrome_cache.log_report()
+        results.put((worker_id, "cycle", None))
 
 
-def quit_driver_and_reap_children() -> None:
+def run_sharded() -> None:
     """
-    Отчищает систему от зависших зомби-процессов
+    Шардированный режим: params_list делится между WORKER_COUNT
+    процессами worker_main. Родитель - единственный потребитель очереди:
+    общая дедупликация (add_url) и отправка в Telegram.
 
     Примечания:
-    - Если процессов нет,
-    то завершает цикл и выходит из функции
+    - Пока воркер не прошел свои URL первый раз, его товары только
+    запоминаются (как first_iter в обычном режиме)
+    - Упавший воркер перезапускается со своим шардом: живость воркеров
+    проверяется на каждой итерации цикла, не реже раза в
+    WORKER_CHECK_SECONDS, даже пока другие воркеры присылают товары
+    - Группа алиасов целиком попадает в один шард (split_shards),
+    у каждого воркера свой QueryPlanner
+    """
+    results = multiprocessing.Queue()
+    shards: list = split_shards(params_list, ALIAS_GROUPS, WORKER_COUNT)
+    workers: dict = {}
+    warmed_up: set = set()
+
+    def start(worker_id: int) -> None:
+        process = multiprocessing.Process(
+            target=worker_main,
+            args=(worker_id, shards[worker_id], results),
+            daemon=True,
+        )
+        process.start()
+        workers[worker_id] = process
+
+    def restart_dead() -> None:
+        for worker_id, process in list(workers.items()):
+            if not process.is_alive():
+                logging.error(
+                    "Worker %s exited (%s), restarting",
+                    worker_id,
+                    process.exitcode,
+                )
+                start(worker_id)
 
-    Args:
-        - 'pid' (int): pid процесса в системе
+    for worker_id, shard in enumerate(shards):
+        if shard:
+            start(worker_id)
 
-    Returns:
-        None: Функция ничего не возвращает
-    """
-    try:
-        while True:
-            pid, _ = os.waitpid(-1, os.WNOHANG)
-            if pid == 0:
-                break
-    except ChildProcessError:
-        pass
-    except Exception as e:
-        logging.error("Ошибка при очистке зомби-процессов: %s", e)
+    next_rotate: float = time.monotonic() + 60.0
+    while True:
+        restart_dead()
+        if time.monotonic() >= next_rotate:
+            rotate_txt_log()
+            next_rotate = time.monotonic() + 60.0
+        try:
+            worker_id, kind, products = results.get(timeout=WORKER_CHECK_SECONDS)
+        except queue.Empty:
+            continue
+
+        if kind == "cycle":
+            if worker_id not in warmed_up:
+                warmed_up.add(worker_id)
+                logging.info("Worker %s finished its first cycle", worker_id)
+            continue
+        handle_products(products, worker_id not in warmed_up)
 
 
 def main() -> None:
@@ -401,14 +621,28 @@ def main() -> None:
     2. На первой итерации устанавливает флаг first_iter=True
     3. Для каждой итерации:
         - Логирует начало работы
-        - Запускает процесс парсинга URL (process_url)
+        - Запускает процесс парсинга URL (process_url) по плану
+        QueryPlanner: алиасы без уникальных товаров загружаются реже
         - Выполняет ротацию лог-файлов (rotate_txt_log)
         - Устанавливает паузу между итерациями (30-45 минут)
+
+    Примечания:
+    - При WORKER_COUNT > 1 работает шардированный режим (run_sharded):
+    URL делятся между процессами, паузы между проходами нет, частоту
+    запросов задает WORKER_URLS_PER_HOUR
     """
+    if WORKER_COUNT > 1:
+        run_sharded()
+        return
+
+    planner = QueryPlanner(
+        params_list, ALIAS_GROUPS, PLANNER_WINDOW, DEMOTED_EVERY
+    )
     first_iter: bool = True
     while True:
         logging.info("Goofish started")
-        process_url(first_iter)
+        process_url(first_iter, planner=planner)
+        chrome_cache.log_report()
         rotate_txt_log()
         first_iter: bool = False
         time.sleep(random.uniform(1800.0, 2700.0))
@@ -1,3 +1,5 @@
+from typing import Optional
+
 web_url_1: str = "https://www.goofish.com/search?q=rick%20owens&spm=a21ybx.home.searchInput.0"
 web_url_2: str = "https://www.goofish.com/search?q=rickowens&spm=a21ybx.search.searchInput.0 222"
 web_url_3: str = "https://www.goofish.com/search?q=undercover&spm=a21ybx.search.searchInput.0"
@@ -34,6 +36,52 @@ params_list: list = [
     web_url_22, web_url_23, web_url_24,
 ]
 MAX_TXT_LOG_SIZE_MB: int = 5
-LAST_ITEMS_MAX_SIZE: int = 1000
+# Сколько объявлений приходит в одном ответе поиска (перехват, parse_cards)
+ITEMS_PER_PAGE: int = 30
+# Размер индекса отправленных ссылок: все, что видно за проход
+# (URL × объявлений на странице × 1 страница) с двукратным запасом
+LAST_ITEMS_MAX_SIZE: int = len(params_list) * ITEMS_PER_PAGE * 2
 TELEGRAM_CHAT_ID: int = 123456789
 TELEGRAM_BOT_TOKEN: str = ''
+# Очередь отправки в Telegram: сколько сообщений ждут фонового потока
+TELEGRAM_QUEUE_SIZE: int = 200
+# Сколько фото в очереди отправлять по одному, больше - альбомами
+TELEGRAM_ALBUM_THRESHOLD: int = 3
+# Минимальный интервал между запросами к Telegram, секунд
+TELEGRAM_MIN_INTERVAL: float = 1.0
+# Максимальное время жизни браузера, затем перезапуск перед следующим URL
+BROWSER_MAX_AGE_SECONDS: float = 3600.0
+# Максимальная память дерева процессов браузера (chromedriver + chrome)
+BROWSER_MAX_RSS_MB: float = 2048.0
+# Время жизни записи в индексе отправленных ссылок (None - только по размеру)
+DEDUP_TTL_SECONDS: Optional[float] = None
+# Каталог кеша патченного chromedriver и шаблона профиля
+CHROME_CACHE_DIR: str = ".chrome_cache"
+# Запускать браузер с копией прогретого профиля (http-кеш, cookies)
+WARM_PROFILE: bool = True
+# Брать товары из перехваченного ответа поискового API (CDP), а не из html
+CDP_CAPTURE: bool = True
+# Сколько ждать ответа поискового API после сортировки, секунд
+CAPTURE_TIMEOUT: float = 10.0
+# Сколько вкладок держать открытыми (каждый URL - в новой вкладке)
+TAB_POOL_SIZE: int = 2
+# Число процессов-воркеров (у каждого свой браузер), 1 - обычный режим
+WORKER_COUNT: int = 1
+# Сколько URL в час обрабатывает один воркер в шардированном режиме
+WORKER_URLS_PER_HOUR: float = 12.0
+# Группы ссылок-алиасов одного запроса, первая ссылка группы - основная
+ALIAS_GROUPS: list = [
+    [web_url_1, web_url_2],
+    [web_url_4, web_url_5],
+    [web_url_7, web_url_6],
+    [web_url_8, web_url_9],
+    [web_url_10, web_url_11],
+    [web_url_12, web_url_13],
+    [web_url_14, web_url_15],
+    [web_url_20, web_url_21],
+    [web_url_23, web_url_24],
+]
+# За сколько последних циклов алиас не дал уникальных товаров, чтобы его понизить
+PLANNER_WINDOW: int = 6
+# Раз в сколько циклов загружать пониженные алиасы
+DEMOTED_EVERY: int = 4
@@ -0,0 +1,162 @@
+import logging
+import re
+from typing import Any, Optional
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+from planner import ITEM_ID_RE
+
+try:
+    import lxml  # noqa: F401
+
+    HTML_PARSER: str = "lxml"
+except ImportError:
+    HTML_PARSER: str = "html.parser"
+
+BASE_URL: str = "https://www.goofish.com/"
+# Каноническая ссылка на товар: и для html выдачи, и для ответа API (capture.py)
+ITEM_URL: str = "https://www.goofish.com/item?id={}"
+CONTAINER_CLASS: str = "feeds-list-container--UkIMBPNk"
+CARD_CLASS: str = "feeds-item-wrap--rGdH_KoF"
+CONTAINER_RE = re.compile(
+    r'<div\b[^>]*\bclass=["\'][^"\']*\b' + re.escape(CONTAINER_CLASS)
+)
+CARD_RE = re.compile(r'<a\b[^>]*\bclass=["\'][^"\']*\b' + re.escape(CARD_CLASS))
+
+
+def has_class(css_class: str) -> Any:
+    """
+    Возвращает проверку атрибута class для SoupStrainer.
+
+    Во время разбора с parse_only атрибут class еще не разбит на список,
+    поэтому сравнение class_="..." не находит элементы с несколькими классами.
+
+    Args:
+        - 'css_class' (str): искомый класс
+
+    Returns:
+        Any: функция проверки значения атрибута
+    """
+
+    def check(value: Any) -> bool:
+        if not value:
+            return False
+        if isinstance(value, str):
+            value = value.split()
+        return css_class in value
+
+    return check
+
+
+CONTAINER_STRAINER = SoupStrainer("div", class_=has_class(CONTAINER_CLASS))
+
+
+def slice_cards(html: str, limit: Optional[int]) -> Optional[str]:
+    """
+    Вырезает из html только контейнер выдачи и первые limit карточек.
+
+    Примечания:
+    - Если контейнера нет, возвращает None
+    - Все после начала карточки номер limit + 1 отбрасывается,
+    незакрытые теги парсер закрывает сам
+    - limit=None оставляет все карточки
+
+    Args:
+        - 'html' (str): html код страницы
+        - 'limit' (int, optional): сколько карточек нужно
+
+    Returns:
+        str|None: фрагмент html или None
+    """
+    container = CONTAINER_RE.search(html)
+    if not container:
+        return None
+    end: int = len(html)
+    if limit is not None:
+        for index, card in enumerate(CARD_RE.finditer(html, container.start())):
+            if index == limit:
+                end = card.start()
+                break
+    return html[container.start():end]
+
+
+def item_link(href: str) -> str:
+    """
+    Каноническая ссылка на товар из href карточки
+
+    Примечания:
+    - Относительные и protocol-relative (//www.goofish.com/...) ссылки
+    дополняются до абсолютных
+    - Ссылка с id товара сводится к ITEM_URL (без categoryId и прочих
+    параметров), как у товаров из перехваченного ответа API
+
+    Args:
+        - 'href' (str): href карточки
+
+    Returns:
+        str: ссылка на товар
+    """
+    link: str = urljoin(BASE_URL, href)
+    match = ITEM_ID_RE.search(link)
+    return ITEM_URL.format(match.group(1)) if match else link
+
+
+def parse_cards(html: Any, limit: Optional[int] = 4) -> list:
+    """
+    Парсит карточки товаров из выдачи goofish.
+
+    Строит дерево только для контейнера выдачи (SoupStrainer)
+    и только для первых limit карточек, а не для всей страницы.
+
+    Примечания:
+    - Если контейнера нет, возвращает пустой список
+    - При ошибке разбора карточки возвращает уже разобранные карточки
+    - Ссылки приводятся к виду item?id=N (item_link): тот же ключ
+    дедупликации, что у товаров из перехваченного ответа API
+
+    Args:
+        - 'html' (Any): html код страницы сайта
+        - 'limit' (int, optional): сколько карточек вернуть (None - все)
+
+    Returns:
+        List: список словарей {"link", "image", "price"}
+    """
+    fragment: Optional[str] = slice_cards(html, limit)
+    if fragment is None:
+        return []
+
+    soup = BeautifulSoup(fragment, HTML_PARSER, parse_only=CONTAINER_STRAINER)
+    container = soup.find("div", class_=CONTAINER_CLASS)
+    if not container:
+        return []
+
+    products: list = []
+    try:
+        links = container.find_all("a", class_=CARD_CLASS, href=True, limit=limit)
+        for a_tag in links:
+            link: str = item_link(a_tag["href"])
+
+            img_tag = a_tag.find("img")
+            if img_tag and img_tag.get("src"):
+                image: str = urljoin(BASE_URL, img_tag["src"])
+            else:
+                image: None = None
+
+            price_container = a_tag.find(class_="price-wrap--YzmU5cUl")
+            if price_container:
+                currency: str = price_container.find(
+                    class_="sign--x6uVdG3X"
+                ).text.strip()
+                number: str = price_container.find(
+                    class_="number--NKh1vXWM"
+                ).text.strip()
+                price: str = number + currency
+            else:
+                price: None = None
+
+            products.append({"link": link, "image": image, "price": price})
+    except Exception as e:
+        logging.error("Error add new ad %s", e)
+
+    return products
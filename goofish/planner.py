@@ -0,0 +1,136 @@
+import logging
+import re
+from collections import deque
+from typing import Optional
+
+ITEM_ID_RE = re.compile(r"[?&]id=(\d+)")
+
+
+def item_key(link: str) -> str:
+    """Ключ товара для сравнения выдач: id товара или ссылка целиком"""
+    match = ITEM_ID_RE.search(link)
+    return match.group(1) if match else link
+
+
+def split_shards(urls: list, alias_groups: list, count: int) -> list:
+    """
+    Делит ссылки между count воркерами так, чтобы группа алиасов
+    целиком попадала к одному воркеру (планировщику воркера нужны
+    результаты всей группы)
+
+    Args:
+        - 'urls' (list): все ссылки
+        - 'alias_groups' (list): группы ссылок-алиасов
+        - 'count' (int): число воркеров
+
+    Returns:
+        list: count списков ссылок
+    """
+    grouped: dict = {}
+    for group in alias_groups:
+        for url in group:
+            grouped.setdefault(url, tuple(group))
+    units: list = []
+    placed: set = set()
+    for url in urls:
+        if url in placed:
+            continue
+        unit: list = [alias for alias in grouped.get(url, (url,)) if alias in urls]
+        placed.update(unit)
+        units.append(unit)
+    shards: list = [[] for _ in range(count)]
+    for index, unit in enumerate(units):
+        shards[index % count].extend(unit)
+    return shards
+
+
+class QueryPlanner:
+    """
+    Планировщик запросов с алиасами (rick owens / rickowens ...).
+
+    Для каждой ссылки группы считается, сколько уникальных товаров она
+    дала за цикл сверх остальных алиасов группы. Если за последние window
+    измерений алиас не дал ни одного уникального товара, он понижается:
+    загружается только в каждом demoted_every-м цикле (заодно проверяя,
+    не стал ли снова полезен). Первая ссылка группы - основная,
+    она загружается всегда.
+
+    Args:
+        - 'urls' (list): все ссылки для обхода
+        - 'alias_groups' (list): группы ссылок-алиасов
+        - 'window' (int): сколько последних измерений учитывать
+        - 'demoted_every' (int): раз в сколько циклов загружать пониженный алиас
+    """
+
+    def __init__(
+        self, urls: list, alias_groups: list, window: int, demoted_every: int
+    ) -> None:
+        self.urls: list = list(urls)
+        self.window: int = window
+        self.demoted_every: int = max(1, demoted_every)
+        self.group_of: dict = {}
+        for group in alias_groups:
+            members: tuple = tuple(url for url in group if url in self.urls)
+            if len(members) > 1:
+                for url in members:
+                    self.group_of[url] = members
+        self.unique: dict = {url: deque(maxlen=window) for url in self.group_of}
+        self.cycle: int = 0
+        self.saved: int = 0
+        self._results: dict = {}
+
+    def is_demoted(self, url: str) -> bool:
+        """Понижен ли алиас: за полное окно не дал уникальных товаров"""
+        group: Optional[tuple] = self.group_of.get(url)
+        if not group or url == group[0]:
+            return False
+        history: deque = self.unique[url]
+        return len(history) == self.window and not any(history)
+
+    def plan(self) -> list:
+        """
+        Начинает цикл и возвращает ссылки, которые нужно загрузить
+
+        Returns:
+            list: ссылки цикла в исходном порядке
+        """
+        self.cycle += 1
+        self._results = {}
+        full_cycle: bool = self.cycle % self.demoted_every == 0
+        urls: list = [
+            url for url in self.urls if full_cycle or not self.is_demoted(url)
+        ]
+        self.saved = len(self.urls) - len(urls)
+        return urls
+
+    def record(self, url: str, products: list) -> None:
+        """Запоминает товары, полученные по ссылке в текущем цикле"""
+        self._results[url] = {item_key(product["link"]) for product in products}
+
+    def finish(self) -> None:
+        """
+        Завершает цикл: обновляет число уникальных товаров алиасов
+        и логирует сэкономленные загрузки страниц
+        """
+        for url, keys in self._results.items():
+            group: Optional[tuple] = self.group_of.get(url)
+            if not group:
+                continue
+            others: list = [
+                self._results[alias]
+                for alias in group
+                if alias != url and alias in self._results
+            ]
+            if not others:
+                continue
+            self.unique[url].append(len(keys - set().union(*others)))
+
+        demoted: list = [url for url in self.group_of if self.is_demoted(url)]
+        logging.info(
+            "Planner cycle %s: page loads %s/%s, saved %s, demoted aliases %s",
+            self.cycle,
+            len(self.urls) - self.saved,
+            len(self.urls),
+            self.saved,
+            len(demoted),
+        )
@@ -0,0 +1,38 @@
+import logging
+
+
+class TabPool:
+    """
+    Ограниченный набор вкладок браузера.
+
+    Как и раньше, каждый следующий URL открывается в новой вкладке
+    (маскировка), но вкладок не бывает больше size: самая старая
+    закрывается вместе со своим renderer-процессом.
+
+    Args:
+        - 'driver' (uc.Chrome): браузер
+        - 'size' (int): максимальное число открытых вкладок
+    """
+
+    def __init__(self, driver, size: int) -> None:
+        self.driver = driver
+        self.size: int = max(1, size)
+        self.handles: list = [driver.current_window_handle]
+        self.closed: int = 0
+
+    def advance(self) -> None:
+        """
+        Переключается на новую вкладку и закрывает самые старые,
+        если вкладок стало больше size
+        """
+        self.driver.switch_to.new_window("tab")
+        self.handles.append(self.driver.current_window_handle)
+        while len(self.handles) > self.size:
+            oldest: str = self.handles.pop(0)
+            try:
+                self.driver.switch_to.window(oldest)
+                self.driver.close()
+                self.closed += 1
+            except Exception as e:
+                logging.warning("Error close tab %s", e)
+        self.driver.switch_to.window(self.handles[-1])
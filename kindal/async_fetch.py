@@ -0,0 +1,244 @@
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from json_client import KindJsonClient
+
+
+class HostRateLimiter:
+    """
+    Глобальный ограничитель частоты запросов к одному хосту.
+
+    Запросы к хосту разносятся не чаще 1 / rate секунд независимо от того,
+    сколько задач выполняется параллельно.
+
+    Args:
+        - 'rate' (float): максимум запросов в секунду к одному хосту
+    """
+
+    def __init__(self, rate: float) -> None:
+        self.interval: float = 1.0 / rate
+        self._next_slot: dict = {}
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, url: str) -> None:
+        """
+        Ждет свободного слота для хоста url
+
+        Args:
+            - 'url' (str): адрес запроса
+        """
+        host: str = urlsplit(url).netloc
+        async with self._lock:
+            now: float = time.monotonic()
+            slot: float = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class AsyncCollectionFetcher:
+    """
+    Параллельная загрузка коллекций kind.co.jp.
+
+    Коллекции запрашиваются через JSON фильтра Boost (один запрос на url
+    в порядке сайта, при products_fallback клиента - через products.json)
+    пулом из concurrency задач под общим HostRateLimiter. Если JSON
+    недоступен, страница рендерится в браузере (browser_fetch в отдельном
+    потоке), одновременно работает не больше browser_pool_size браузеров.
+    Все результаты проходят через одну очередь и обрабатываются одним
+    потребителем (on_products), поэтому дедупликация и отправка не требуют
+    блокировок.
+
+    Args:
+        - 'json_client' (KindJsonClient): адрес магазина, таймаут и разбор JSON
+        - 'concurrency' (int): сколько коллекций загружается одновременно
+        - 'rate' (float): максимум запросов в секунду к одному хосту
+        - 'browser_pool_size' (int): максимум одновременно запущенных браузеров
+        - 'browser_fetch' (Callable): синхронная загрузка через браузер
+        (url -> список товаров или None)
+        - 'use_json' (bool): пробовать JSON перед браузером
+    """
+
+    def __init__(
+        self,
+        json_client: KindJsonClient,
+        concurrency: int,
+        rate: float,
+        browser_pool_size: int,
+        browser_fetch: Callable,
+        use_json: bool = True,
+    ) -> None:
+        self.json_client: KindJsonClient = json_client
+        self.concurrency: int = concurrency
+        self.rate: float = rate
+        self.browser_pool_size: int = browser_pool_size
+        self.browser_fetch: Callable = browser_fetch
+        self.use_json: bool = use_json
+
+    @staticmethod
+    async def get_json(
+        session: aiohttp.ClientSession, limiter: HostRateLimiter, url: str
+    ) -> Any:
+        """Читает JSON по адресу под общим лимитом запросов"""
+        await limiter.acquire(url)
+        async with session.get(url) as response:
+            response.raise_for_status()
+            return await response.json(content_type=None)
+
+    async def fetch_json(
+        self,
+        session: aiohttp.ClientSession,
+        limiter: HostRateLimiter,
+        full_url: str,
+        max_products: Optional[int],
+    ) -> Optional[list]:
+        """
+        Получает товары страницы через Boost: один запрос на url (плюс
+        однократные lookup_urls клиента), товары в порядке сайта. При
+        ошибке, если включен products_fallback, - через products.json
+
+        Returns:
+            List|None: товары или None, если нужен браузер
+        """
+        client: KindJsonClient = self.json_client
+        try:
+            for url in client.lookup_urls(full_url):
+                client.remember(url, await self.get_json(session, limiter, url))
+            boost_url: Optional[str] = client.boost_request_url(full_url, max_products)
+            if boost_url is not None:
+                data: Any = await self.get_json(session, limiter, boost_url)
+                return client.from_boost(data, max_products)
+        except Exception as e:
+            logging.warning("Boost fetch failed for %s: %s", full_url, e)
+        if not client.products_fallback:
+            return None
+        return await self.fetch_products_json(session, limiter, full_url, max_products)
+
+    async def fetch_products_json(
+        self,
+        session: aiohttp.ClientSession,
+        limiter: HostRateLimiter,
+        full_url: str,
+        max_products: Optional[int],
+    ) -> Optional[list]:
+        """
+        Запасной путь: товары коллекции через products.json, страница за
+        страницей (каждая под общим лимитом запросов), пока страница
+        не окажется короче page_limit
+
+        Returns:
+            List|None: товары от новых к старым или None, если нужен браузер
+        """
+        json_url: Optional[str] = self.json_client.json_url(full_url)
+        if json_url is None:
+            return None
+        items: list = []
+        for page_url in self.json_client.page_urls(json_url):
+            try:
+                data: Any = await self.get_json(session, limiter, page_url)
+                page: list = data["products"]
+            except Exception as e:
+                logging.warning("JSON fetch failed for %s: %s", full_url, e)
+                return None
+            items.extend(page)
+            if self.json_client.is_last_page(page):
+                return self.json_client.to_products(items, max_products)
+        self.json_client.too_many_pages(full_url)
+        return None
+
+    async def fetch_one(
+        self,
+        session: aiohttp.ClientSession,
+        limiter: HostRateLimiter,
+        browsers: asyncio.Semaphore,
+        full_url: str,
+        max_products: Optional[int],
+    ) -> list:
+        """
+        Получает товары коллекции: JSON, при ошибке - браузер из пула
+
+        Returns:
+            List: список найденных объявлений (пустой при ошибке)
+        """
+        if self.use_json:
+            products: Optional[list] = await self.fetch_json(
+                session, limiter, full_url, max_products
+            )
+            if products is not None:
+                return products
+            logging.info("JSON недоступен для %s, используется браузер", full_url)
+        async with browsers:
+            await limiter.acquire(full_url)
+            products = await asyncio.to_thread(self.browser_fetch, full_url)
+        return products or []
+
+    async def run(
+        self,
+        urls: list,
+        max_products: Optional[int],
+        on_products: Callable[[str, list], Awaitable[None]],
+    ) -> None:
+        """
+        Загружает все коллекции и передает результаты единственному
+        потребителю on_products в порядке готовности
+
+        Args:
+            - 'urls' (list): ссылки на коллекции
+            - 'max_products' (int, optional): сколько товаров брать с коллекции
+            - 'on_products' (Callable): корутина (url, товары), дедупликация
+            и отправка
+        """
+        limiter = HostRateLimiter(self.rate)
+        browsers = asyncio.Semaphore(self.browser_pool_size)
+        pending: asyncio.Queue = asyncio.Queue()
+        for url in urls:
+            pending.put_nowait(url)
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+        started: float = time.monotonic()
+
+        connector = aiohttp.TCPConnector(limit=self.concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.json_client.timeout)
+        headers: dict = {"Accept": "application/json"}
+        async with aiohttp.ClientSession(
+            connector=connector, timeout=timeout, headers=headers
+        ) as session:
+
+            async def worker() -> None:
+                while not pending.empty():
+                    url: str = pending.get_nowait()
+                    try:
+                        products: list = await self.fetch_one(
+                            session, limiter, browsers, url, max_products
+                        )
+                    except Exception as e:
+                        logging.error("Error fetch %s: %s", url, e)
+                        products = []
+                    await results.put((url, products))
+
+            async def consumer() -> None:
+                while True:
+                    url, products = await results.get()
+                    try:
+                        await on_products(url, products)
+                    except Exception as e:
+                        logging.error("Error handle products %s: %s", url, e)
+                    finally:
+                        results.task_done()
+
+            consumer_task = asyncio.create_task(consumer())
+            workers: list = [
+                asyncio.create_task(worker())
+                for _ in range(min(self.concurrency, len(urls)))
+            ]
+            await asyncio.gather(*workers)
+            await results.join()
+            consumer_task.cancel()
+
+        logging.info(
+            "Async pass: %s urls in %.1f s", len(urls), time.monotonic() - started
+        )
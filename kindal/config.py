@@ -1,10 +1,56 @@
-from typing import Set
-from collections import deque
+from typing import Optional
 
+import common_path  # noqa: F401
+from common.dedup import DedupIndex
+from param import URLS
 
 TELEGRAM_BOT_TOKEN: str = ""
 TELEGRAM_CHAT_ID: str = ""
-LAST_ITEMS_MAX_SIZE: int = 2000
-sent_products: Set[str] = set()
-urls_queue: deque = deque(maxlen=LAST_ITEMS_MAX_SIZE)
+# Очередь отправки в Telegram: сколько сообщений ждут фонового потока
+TELEGRAM_QUEUE_SIZE: int = 200
+# Сколько фото в очереди отправлять по одному, больше - альбомами
+TELEGRAM_ALBUM_THRESHOLD: int = 3
+# Минимальный интервал между запросами к Telegram, секунд
+TELEGRAM_MIN_INTERVAL: float = 1.0
+# Сколько новых товаров коллекции проверяется за проход
+ITEMS_PER_URL: int = 4
+# Размер индекса отправленных ссылок: все, что видно за проход
+# (URL × товаров на коллекцию) с двукратным запасом
+LAST_ITEMS_MAX_SIZE: int = len(URLS) * ITEMS_PER_URL * 2
+# Время жизни записи в индексе отправленных ссылок (None - только по размеру)
+DEDUP_TTL_SECONDS: Optional[float] = None
+sent_products = DedupIndex(LAST_ITEMS_MAX_SIZE, DEDUP_TTL_SECONDS)
 MAX_TXT_LOG_SIZE_MB: int = 5
+# Брать товары из JSON фильтра Boost (тот же запрос, что у витрины, с тем же
+# sort и limit=ITEMS_PER_URL), браузер - только при ошибке JSON
+JSON_FAST_PATH: bool = True
+# Адрес магазина для JSON-запросов (можно указать локальную заглушку)
+KIND_BASE_URL: str = "https://shop.kind.co.jp"
+# Адрес API фильтра Boost (можно указать локальную заглушку)
+BOOST_API_URL: str = "https://services.mybcapps.com/bc-sf-filter"
+# myshopify-домен магазина для Boost ("" - прочитать из /meta.json витрины)
+BOOST_SHOP: str = ""
+JSON_TIMEOUT: float = 10.0
+# Запасной путь при ошибке Boost: products.json всей коллекции, сортировка
+# по published_at (порядок может отличаться от сайта, поэтому выключено)
+JSON_PRODUCTS_FALLBACK: bool = False
+JSON_PAGE_LIMIT: int = 250
+# Сколько страниц products.json читать, дальше - браузер
+# (коллекции больше JSON_PAGE_LIMIT × JSON_MAX_PAGES товаров)
+JSON_MAX_PAGES: int = 8
+# Максимальное время жизни одного браузера
+BROWSER_MAX_AGE_SECONDS: float = 3600.0
+# Максимальная память дерева процессов браузера (chromedriver + chrome)
+BROWSER_MAX_RSS_MB: float = 2048.0
+# Асинхронный проход: несколько коллекций загружаются одновременно
+ASYNC_MODE: bool = True
+# Сколько коллекций загружается одновременно
+FETCH_CONCURRENCY: int = 4
+# Потолок запросов в секунду к одному хосту для всего прохода
+MAX_REQUESTS_PER_SECOND: float = 0.5
+# Сколько браузеров может работать одновременно (запасной путь)
+BROWSER_POOL_SIZE: int = 2
+# Каталог кеша патченного chromedriver и шаблона профиля
+CHROME_CACHE_DIR: str = ".chrome_cache"
+# Запускать браузер с копией прогретого профиля (http-кеш, cookies)
+WARM_PROFILE: bool = True
@@ -0,0 +1,366 @@
+import logging
+from typing import Any, Optional
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+SITE_URL: str = "https://shop.kind.co.jp"
+BOOST_API_URL: str = "https://services.mybcapps.com/bc-sf-filter"
+
+
+class KindJsonClient:
+    """
+    JSON-клиент витрины Shopify shop.kind.co.jp.
+
+    Вместо рендера страницы коллекции в браузере запрашивает тот же JSON
+    фильтра Boost (bc-sf-filter), что и сама витрина, с тем же sort, что
+    в url страницы, и limit=max_products: один небольшой запрос на url,
+    товары в порядке сайта. Товары приводятся к тем же словарям
+    {"link", "image", "price"}, что и разбор html.
+
+    Примечания:
+    - Для запроса Boost нужны myshopify-домен магазина (shop, если не
+    задан - из /meta.json витрины) и id коллекции (из
+    /collections/<handle>.json); оба читаются один раз и запоминаются
+    (lookup_urls / remember)
+    - Поиск (/search?q=) идет в search Boost; для vendors пути нет
+    - Запасной путь (products_fallback, по умолчанию выключен) -
+    /collections/<handle>/products.json: читаются все страницы, пока
+    страница не окажется короче page_limit (не больше max_pages), товары
+    сортируются по published_at. Этот порядок может не совпадать
+    с сортировкой сайта, поэтому при переключении между путями новыми
+    могут оказаться уже не самые новые товары
+    - Если JSON недоступен, fetch вернет None, и сработает браузер
+    - base_url и boost_url можно направить на локальный сервер-заглушку
+
+    Args:
+        - 'base_url' (str): адрес магазина, к которому идут запросы
+        - 'timeout' (float): таймаут запроса в секундах
+        - 'page_limit' (int): сколько товаров на странице products.json
+        (до 250)
+        - 'max_pages' (int): сколько страниц products.json читать не больше
+        - 'pool_size' (int): размер пула соединений
+        - 'boost_url' (str): адрес API фильтра Boost
+        - 'shop' (str): myshopify-домен магазина ("" - узнать из /meta.json)
+        - 'products_fallback' (bool): при ошибке Boost читать products.json
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        timeout: float,
+        page_limit: int,
+        max_pages: int = 8,
+        pool_size: int = 4,
+        boost_url: str = BOOST_API_URL,
+        shop: str = "",
+        products_fallback: bool = False,
+    ) -> None:
+        self.base_url: str = base_url.rstrip("/")
+        self.timeout: float = timeout
+        self.page_limit: int = page_limit
+        self.max_pages: int = max(1, max_pages)
+        self.boost_url: str = boost_url.rstrip("/")
+        self.shop: str = shop
+        self.products_fallback: bool = products_fallback
+        self.collection_ids: dict = {}
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers.update({"Accept": "application/json"})
+
+    @staticmethod
+    def collection_handle(full_url: str) -> Optional[str]:
+        """Handle коллекции из url страницы или None, если это не коллекция"""
+        parts: list = urlsplit(full_url).path.strip("/").split("/")
+        if len(parts) != 2 or parts[0] != "collections" or parts[1] == "vendors":
+            return None
+        return parts[1]
+
+    @staticmethod
+    def is_search(full_url: str) -> bool:
+        """Страница поиска /search?q=..."""
+        parts = urlsplit(full_url)
+        return parts.path.rstrip("/") == "/search" and "q" in parse_qs(parts.query)
+
+    def lookup_urls(self, full_url: str) -> list:
+        """
+        Адреса, которые нужно прочитать (один раз) до запроса Boost:
+        /meta.json без известного shop и /collections/<handle>.json
+        без известного id коллекции
+
+        Returns:
+            list: адреса JSON (пустой список - все известно)
+        """
+        urls: list = []
+        handle: Optional[str] = self.collection_handle(full_url)
+        if handle is None and not self.is_search(full_url):
+            return urls
+        if not self.shop:
+            urls.append(f"{self.base_url}/meta.json")
+        if handle is not None and handle not in self.collection_ids:
+            urls.append(f"{self.base_url}/collections/{handle}.json")
+        return urls
+
+    def remember(self, url: str, data: Any) -> None:
+        """
+        Запоминает ответ на адрес из lookup_urls
+
+        Raises:
+            KeyError, TypeError: в ответе нет myshopify_domain или id коллекции
+        """
+        path: str = urlsplit(url).path
+        if path == "/meta.json":
+            self.shop = data["myshopify_domain"]
+            return
+        handle: str = path.rsplit("/", 1)[-1][: -len(".json")]
+        self.collection_ids[handle] = data["collection"]["id"]
+
+    def boost_request_url(
+        self, full_url: str, max_products: Optional[int]
+    ) -> Optional[str]:
+        """
+        Адрес запроса Boost для страницы: filter для коллекции (collection_scope)
+        или search для поиска, с sort из url страницы
+
+        Args:
+            - 'full_url' (str): ссылка на страницу коллекции или поиска
+            - 'max_products' (int, optional): сколько товаров запросить
+
+        Returns:
+            str|None: адрес или None, если для страницы нет пути Boost
+            или еще не прочитаны lookup_urls
+        """
+        if not self.shop:
+            return None
+        query: dict = parse_qs(urlsplit(full_url).query)
+        params: dict = {
+            "shop": self.shop,
+            "page": 1,
+            "limit": max_products or self.page_limit,
+        }
+        if query.get("sort"):
+            params["sort"] = query["sort"][0]
+        handle: Optional[str] = self.collection_handle(full_url)
+        if handle is not None:
+            if handle not in self.collection_ids:
+                return None
+            params["collection_scope"] = self.collection_ids[handle]
+            return f"{self.boost_url}/filter?{urlencode(params)}"
+        if self.is_search(full_url):
+            params["q"] = query["q"][0]
+            return f"{self.boost_url}/search?{urlencode(params)}"
+        return None
+
+    @staticmethod
+    def to_boost_product(item: dict) -> dict:
+        """
+        Приводит товар из ответа Boost к словарю {"link", "image", "price"}
+
+        Args:
+            - 'item' (dict): товар из products ответа Boost
+
+        Returns:
+            dict: товар в формате парсера
+        """
+        link: str = f"{SITE_URL}/products/{item['handle']}"
+
+        images: Any = item.get("images_info") or item.get("images") or []
+        if isinstance(images, dict):
+            images = [images[key] for key in sorted(images, key=str)]
+        image = images[0] if images else None
+        if isinstance(image, dict):
+            image = image.get("src")
+        if image and image.startswith("//"):
+            image: str = "https:" + image
+
+        price: Any = item.get("price_min")
+        if price is None:
+            variants: list = item.get("variants") or []
+            price = variants[0].get("price") if variants else None
+        try:
+            price: str = f"¥{int(float(price)):,}"
+        except (TypeError, ValueError):
+            price: str = "Цена не найдена"
+
+        return {"link": link, "image": image, "price": price}
+
+    @classmethod
+    def from_boost(cls, data: Any, max_products: Optional[int]) -> list:
+        """
+        Приводит ответ Boost к товарам парсера, порядок - как на сайте
+
+        Args:
+            - 'data' (Any): ответ filter или search Boost
+            - 'max_products' (int, optional): сколько товаров вернуть
+
+        Returns:
+            List: товары в формате парсера
+
+        Raises:
+            KeyError, TypeError: в ответе нет списка products
+        """
+        products: list = []
+        for item in data["products"][:max_products]:
+            try:
+                products.append(cls.to_boost_product(item))
+            except Exception as e:
+                logging.error("Error parse Boost product %s: %s", item.get("id"), e)
+        return products
+
+    def json_url(self, full_url: str) -> Optional[str]:
+        """
+        Возвращает адрес products.json для страницы коллекции
+
+        Args:
+            - 'full_url' (str): ссылка на страницу коллекции
+
+        Returns:
+            str|None: адрес JSON или None, если это не коллекция
+        """
+        handle: Optional[str] = self.collection_handle(full_url)
+        if handle is None:
+            return None
+        return (
+            f"{self.base_url}/collections/{handle}/products.json"
+            f"?limit={self.page_limit}"
+        )
+
+    def page_urls(self, json_url: str) -> list:
+        """Адреса страниц products.json: page=1 ... page=max_pages"""
+        return [f"{json_url}&page={page}" for page in range(1, self.max_pages + 1)]
+
+    def is_last_page(self, items: list) -> bool:
+        """Страница короче page_limit - дальше товаров нет"""
+        return len(items) < self.page_limit
+
+    def too_many_pages(self, full_url: str) -> None:
+        """Пишет в лог, что коллекция не поместилась в max_pages страниц"""
+        logging.warning(
+            "JSON: %s has more than %s pages of %s, using browser",
+            full_url,
+            self.max_pages,
+            self.page_limit,
+        )
+
+    @staticmethod
+    def to_product(item: dict) -> dict:
+        """
+        Приводит товар Shopify к словарю {"link", "image", "price"}
+
+        Args:
+            - 'item' (dict): товар из products.json
+
+        Returns:
+            dict: товар в формате парсера
+        """
+        link: str = f"{SITE_URL}/products/{item['handle']}"
+
+        images: list = item.get("images") or []
+        image = images[0].get("src") if images else None
+        if image and image.startswith("//"):
+            image: str = "https:" + image
+
+        variants: list = item.get("variants") or []
+        try:
+            price: str = f"¥{int(float(variants[0]['price'])):,}"
+        except (IndexError, KeyError, TypeError, ValueError):
+            price: str = "Цена не найдена"
+
+        return {"link": link, "image": image, "price": price}
+
+    def get_json(self, url: str) -> Any:
+        """Читает JSON по адресу через пул соединений"""
+        response = self.session.get(url, timeout=self.timeout)
+        response.raise_for_status()
+        return response.json()
+
+    def fetch(self, full_url: str, max_products: Optional[int]) -> Optional[list]:
+        """
+        Получает новые товары страницы: через Boost, при ошибке (если
+        включен products_fallback) - через products.json
+
+        Args:
+            - 'full_url' (str): ссылка на страницу коллекции или поиска
+            - 'max_products' (int, optional): сколько товаров вернуть
+
+        Returns:
+            List|None: товары в порядке сайта или None, если JSON-путь
+            недоступен и нужен браузер
+
+        Raises:
+            Не пробрасывает исключения, логирует ошибки сети и разбора JSON
+        """
+        try:
+            for url in self.lookup_urls(full_url):
+                self.remember(url, self.get_json(url))
+            boost_url: Optional[str] = self.boost_request_url(full_url, max_products)
+            if boost_url is not None:
+                return self.from_boost(self.get_json(boost_url), max_products)
+        except Exception as e:
+            logging.warning("Boost fetch failed for %s: %s", full_url, e)
+        if not self.products_fallback:
+            return None
+        return self.fetch_products_json(full_url, max_products)
+
+    def fetch_products_json(
+        self, full_url: str, max_products: Optional[int]
+    ) -> Optional[list]:
+        """
+        Запасной путь: новые товары коллекции через products.json
+
+        Args:
+            - 'full_url' (str): ссылка на страницу коллекции
+            - 'max_products' (int, optional): сколько товаров вернуть
+
+        Returns:
+            List|None: товары от новых к старым или None, если JSON-путь
+            недоступен и нужен браузер
+
+        Raises:
+            Не пробрасывает исключения, логирует ошибки сети и разбора JSON
+        """
+        json_url: Optional[str] = self.json_url(full_url)
+        if json_url is None:
+            return None
+
+        items: list = []
+        for page_url in self.page_urls(json_url):
+            try:
+                page: list = self.get_json(page_url)["products"]
+            except Exception as e:
+                logging.warning("JSON fetch failed for %s: %s", full_url, e)
+                return None
+            items.extend(page)
+            if self.is_last_page(page):
+                return self.to_products(items, max_products)
+        self.too_many_pages(full_url)
+        return None
+
+    @classmethod
+    def to_products(cls, items: list, max_products: Optional[int]) -> list:
+        """
+        Сортирует товары products.json от новых к старым и приводит
+        первые max_products к формату парсера
+
+        Args:
+            - 'items' (list): товары из products.json
+            - 'max_products' (int, optional): сколько товаров вернуть
+
+        Returns:
+            List: товары в формате парсера
+        """
+        newest_first: list = sorted(
+            items,
+            key=lambda item: item.get("published_at") or item.get("created_at") or "",
+            reverse=True,
+        )
+        products: list = []
+        for item in newest_first[:max_products]:
+            try:
+                products.append(cls.to_product(item))
+            except Exception as e:
+                logging.error("Error parse JSON product %s: %s", item.get("id"), e)
+        return products
@@ -1,24 +1,47 @@
+import asyncio
 import logging
 import os
 import random
-import resource
-import signal
-import subprocess
 import time
 
-import requests
 import undetected_chromedriver as uc
-from bs4 import BeautifulSoup
 from fake_useragent import UserAgent
 
+import common_path  # noqa: F401
+from async_fetch import AsyncCollectionFetcher
+from common.browser_lifecycle import BrowserLifecycle
+from common.chrome_cache import ChromeStartupCache
+from common.notifier import TelegramNotifier
+from common.waits import ReadinessWaiter
 from config import (
+    ASYNC_MODE,
+    BOOST_API_URL,
+    BOOST_SHOP,
+    BROWSER_MAX_AGE_SECONDS,
+    BROWSER_MAX_RSS_MB,
+    BROWSER_POOL_SIZE,
+    CHROME_CACHE_DIR,
+    FETCH_CONCURRENCY,
+    ITEMS_PER_URL,
+    JSON_FAST_PATH,
+    JSON_MAX_PAGES,
+    JSON_PAGE_LIMIT,
+    JSON_PRODUCTS_FALLBACK,
+    JSON_TIMEOUT,
+    KIND_BASE_URL,
+    MAX_REQUESTS_PER_SECOND,
     MAX_TXT_LOG_SIZE_MB,
+    TELEGRAM_ALBUM_THRESHOLD,
     TELEGRAM_BOT_TOKEN,
     TELEGRAM_CHAT_ID,
+    TELEGRAM_MIN_INTERVAL,
+    TELEGRAM_QUEUE_SIZE,
+    WARM_PROFILE,
     sent_products,
-    urls_queue,
 )
+from json_client import KindJsonClient
 from param import URLS
+from parsing import parse_cards
 
 logging.basicConfig(
     level=logging.INFO,
@@ -26,6 +49,29 @@ logging.basicConfig(
     handlers=[logging.FileHandler("error_code.txt"), logging.StreamHandler()],
 )
 ua = UserAgent()
+MAX_PRODUCTS: int = ITEMS_PER_URL
+PRODUCT_SELECTOR: str = "div.boost-sd__product-item"
+PRODUCT_IMAGE_SELECTOR: str = (
+    "div.boost-sd__product-item img.boost-sd__product-image-img--main[src]"
+)
+json_client = KindJsonClient(
+    KIND_BASE_URL,
+    JSON_TIMEOUT,
+    JSON_PAGE_LIMIT,
+    JSON_MAX_PAGES,
+    boost_url=BOOST_API_URL,
+    shop=BOOST_SHOP,
+    products_fallback=JSON_PRODUCTS_FALLBACK,
+)
+lifecycle = BrowserLifecycle(BROWSER_MAX_AGE_SECONDS, BROWSER_MAX_RSS_MB)
+chrome_cache = ChromeStartupCache(CHROME_CACHE_DIR, WARM_PROFILE)
+notifier = TelegramNotifier(
+    TELEGRAM_BOT_TOKEN,
+    TELEGRAM_CHAT_ID,
+    TELEGRAM_QUEUE_SIZE,
+    TELEGRAM_ALBUM_THRESHOLD,
+    TELEGRAM_MIN_INTERVAL,
+)
 
 
 def rotate_txt_log() -> None:
@@ -53,48 +99,40 @@ def rotate_txt_log() -> None:
 
 def add_url(url: str) -> bool:
     """
-    URL добавляется во множество sent_products и
-    в очередь urls_queue (если URL нет в sent_products)
+    URL добавляется в индекс sent_products (если его там нет)
     или возвращает False.
 
     Примечания:
-    - Если длина очереди превышает максимальное значение,
-    то последний элемент из очереди и из множества удаляется.
+    - sent_products (DedupIndex) хранит не больше LAST_ITEMS_MAX_SIZE
+    хешей ссылок, вытесняются те, что дольше всех не встречались.
 
     Args:
         - 'url' (str): URL ссылка на товар
-        - 'sent_products' (set): множество найденных объявлений на товар
-        - 'urls_queue' (deque): список найденных объявлений
 
     Returns:
         Bool: Функция возвращает Истина или Лож
         в зависимости от выполнения условия
     """
-    if url not in sent_products:
-        sent_products.add(url)
-        urls_queue.append(url)
-        if len(urls_queue) > urls_queue.maxlen:
-            old_url = urls_queue.popleft()
-            sent_products.remove(old_url)
-        return True
-    return False
+    return sent_products.add(url)
 
 
 def send_product_to_telegram(product: dict) -> None:
     """
-    Отправляет информацию о товаре в Telegram-чат,
-    используя метод sendPhoto (если есть изображение)
-    или sendMessage (если изображения нет).
+    Ставит информацию о товаре в очередь отправки в Telegram-чат:
+    sendPhoto (если есть изображение) или sendMessage (если изображения нет).
 
     Формат сообщения:
     - Цена: {цена}
     - Ссылка: {ссылка на товар}
 
     Примечания:
+    - Отправляет фоновый поток общего TelegramNotifier (common/notifier.py),
+    функция не ждет Telegram; паузы и повторы после 429 - там же
+    - Если в очереди больше TELEGRAM_ALBUM_THRESHOLD товаров с фото,
+    они уходят альбомами (sendMediaGroup) по 10 фото
     - Если подпись (caption) превышает 1024 символа,
     она обрезается до 1020 символов с добавлением "..."
-    - В случае ошибки при отправке сообщения ошибка логируется,
-    но исключение не пробрасывается
+    - Ошибки отправки логируются, исключение не пробрасывается
 
     Args:
         product (dict): Словарь с информацией о товаре, должен содержать ключи:
@@ -105,149 +143,9 @@ def send_product_to_telegram(product: dict) -> None:
 
     Returns:
         None: Функция ничего не возвращает
-
-    Raises:
-        Не пробрасывает исключения, но логирует ошибки в следующих случаях:
-        - Ошибка сети или таймаут при обращении к API Telegram
-        - Неожиданная ошибка при формировании запроса
-    """
-    if product["image"]:
-        telegram_url: str = (
-            f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendPhoto"
-        )
-        caption: str = f"Цена: {product['price']}\nСсылка: {product['link']}"
-        if len(caption) > 1024:
-            caption: str = caption[:1020] + "..."
-        data: dict = {
-            "chat_id": TELEGRAM_CHAT_ID,
-            "caption": caption,
-            "photo": product["image"],
-        }
-        try:
-            logging.info("send message")
-            send_message = requests.post(telegram_url, data=data, timeout=10)
-            send_message.raise_for_status()
-        except Exception as e:
-            logging.error("Ошибка при отправке фото в Telegram: %s", e)
-    else:
-        telegram_url: str = (
-            f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage"
-        )
-        text: str = f"Цена: {product['price']}\nСсылка: {product['link']}"
-        data: dict = {"chat_id": TELEGRAM_CHAT_ID, "text": text}
-        try:
-            send_message = requests.post(telegram_url, data=data, timeout=10)
-            send_message.raise_for_status()
-        except Exception as e:
-            logging.error("Ошибка при отправке сообщения в Telegram: %s", e)
-
-
-def kill_chromedriver() -> None:
-    """
-    Отчищает систему от всех процессов
-    chromedriver, chrome, chromedriver_co, undetected_chromedriver
-
-    Returns:
-        None: Функция ничего не возвращает
-    """
-    try:
-        subprocess.run(["pkill", "-9", "-f", "chromedriver"], check=False)
-        subprocess.run(["pkill", "-9", "-f", "chrome"], check=False)
-        subprocess.run(["pkill", "-9", "-f", "chromedriver_co"], check=False)
-        subprocess.run(["pkill", "-9", "-f", "undetected_chromedriver"], check=False)
-    except Exception as e:
-        logging.error("Произошла ошибка при завершении процессов: %s", e)
-
-
-def close_open_file_descriptors(min_fd=3, max_fd=None) -> None:
     """
-    Закрывает все открытые файловые дескрипторы в диапазоне [min_fd, max_fd).
-    Если max_fd не указан, берём лимит открытых дескрипторов системы.
-
-    Returns:
-        None: Функция ничего не возвращает
-    """
-    try:
-        if max_fd is None:
-            max_fd = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
-        logging.info("Closing file descriptors from %s to %s", min_fd, max_fd - 1)
-        os.closerange(min_fd, max_fd)
-    except Exception as e:
-        logging.error("Error closing file descriptors: %s", e)
-
-
-def quit_driver_and_reap_children(signum=None, frame=None) -> None:
-    """
-    Обработчик SIGCHLD: забирать всех завершённых дочерних процессов
-
-    Returns:
-        None: Функция ничего не возвращает
-    """
-    try:
-        while True:
-            pid, status = os.waitpid(-1, os.WNOHANG)
-            if pid == 0:
-                break
-            logging.info("Reaped zombie process PID %s with status %s", pid, status)
-    except ChildProcessError:
-        pass
-
-
-def cleanup_old_chromedriver_processes(max_age_seconds=3600):
-    """
-    Очищает зависшие процессы chromedriver и chrome,
-    работающие дольше указанного времени.
-
-    Функция выполняет:
-    1. Поиск всех процессов через команду 'ps' (Linux/MacOS)
-    2. Фильтрацию процессов chromedriver/chrome
-    3. Завершение процессов, работающих дольше max_age_seconds
-
-    Особенности:
-    - Игнорирует свежие процессы (моложе max_age_seconds)
-    - Логирует все действия и ошибки
-    - Обрабатывает процессы с именами: chromedriver, chromedriver_co, chrome
-    - Использует SIGTERM для корректного завершения процессов
-
-    Args:
-        max_age_seconds (int, optional): Максимальное время жизни процесса в секундах.
-                                      По умолчанию 3600 (1 час).
-
-    Returns:
-        None: Функция ничего не возвращает
-
-    Raises:
-        Не пробрасывает исключения, но логирует ошибки:
-        - Если не удается выполнить команду 'ps'
-        - Если не удается завершить процесс
-        - При других неожиданных ошибках
-    """
-    try:
-        ps_output = subprocess.check_output(
-            ["ps", "-eo", "pid,etimes,comm,cmd"]
-        ).decode()
-        for line in ps_output.splitlines():
-            if line.strip().startswith("PID"):
-                continue
-            parts = line.split(None, 3)
-            if len(parts) < 4:
-                continue
-            pid = int(parts[0])
-            etimes = int(parts[1])
-            comm = parts[2]
-            cmd = parts[3]
-            if comm in ("chromedriver", "chromedriver_co", "chrome"):
-                if etimes > max_age_seconds:
-                    logging.info(
-                        "Убиваем процесс %s PID %s, время работы %s сек: %s",
-                        comm, pid, etimes, cmd,
-                    )
-                    try:
-                        os.kill(pid, signal.SIGTERM)
-                    except Exception as e:
-                        logging.error("Не удалось убить PID %s: %s", pid, e)
-    except Exception as e:
-        logging.error("Ошибка при очистке процессов: %s", e)
+    text: str = f"Цена: {product['price']}\nСсылка: {product['link']}"
+    notifier.send(text, product["image"] or None)
 
 
 def fetch_data_sync(full_url):
@@ -256,18 +154,24 @@ def fetch_data_sync(full_url):
     Сохраняет их словарем в список.
 
     Примечания:
+    - Вместо фиксированных пауз после загрузки и каждого скролла ждет
+    появления карточек div.boost-sd__product-item с картинками
+    (ReadinessWaiter): после скролла - пока карточек с картинками не
+    станет больше, чем было до него
+    - Скролл прекращается, когда картинки есть у MAX_PRODUCTS карточек
+    или после скролла новых не появилось за таймаут
+    - Процессы браузера учитывает lifecycle: после driver.quit()
+    добивается только дерево процессов этого браузера, скролл
+    прекращается при превышении лимита памяти (BROWSER_MAX_RSS_MB)
+    - Драйвер берется из chrome_cache (патчится один раз на версию Chrome),
+    профиль - копия прогретого шаблона (WARM_PROFILE)
     - Если в html или в container ничего нет, то возвращает пустой список.
 
     Args:
         - 'html' (none): html код страницы сайта
         - 'user_agent' (str): рандомно сгенерированный user agent
         - 'driver' (BaseCase): драйвер undetected chromedriver
-        - 'soup' (BeautifulSoup): создает объект BeautifulSoup,
-        который парсит (разбирает) HTML-документ для дальнейшего извлечения данных
-        - 'container': найденные данные из HTML-документа
-        - 'link' (str): ссылка на товар
-        - 'image' (str): изображение товара
-        - 'price' (str): цена товара
+        - 'products' (list): карточки, разобранные parse_cards
 
     Returns:
         List: Функция возвращает список найденных объявлений
@@ -279,6 +183,8 @@ def fetch_data_sync(full_url):
         - Неожиданная ошибка при формировании запроса
     """
     driver = None
+    handle = None
+    launch_kwargs: dict = {}
     html = None
     try:
         options = uc.ChromeOptions()
@@ -289,85 +195,134 @@ def fetch_data_sync(full_url):
         options.add_argument("--no-sandbox")
         options.add_argument("--disable-dev-shm-usage")
 
-        driver = uc.Chrome(options=options)
+        started: float = time.monotonic()
+        launch_kwargs, warm = chrome_cache.prepare()
+        driver, handle = lifecycle.launch(
+            lambda: uc.Chrome(options=options, **launch_kwargs)
+        )
+        chrome_cache.record_launch(time.monotonic() - started, warm)
+        waiter = ReadinessWaiter(driver, full_url)
         driver.get(full_url)
-        time.sleep(random.uniform(5, 10))
+        waiter.wait(PRODUCT_SELECTOR, budget=7.5, timeout=10.0)
 
-        driver.execute_script("window.scrollBy(0, 600);")
-        time.sleep(random.uniform(8.0, 13.0))
-        driver.execute_script("window.scrollBy(0, 600);")
-        time.sleep(random.uniform(8.0, 13.0))
-        driver.execute_script("window.scrollBy(0, 600);")
-        time.sleep(random.uniform(8.0, 13.0))
+        for _ in range(3):
+            reason = lifecycle.over_limits(handle)
+            if reason:
+                logging.warning("Stop scrolling %s: %s", full_url, reason)
+                break
+            loaded: int = waiter.count(PRODUCT_IMAGE_SELECTOR)
+            if loaded >= MAX_PRODUCTS:
+                break
+            driver.execute_script("window.scrollBy(0, 600);")
+            if not waiter.wait(
+                PRODUCT_IMAGE_SELECTOR,
+                budget=10.5,
+                timeout=13.0,
+                min_items=loaded + 1,
+            ):
+                break
+        waiter.log_saved()
 
         html = driver.page_source
     except Exception as e:
         logging.error("Error in fetch_data_sync: %s", e)
-        quit_driver_and_reap_children()
-        close_open_file_descriptors()
-        kill_chromedriver()
         return None
     finally:
         if driver:
-            try:
-                driver.quit()
-            except Exception:
-                pass
-
-    soup = BeautifulSoup(html, "html.parser")
-    product_elements = soup.select("div.boost-sd__product-item")
-    if not product_elements:
+            lifecycle.close(handle, driver.quit)
+        chrome_cache.release(launch_kwargs, promote=html is not None)
+
+    products: list = parse_cards(html, full_url, MAX_PRODUCTS)
+    if not products:
         logging.info(
             "Товары не найдены для %s по известным селекторам.",
             full_url
         )
-        return []
-
-    products: list = []
-    for element in product_elements[:4]:
-        a_tag = element.find("a", class_="boost-sd__product-link", href=True)
-        if a_tag:
-            link: str = a_tag["href"]
-            if not link.startswith("http"):
-                link: str = "https://shop.kind.co.jp" + link
-        else:
-            link: str = full_url
+    return products
 
-        img_tag = element.find(
-            "img",
-            class_="boost-sd__product-image-img--main"
-        )
-        if img_tag:
-            image = img_tag.get("src")
-            if image and image.startswith("//"):
-                image: str = "https:" + image
-        else:
-            image: None = None
 
-        price_container = element.find("div", class_="boost-sd__product-price")
-        if price_container:
-            price: str = price_container.get_text(strip=True)
-        else:
-            price: str = "Цена не найдена"
+def fetch_products(full_url: str) -> list:
+    """
+    Получает новые товары коллекции: сначала через JSON фильтра Boost
+    (KindJsonClient, порядок сайта), и только если JSON недоступен - через
+    браузер (fetch_data_sync).
+
+    Args:
+        - 'full_url' (str): ссылка на страницу коллекции
+
+    Returns:
+        List: список найденных объявлений (пустой при ошибке)
+    """
+    if JSON_FAST_PATH:
+        products = json_client.fetch(full_url, MAX_PRODUCTS)
+        if products is not None:
+            return products
+        logging.info("JSON недоступен для %s, используется браузер", full_url)
+    return fetch_data_sync(full_url) or []
 
-        products.append({"link": link, "image": image, "price": price})
 
-    return products
+async def handle_products(url: str, products: list, first_iter: bool) -> None:
+    """
+    Единственный потребитель результатов асинхронного прохода:
+    дедупликация через add_url и отправка новых товаров
+
+    Примечания:
+    - send_product_to_telegram только ставит товар в очередь
+    TelegramNotifier, загрузка остальных коллекций не ждет Telegram
+
+    Args:
+        - 'url' (str): ссылка на коллекцию
+        - 'products' (list): товары коллекции
+        - 'first_iter' (bool): первая итерация (сообщения не отправляются)
+    """
+    for product in products:
+        if not add_url(product["link"]):
+            continue
+        if not first_iter:
+            send_product_to_telegram(product)
+
+
+def fetch_all_async(first_iter: bool) -> None:
+    """
+    Асинхронный проход по URLS: несколько коллекций загружаются
+    одновременно (FETCH_CONCURRENCY) под общим лимитом запросов к хосту
+    (MAX_REQUESTS_PER_SECOND), браузер - запасной путь из пула
+    BROWSER_POOL_SIZE.
+
+    Args:
+        - 'first_iter' (bool): первая итерация (сообщения не отправляются)
+    """
+    fetcher = AsyncCollectionFetcher(
+        json_client,
+        FETCH_CONCURRENCY,
+        MAX_REQUESTS_PER_SECOND,
+        BROWSER_POOL_SIZE,
+        fetch_data_sync,
+        use_json=JSON_FAST_PATH,
+    )
+
+    async def on_products(url: str, products: list) -> None:
+        await handle_products(url, products, first_iter)
+
+    asyncio.run(fetcher.run(URLS, MAX_PRODUCTS, on_products))
 
 
 def main():
     """
-    В цикле с каждым url заходит в parse_page
+    В цикле с каждым url заходит в fetch_products
     и получает из него список объектов.
     Во вложенном цикле проходит по данному списку
     заходит в send_product_to_telegram (если не первая итерация)
     чтобы отправить сообщение.
 
-    В kill_chromedriver, удаляет все лишние процессы
-    В quit_driver_and_reap_children завершает все зомби процессы
+    Процессы браузера завершает и забирает fetch_data_sync через
+    lifecycle, чужие chrome на машине не трогаются.
     В rotate_txt_log проверяет размер файла логов.
 
     Примечания:
+    - При ASYNC_MODE проход выполняет fetch_all_async: коллекции
+    загружаются параллельно, пауз между url нет, частоту запросов
+    ограничивает MAX_REQUESTS_PER_SECOND
     - Если add_url вернул False, то идет на следующую итерацию
     - После каждой итерации цикла products
     функция засыпает на какое-то время
@@ -384,24 +339,24 @@ def main():
     first_iter: bool = True
     while True:
         logging.info("start search ads by url")
-        for url in URLS:
-            products: list = fetch_data_sync(url)
-            for product in products:
-                if not add_url(product["link"]):
-                    continue
-                if not first_iter:
-                    send_product_to_telegram(product)
-                    time.sleep(random.uniform(1.0, 3.0))
-
-            time.sleep(random.uniform(60.0, 120.0))
-            quit_driver_and_reap_children()
-            kill_chromedriver()
+        if ASYNC_MODE:
+            fetch_all_async(first_iter)
+        else:
+            for url in URLS:
+                products: list = fetch_products(url)
+                for product in products:
+                    if not add_url(product["link"]):
+                        continue
+                    if not first_iter:
+                        send_product_to_telegram(product)
+
+                time.sleep(random.uniform(60.0, 120.0))
 
+        chrome_cache.log_report()
         first_iter: bool = False
         rotate_txt_log()
         time.sleep(random.uniform(1800.0, 2300.0))
 
 
 if __name__ == "__main__":
-    signal.signal(signal.SIGCHLD, quit_driver_and_reap_children)
     main()
@@ -0,0 +1,147 @@
+import re
+from typing import Any, Optional
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+
+    HTML_PARSER: str = "lxml"
+except ImportError:
+    HTML_PARSER: str = "html.parser"
+
+BASE_URL: str = "https://shop.kind.co.jp"
+# Товар в ссылке карточки: /products/<handle> (в том числе после /collections/...)
+PRODUCT_PATH_RE = re.compile(r"/products/([^/?#]+)")
+CARD_RE = re.compile(
+    r'<div\b[^>]*\bclass=["\'][^"\']*\bboost-sd__product-item(?=[\s"\'])'
+)
+
+
+def has_class(css_class: str) -> Any:
+    """
+    Возвращает проверку атрибута class для SoupStrainer.
+
+    Во время разбора с parse_only атрибут class еще не разбит на список,
+    поэтому сравнение class_="..." не находит элементы с несколькими классами.
+
+    Args:
+        - 'css_class' (str): искомый класс
+
+    Returns:
+        Any: функция проверки значения атрибута
+    """
+
+    def check(value: Any) -> bool:
+        if not value:
+            return False
+        if isinstance(value, str):
+            value = value.split()
+        return css_class in value
+
+    return check
+
+
+CARD_STRAINER = SoupStrainer("div", class_=has_class("boost-sd__product-item"))
+
+
+def slice_cards(html: str, limit: Optional[int]) -> Optional[str]:
+    """
+    Вырезает из html только первые limit карточек товаров.
+
+    Примечания:
+    - Если карточек нет, возвращает None
+    - Все после начала карточки номер limit + 1 отбрасывается,
+    незакрытые теги парсер закрывает сам
+    - limit=None оставляет все карточки
+
+    Args:
+        - 'html' (str): html код страницы
+        - 'limit' (int, optional): сколько карточек нужно
+
+    Returns:
+        str|None: фрагмент html или None
+    """
+    start: Optional[int] = None
+    end: int = len(html)
+    for index, card in enumerate(CARD_RE.finditer(html)):
+        if index == 0:
+            start = card.start()
+        if limit is not None and index == limit:
+            end = card.start()
+            break
+    if start is None:
+        return None
+    return html[start:end]
+
+
+def item_link(href: str) -> str:
+    """
+    Каноническая ссылка на товар из href карточки: /products/<handle>
+    без коллекции и параметров, как у товаров из JSON (json_client)
+
+    Args:
+        - 'href' (str): href карточки
+
+    Returns:
+        str: ссылка на товар
+    """
+    if not href.startswith("http"):
+        href = BASE_URL + href
+    match = PRODUCT_PATH_RE.search(href)
+    return f"{BASE_URL}/products/{match.group(1)}" if match else href
+
+
+def parse_cards(html: Any, full_url: str, limit: Optional[int] = 4) -> list:
+    """
+    Парсит карточки div.boost-sd__product-item со страницы коллекции.
+
+    Строит дерево только для карточек (SoupStrainer) и только для первых
+    limit из них, а не для всей страницы.
+
+    Примечания:
+    - Если карточек нет, возвращает пустой список
+    - Ссылки приводятся к /products/<handle> (item_link): тот же ключ
+    дедупликации, что у товаров из JSON
+
+    Args:
+        - 'html' (Any): html код страницы сайта
+        - 'full_url' (str): ссылка на страницу коллекции
+        - 'limit' (int, optional): сколько карточек вернуть (None - все)
+
+    Returns:
+        List: список словарей {"link", "image", "price"}
+    """
+    fragment: Optional[str] = slice_cards(html, limit)
+    if fragment is None:
+        return []
+
+    soup = BeautifulSoup(fragment, HTML_PARSER, parse_only=CARD_STRAINER)
+    products: list = []
+    for element in soup.find_all("div", class_="boost-sd__product-item", limit=limit):
+        a_tag = element.find("a", class_="boost-sd__product-link", href=True)
+        if a_tag:
+            link: str = item_link(a_tag["href"])
+        else:
+            link: str = full_url
+
+        img_tag = element.find(
+            "img",
+            class_="boost-sd__product-image-img--main"
+        )
+        if img_tag:
+            image = img_tag.get("src")
+            if image and image.startswith("//"):
+                image: str = "https:" + image
+        else:
+            image: None = None
+
+        price_container = element.find("div", class_="boost-sd__product-price")
+        if price_container:
+            price: str = price_container.get_text(strip=True)
+        else:
+            price: str = "Цена не найдена"
+
+        products.append({"link": link, "image": image, "price": price})
+
+    return products
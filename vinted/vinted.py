@@ -304,6 +304,36 @@ class Parser:
                 return True
             return False
 
+    async def process_items(self, data_json: dict, first_iter: bool) -> int:
+        """
+        Обрабатывает товары из ответа api/v2/catalog/items:
+        новые ссылки добавляет в коллекцию и рассылает клиентам
+
+        Returns:
+            int: число новых ссылок
+        """
+        new_items: int = 0
+        for item in data_json.get("items", [])[:5]:
+            try:
+                url: str = item.get("url")
+                ts_item = (
+                    item.get("photo", {})
+                    .get("high_resolution", {})
+                    .get("timestamp", 0)
+                )
+
+                if await self.add_url(url):
+                    new_items += 1
+                    if self.last_items.full():
+                        await self.last_items.get()
+                    await self.last_items.put(url)
+
+                    if not first_iter and (time.time() - ts_item) < 1200:
+                        await self.broadcast_link(url)
+            except Exception as e:
+                logging.error("Error processing item: %s", e)
+        return new_items
+
     async def worker(self, web_params, api_params):
         """Основной рабочий процесс парсинга"""
         first_iter: bool = True
@@ -331,25 +361,7 @@ class Parser:
                     await asyncio.sleep(5)
                     continue
 
-                for item in data_json.get("items", [])[:5]:
-                    try:
-                        url: str = item.get("url")
-                        ts_item = (
-                            item.get("photo", {})
-                            .get("high_resolution", {})
-                            .get("timestamp", 0)
-                        )
-
-                        if await self.add_url(url):
-                            if self.last_items.full():
-                                await self.last_items.get()
-                            await self.last_items.put(url)
-
-                            if not first_iter and (time.time() - ts_item) < 1200:
-                                await self.broadcast_link(url)
-                    except Exception as e:
-                        logging.error("Error processing item: %s", e)
-
+                await self.process_items(data_json, first_iter)
                 first_iter: bool = False
                 await asyncio.sleep(5)
 